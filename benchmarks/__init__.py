@@ -0,0 +1,10 @@
+"""
+Benchmarks
+
+Seeded synthetic incident data and timing / peak-memory measurements for
+the utils functions and notebook steps.
+
+Usage:
+    python -m benchmarks.run --sizes 100k 1m
+    python -m benchmarks.import_time
+"""
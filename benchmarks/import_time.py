@@ -0,0 +1,102 @@
+"""
+Import Time Check
+
+Times cold imports of the utils package in fresh interpreters and fails
+when the non-plotting API is slower than its budget or pulls in a
+plotting or mapping library.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 2.0 --repeat 7
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Case -> (statement, budget in seconds)
+IMPORT_CASES = {
+    'package': ('import utils', 0.25),
+    'non_plotting_api': ('from utils import (load_incidents, upsert_incidents, quick_summary_table, '
+                         'batch_export_for_web, data_fact_check, quick_info, same_window_mask, '
+                         'apply_schema, run_pipeline)', 1.5),
+}
+
+# Libraries the non-plotting API must not import
+HEAVY_MODULES = ('matplotlib', 'seaborn', 'folium', 'plotly', 'geopandas')
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_import(statement: str, repeat: int = 5) -> Dict[str, Any]:
+    """
+    Time an import statement in fresh interpreters.
+
+    Args:
+        statement: Import statement to run
+        repeat: Number of interpreters to start
+
+    Returns:
+        Dictionary with min/median seconds and the heavy modules loaded
+    """
+    code = _PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    times = [run['seconds'] for run in runs]
+    return {'min_s': round(min(times), 4),
+            'median_s': round(statistics.median(times), 4),
+            'loaded': runs[-1]['loaded']}
+
+
+def check_imports(repeat: int = 5, budget: Optional[float] = None) -> bool:
+    """
+    Run every import case against its budget.
+
+    Args:
+        repeat: Interpreters per case
+        budget: Override the non-plotting API budget in seconds
+
+    Returns:
+        True when all cases are within budget and import no heavy modules
+    """
+    ok = True
+    for name, (statement, limit) in IMPORT_CASES.items():
+        if budget is not None and name == 'non_plotting_api':
+            limit = budget
+        result = time_import(statement, repeat)
+        passed = result['median_s'] <= limit and not result['loaded']
+        ok &= passed
+        print(f"{'✅' if passed else '⚠️'} {name:<18} {result['median_s']:.3f}s (budget {limit:.2f}s)"
+              + (f"  loaded {', '.join(result['loaded'])}" if result['loaded'] else ''))
+    return ok
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.import_time',
+                                     description='Check cold import time of the utils package.')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=None,
+                        help='budget for the non-plotting API in seconds (default: %.1f)'
+                             % IMPORT_CASES['non_plotting_api'][1])
+    args = parser.parse_args(argv)
+    if not check_imports(args.repeat, args.budget):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,361 @@
+"""
+Benchmark Runner
+
+Times the utils functions and notebook steps on synthetic incident frames
+and records peak memory, writing one JSON file per run so results can be
+compared across commits.
+
+Usage:
+    python -m benchmarks.run --sizes 100k 1m
+    python -m benchmarks.run --sizes 100k --cases ytd_filter radius_grid
+    python -m benchmarks.run --sizes 100k --compare benchmarks/results/<base>.json
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from utils.data_utils import (categorical_analysis, create_date_features, detect_outliers,
+                              memory_optimization, quick_info)
+from utils.dates import parse_timestamps
+from utils.dataset_profile import profile_dataset
+from utils.geography import boundary_index, city_grid_centers, city_outline, clear_boundary_caches
+from utils.journalism_utils import batch_export_for_web, data_fact_check, quick_summary_table
+from utils.incident_store import SOURCE_PATTERN, clean_incidents, read_incident_files
+from utils.sketches import SketchSet
+from utils.sqlite_store import build_sqlite_store
+from utils.spatial_utils import count_within_radius, density_surface
+from utils.temporal_utils import same_window_mask
+
+from .synthetic import RANDOM_SEED, SIZES, generate_incidents
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+class Context:
+    """Frames shared by the cases of one size, built on first use."""
+
+    def __init__(self, n_rows: int, seed: int):
+        self.n_rows = n_rows
+        self.seed = seed
+        self._df = None
+        self._raw = None
+        self._sketches = None
+        self._sqlite = None
+        self._raw_dir = None
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """Cleaned incidents (registry dtypes), as loaded from the store."""
+        if self._df is None:
+            self._df = generate_incidents(self.n_rows, seed=self.seed)
+        return self._df
+
+    @property
+    def raw(self) -> pd.DataFrame:
+        """Incidents with the dtypes ``pd.read_csv`` infers from the raw CSV."""
+        if self._raw is None:
+            self._raw = generate_incidents(self.n_rows, seed=self.seed, raw=True)
+        return self._raw
+
+    @property
+    def last_day(self) -> pd.Series:
+        """Mask of the incidents reported on the latest day."""
+        dates = self.df['REPORT_DATE']
+        return (dates >= dates.max().normalize()).to_numpy()
+
+    @property
+    def sketches(self) -> SketchSet:
+        """Sketches of every incident before the latest day."""
+        if self._sketches is None:
+            self._sketches = SketchSet.from_frame(self.df[~self.last_day])
+        return self._sketches
+
+    @property
+    def sqlite(self) -> Path:
+        """SQLite store of the incidents in a temporary directory."""
+        if self._sqlite is None:
+            self._sqlite = Path(tempfile.mkdtemp()) / 'incidents.sqlite'
+            build_sqlite_store(self.df, path=self._sqlite)
+        return self._sqlite
+
+    @property
+    def raw_dir(self) -> Path:
+        """Yearly ``Crime_Incidents_in_<year>.csv`` files (with BOM) in a temporary directory."""
+        if self._raw_dir is None:
+            self._raw_dir = Path(tempfile.mkdtemp())
+            for year, part in self.raw.groupby(self.raw['REPORT_DAT'].str[:4]):
+                part.to_csv(self._raw_dir / f'Crime_Incidents_in_{year}.csv', index=False,
+                            encoding='utf-8-sig')
+        return self._raw_dir
+
+
+def _cold_ingest_pandas(ctx: Context) -> pd.DataFrame:
+    """Notebook's former cold load: default read_csv per yearly file, concat, then clean."""
+    frames = [pd.read_csv(path) for path in sorted(ctx.raw_dir.glob(SOURCE_PATTERN))]
+    return clean_incidents(pd.concat(frames, ignore_index=True))
+
+
+def _sqlite_build(ctx: Context) -> None:
+    """Bulk-load the incidents into SQLite with the composite indexes and R*Tree."""
+    with tempfile.TemporaryDirectory() as tmp:
+        build_sqlite_store(ctx.df, path=Path(tmp) / 'incidents.sqlite')
+
+
+def _web_export(ctx: Context, fmt: str) -> None:
+    """Export the incidents for the web in one format to a temporary directory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_export_for_web({'incidents': ctx.df}, fmt, output_dir=tmp, skip_unchanged=False)
+
+
+def _profile_all(ctx: Context) -> None:
+    """quick_info, data_fact_check and categorical_analysis sharing one profile."""
+    profile = profile_dataset(ctx.df)
+    quick_info(ctx.df, profile)
+    data_fact_check(ctx.df, profile=profile)
+    categorical_analysis(ctx.df, ['OFFENSE', 'METHOD', 'SHIFT'], max_categories=0, profile=profile)
+
+
+def _sketch_refresh(ctx: Context) -> None:
+    """Refresh with one new day: sketch it, merge it into the history and answer from the sketches."""
+    day = ctx.df[ctx.last_day]
+    merged = SketchSet(ctx.df.dtypes).merge(ctx.sketches).merge(SketchSet.from_frame(day))
+    data_fact_check(merged)
+    detect_outliers(day, ['LATITUDE', 'LONGITUDE', 'XBLOCK', 'YBLOCK'], sketches=merged)
+
+
+def _density_surface(ctx: Context) -> pd.DataFrame:
+    """Grid notebook via a raster: every cell's counts for three radii and two groups, then site percentiles."""
+    df = ctx.df
+    latest = df[df['YEAR'] == df['YEAR'].max()]
+    groups = {'all': np.ones(len(latest), dtype=bool), 'gun': (latest['METHOD'] == 'GUN').to_numpy()}
+    surface = density_surface(latest, radii=[0.25, 0.5, 1.0], groups=groups)
+    return surface.rank_sites(latest[['LATITUDE', 'LONGITUDE']].dropna().head(100))
+
+
+def _parse_dates(ctx: Context) -> None:
+    """Parse the three raw date columns as ``apply_schema`` does on load."""
+    for col in ('REPORT_DAT', 'START_DATE', 'END_DATE'):
+        parse_timestamps(ctx.raw[col])
+
+
+def _date_features(ctx: Context) -> pd.DataFrame:
+    """Compact temporal features, local time and incident duration in one pass."""
+    frame = ctx.df[['START_DATE', 'END_DATE']]
+    return create_date_features(frame, 'START_DATE', compact=True, end_col='END_DATE')
+
+
+def _ytd_filter(ctx: Context) -> pd.DataFrame:
+    """Notebook cell: year-to-date offense counts for the latest year's window."""
+    df = ctx.df
+    latest = df['YEAR'].max()
+    dates = df.loc[df['YEAR'] == latest, 'REPORT_DATE']
+    mask = same_window_mask(df['REPORT_DATE'], (dates.min().month, dates.min().day),
+                            (dates.max().month, dates.max().day))
+    return df[mask].groupby(['OFFENSE', 'YEAR'], observed=True).size().unstack(fill_value=0)
+
+
+def _city_outline_union(ctx: Context):
+    """Former grid clip setup: union the ward polygons on every call."""
+    return shapely.union_all(boundary_index('WARD').geometries)
+
+
+def _city_outline(ctx: Context):
+    """Grid clip setup from the precompiled outline (first call in a process)."""
+    clear_boundary_caches()
+    return city_outline()
+
+
+def _radius_grid(ctx: Context) -> pd.DataFrame:
+    """Grid notebook: half-mile counts around every city grid centre for the latest year."""
+    df = ctx.df
+    latest = df[df['YEAR'] == df['YEAR'].max()]
+    centers = city_grid_centers(df['LATITUDE'].min(), df['LATITUDE'].max(),
+                                df['LONGITUDE'].min(), df['LONGITUDE'].max(), 0.007)
+    return count_within_radius(latest, centers, 0.5)
+
+
+CASES: Dict[str, Callable[[Context], Any]] = {
+    'quick_info': lambda ctx: quick_info(ctx.df),
+    'data_fact_check': lambda ctx: data_fact_check(ctx.df),
+    'profile_all': _profile_all,
+    'sketch_refresh': _sketch_refresh,
+    'detect_outliers': lambda ctx: detect_outliers(ctx.df, ['LATITUDE', 'LONGITUDE', 'XBLOCK', 'YBLOCK']),
+    'memory_optimization': lambda ctx: memory_optimization(ctx.raw, verbose=False),
+    'quick_summary_table': lambda ctx: quick_summary_table(ctx.df, 'OFFENSE', ['OBJECTID'], 'count'),
+    'quick_summary_table_polars': lambda ctx: quick_summary_table(ctx.df, 'OFFENSE', ['OBJECTID'],
+                                                                  'count', backend='polars'),
+    'quick_summary_table_sqlite': lambda ctx: quick_summary_table(ctx.sqlite, 'OFFENSE', ['OBJECTID'],
+                                                                  'count', backend='sqlite'),
+    'sqlite_build': _sqlite_build,
+    'cold_ingest_pandas': _cold_ingest_pandas,
+    'cold_ingest': lambda ctx: read_incident_files(ctx.raw_dir),
+    'web_export_json': lambda ctx: _web_export(ctx, 'json'),
+    'web_export_shards': lambda ctx: _web_export(ctx, 'shards'),
+    'parse_dates': _parse_dates,
+    'date_features': _date_features,
+    'ytd_filter': _ytd_filter,
+    'city_outline_union': _city_outline_union,
+    'city_outline': _city_outline,
+    'radius_grid': _radius_grid,
+    'density_surface': _density_surface,
+}
+
+
+def measure(func: Callable[[Context], Any], ctx: Context, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Time a case and measure its peak traced memory.
+
+    One untimed warm-up run builds the frames the case needs and loads
+    lazy caches. Timings are taken without tracing; peak memory comes from
+    one extra run under ``tracemalloc``, which sees NumPy and Python
+    allocations but not memory allocated inside Arrow.
+
+    Args:
+        func: Case taking the context
+        ctx: Shared frames
+        repeat: Number of timed runs
+
+    Returns:
+        Dictionary with min/median seconds and peak MB
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(ctx)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            func(ctx)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'min_s': round(min(times), 4),
+            'median_s': round(statistics.median(times), 4),
+            'peak_mb': round(peak / 1024**2, 2)}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_size(value: str) -> int:
+    return SIZES[value.lower()] if value.lower() in SIZES else int(value)
+
+
+def run_benchmarks(sizes: Sequence[int], cases: Optional[Sequence[str]] = None,
+                   repeat: int = 3, seed: int = RANDOM_SEED) -> Dict[str, Any]:
+    """
+    Run the benchmark cases at each size.
+
+    Args:
+        sizes: Row counts
+        cases: Case names (default: all of ``CASES``)
+        repeat: Timed runs per case
+        seed: Generator seed
+
+    Returns:
+        Results document (metadata plus one record per size and case)
+    """
+    cases = list(cases or CASES)
+    unknown = [name for name in cases if name not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown case(s) {', '.join(unknown)}; choose from {', '.join(CASES)}")
+
+    results = []
+    for n_rows in sizes:
+        ctx = Context(n_rows, seed)
+        start = time.perf_counter()
+        ctx.df
+        print(f"📊 {n_rows:,} rows generated in {time.perf_counter() - start:.1f}s")
+        for name in cases:
+            record = {'case': name, 'rows': n_rows, **measure(CASES[name], ctx, repeat)}
+            results.append(record)
+            print(f"   {name:<28} {record['median_s']:>9.3f}s  peak {record['peak_mb']:>9.1f} MB")
+        del ctx
+        gc.collect()
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+        'seed': seed,
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def compare_results(base: Dict[str, Any], current: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Compare two results documents.
+
+    Args:
+        base: Earlier results (e.g. from the parent commit)
+        current: New results
+
+    Returns:
+        DataFrame of median seconds and peak MB per case and size, with
+        current / base ratios (below 1 is faster or smaller)
+    """
+    keys = ['case', 'rows']
+    merged = pd.DataFrame(base['results']).merge(pd.DataFrame(current['results']),
+                                                  on=keys, suffixes=('_base', ''))
+    merged['time_ratio'] = (merged['median_s'] / merged['median_s_base']).round(3)
+    merged['memory_ratio'] = (merged['peak_mb'] / merged['peak_mb_base']).round(3)
+    return merged[keys + ['median_s_base', 'median_s', 'time_ratio',
+                          'peak_mb_base', 'peak_mb', 'memory_ratio']]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description='Benchmark the utils on synthetic incidents.')
+    parser.add_argument('--sizes', nargs='+', default=['100k'],
+                        help=f"row counts or {', '.join(SIZES)} (default: 100k)")
+    parser.add_argument('--cases', nargs='+', default=None, help=f"cases ({', '.join(CASES)})")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=RANDOM_SEED)
+    parser.add_argument('--output', type=Path, default=None,
+                        help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', type=Path, default=None, help='earlier results file to compare with')
+    args = parser.parse_args(argv)
+
+    document = run_benchmarks([_parse_size(size) for size in args.sizes], args.cases,
+                              repeat=args.repeat, seed=args.seed)
+    output = args.output or RESULTS_DIR / f"{document['commit'] or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2) + '\n')
+    print(f"✅ Results saved to: {output}")
+
+    if args.compare is not None:
+        comparison = compare_results(json.loads(args.compare.read_text()), document)
+        print(comparison.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Synthetic Incidents
+
+Seeded generator for DC-scale incident frames with the real column schema.
+
+Offense, ward, method and shift shares follow the 30-day DC feed;
+coordinates are drawn around each ward's incident centre and kept inside
+the ward polygon, and PSA / district / state-plane columns are derived
+from the coordinates so the frame is internally consistent.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Optional, Sequence
+
+from utils._config import config
+from utils.geography import boundary_index
+from utils.schema import apply_schema
+from utils.spatial_utils import lonlat_to_state_plane
+
+RANDOM_SEED = config.RANDOM_SEED if config is not None else 42
+
+OFFENSE_SHARES = {
+    'THEFT/OTHER': 0.4915, 'THEFT F/AUTO': 0.2476, 'MOTOR VEHICLE THEFT': 0.1556,
+    'ROBBERY': 0.0375, 'ASSAULT W/DANGEROUS WEAPON': 0.0329, 'BURGLARY': 0.0291,
+    'HOMICIDE': 0.0037, 'SEX ABUSE': 0.0017, 'ARSON': 0.0004,
+}
+# Share of GUN / KNIFE by offense (the rest is OTHERS)
+WEAPON_SHARES = {
+    'ASSAULT W/DANGEROUS WEAPON': (0.582, 0.228),
+    'HOMICIDE': (0.667, 0.111),
+    'ROBBERY': (0.422, 0.078),
+    'SEX ABUSE': (0.0, 0.25),
+    'BURGLARY': (0.029, 0.0),
+}
+# Ward -> (share, lat mean, lat std, lon mean, lon std)
+WARD_PROFILES = {
+    1: (0.1425, 38.9236, 0.0062, -77.0316, 0.0076),
+    2: (0.1838, 38.9062, 0.0052, -77.0387, 0.0137),
+    3: (0.0704, 38.9408, 0.0131, -77.0721, 0.0129),
+    4: (0.1112, 38.9629, 0.0130, -77.0250, 0.0117),
+    5: (0.1588, 38.9211, 0.0132, -76.9897, 0.0158),
+    6: (0.1421, 38.8926, 0.0109, -77.0030, 0.0114),
+    7: (0.1188, 38.8891, 0.0127, -76.9483, 0.0189),
+    8: (0.0725, 38.8502, 0.0174, -76.9899, 0.0135),
+}
+BIDS = ['DOWNTOWN', 'NOMA', 'CAPITOL RIVERFRONT', 'GEORGETOWN', 'SOUTHWEST',
+        'GOLDEN TRIANGLE', 'CAPITOL HILL', 'MOUNT VERNON TRIANGLE CID', 'ADAMS MORGAN']
+BID_SHARE = 0.196
+STREETS = ['14TH STREET NW', 'GEORGIA AVENUE NW', 'MINNESOTA AVENUE NE', 'H STREET NE',
+           'BENNING ROAD NE', 'MARTIN LUTHER KING JR AVENUE SE', 'CONNECTICUT AVENUE NW',
+           'RHODE ISLAND AVENUE NE', 'PENNSYLVANIA AVENUE SE', 'M STREET NW',
+           'ALABAMA AVENUE SE', 'NEW YORK AVENUE NE', 'U STREET NW', 'K STREET NW']
+SIZES = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000}
+
+
+def _ward_points(rng: np.random.Generator, wards: np.ndarray) -> tuple:
+    """Draw coordinates around each ward's centre, redrawing points outside the ward."""
+    index = boundary_index('WARD')
+    lat = np.empty(len(wards))
+    lon = np.empty(len(wards))
+    todo = np.arange(len(wards))
+    while len(todo):
+        profile = np.array([WARD_PROFILES[w][1:] for w in range(1, 9)])[wards[todo] - 1]
+        lat[todo] = rng.normal(profile[:, 0], profile[:, 1])
+        lon[todo] = rng.normal(profile[:, 2], profile[:, 3])
+        positions = index.assign(lon[todo], lat[todo])
+        inside = (positions >= 0) & (index.ids[positions] == wards[todo])
+        todo = todo[~inside]
+    return lat, lon
+
+
+def generate_incidents(n_rows: int, seed: Optional[int] = None,
+                       years: Sequence[int] = range(2019, 2026),
+                       raw: bool = False) -> pd.DataFrame:
+    """
+    Generate a synthetic incident frame.
+
+    Args:
+        n_rows: Number of incidents
+        seed: Random seed (default: ``config.RANDOM_SEED``)
+        years: Report years to spread the incidents over
+        raw: Return the CSV layout (``REPORT_DAT`` and date strings, raw
+            dtypes) instead of the cleaned registry dtypes
+
+    Returns:
+        DataFrame with the DC incident columns
+    """
+    rng = np.random.default_rng(RANDOM_SEED if seed is None else seed)
+    years = list(years)
+
+    offenses = np.array(list(OFFENSE_SHARES))
+    offense = offenses[rng.choice(len(offenses), n_rows, p=np.array(list(OFFENSE_SHARES.values())))]
+    method = np.full(n_rows, 'OTHERS', dtype=object)
+    draw = rng.random(n_rows)
+    for name, (gun, knife) in WEAPON_SHARES.items():
+        rows = offense == name
+        method[rows & (draw < gun)] = 'GUN'
+        method[rows & (draw >= gun) & (draw < gun + knife)] = 'KNIFE'
+
+    shares = np.array([WARD_PROFILES[w][0] for w in range(1, 9)])
+    ward = rng.choice(np.arange(1, 9), n_rows, p=shares / shares.sum())
+    lat, lon = _ward_points(rng, ward)
+    psa = boundary_index('PSA').lookup(lon, lat)
+    district = boundary_index('DISTRICT').lookup(lon, lat)
+    x, y = lonlat_to_state_plane(lon, lat)
+
+    start = pd.Timestamp(f'{years[0]}-01-01', tz='UTC').value
+    end = pd.Timestamp(f'{years[-1] + 1}-01-01', tz='UTC').value
+    report = np.sort(rng.integers(start, end, n_rows, dtype=np.int64))
+    report_date = pd.to_datetime(report, utc=True).floor('s')
+    start_date = report_date - pd.to_timedelta(rng.exponential(6 * 3600, n_rows).astype(np.int64), unit='s')
+    end_date = start_date + pd.to_timedelta(rng.integers(0, 3 * 3600, n_rows), unit='s')
+    hour = report_date.hour.to_numpy()
+    shift = np.where((hour >= 7) & (hour < 15), 'DAY', np.where((hour >= 15) & (hour < 23), 'EVENING', 'MIDNIGHT'))
+
+    year = report_date.year.to_numpy()
+    # Reports are sorted, so the position within the year makes CCNs unique
+    sequence = np.arange(n_rows) - np.searchsorted(year, year)
+    ccn = pd.Series(year % 100).astype(str).str.zfill(2) + pd.Series(sequence).astype(str).str.zfill(6)
+    block_start = rng.integers(1, 50, n_rows) * 100
+    blocks = (pd.Series(block_start).astype(str) + ' - ' + pd.Series(block_start + 99).astype(str)
+              + ' BLOCK OF ' + pd.Series(np.array(STREETS)[rng.integers(0, len(STREETS), n_rows)]))
+    tract = rng.integers(100, 11100, n_rows)
+    bid = np.where(rng.random(n_rows) < BID_SHARE, np.array(BIDS)[rng.integers(0, len(BIDS), n_rows)], None)
+
+    df = pd.DataFrame({
+        'X': x, 'Y': y,
+        'CCN': ccn,
+        'REPORT_DATE': report_date,
+        'SHIFT': shift,
+        'METHOD': method,
+        'OFFENSE': offense,
+        'BLOCK': blocks,
+        'XBLOCK': x.round(2), 'YBLOCK': y.round(2),
+        'WARD': ward,
+        'ANC': pd.Series(ward).astype(str) + np.array(list('ABCDEFG'))[rng.integers(0, 7, n_rows)],
+        'DISTRICT': district.to_numpy(),
+        'PSA': psa.to_numpy(),
+        'NEIGHBORHOOD_CLUSTER': 'Cluster ' + pd.Series(rng.integers(1, 47, n_rows)).astype(str),
+        'BLOCK_GROUP': pd.Series(tract).astype(str).str.zfill(6) + ' ' + pd.Series(rng.integers(1, 5, n_rows)).astype(str),
+        'CENSUS_TRACT': pd.Series(tract).astype(str).str.zfill(6),
+        'VOTING_PRECINCT': 'Precinct ' + pd.Series(rng.integers(1, 145, n_rows)).astype(str),
+        'LATITUDE': lat.round(10), 'LONGITUDE': lon.round(10),
+        'BID': bid,
+        'START_DATE': start_date,
+        'END_DATE': end_date,
+        'OBJECTID': np.arange(1, n_rows + 1) + 780_000_000,
+        'OCTO_RECORD_ID': None,
+    })
+    if raw:
+        fmt = '%Y/%m/%d %H:%M:%S+00'
+        df = df.rename(columns={'REPORT_DATE': 'REPORT_DAT'})
+        for col in ('REPORT_DAT', 'START_DATE', 'END_DATE'):
+            df[col] = df[col].dt.strftime(fmt)
+        df['DISTRICT'] = df['DISTRICT'].astype('float64')
+        df['PSA'] = df['PSA'].astype('float64')
+        return df
+    df['YEAR'] = year.astype(str)
+    return apply_schema(df)
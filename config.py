@@ -2,44 +2,72 @@
 Configuration file for data science project.
 
 Contains paths, settings, and parameters used throughout the project.
-Loads environment variables from .env file if it exists.
+Reads settings from the .env file if it exists; variables already set in
+the environment take precedence. Importing this module has no side
+effects: os.environ is not modified and no directories are created (call
+``ensure_directories()`` for that; the utils writers create their own
+output directories). Read other .env values such as API keys with
+``config.getenv('NAME')``.
 """
 
 import os
 from pathlib import Path
+from typing import Dict, Optional
+
+PROJECT_ROOT = Path(__file__).parent
+
+
+def _read_env_file(path: Path) -> Dict[str, str]:
+    """Values from a .env file, without exporting them to os.environ."""
+    if not path.exists():
+        return {}
+    try:
+        from dotenv import dotenv_values
+    except ImportError:
+        # dotenv not available, skip loading
+        return {}
+    return {key: value for key, value in dotenv_values(path).items() if value is not None}
+
+
+# .env values overridden by the real environment
+ENV = {**_read_env_file(PROJECT_ROOT / ".env"), **os.environ}
+
+
+def getenv(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Look up a setting in the environment, then in .env."""
+    return ENV.get(key, default)
 
-# Load environment variables from .env file if it exists
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # dotenv not available, skip loading
-    pass
 
 # Project structure
-PROJECT_ROOT = Path(__file__).parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
-PROCESSED_DATA_DIR = PROJECT_ROOT / os.getenv('OUTPUT_DIR', 'data/processed')
+PROCESSED_DATA_DIR = PROJECT_ROOT / getenv('OUTPUT_DIR', 'data/processed')
 EXTERNAL_DATA_DIR = DATA_DIR / "external"
+CACHE_DIR = PROJECT_ROOT / getenv('CACHE_DIR', 'data/cache')
+INCIDENT_STORE_DIR = PROCESSED_DATA_DIR / "crime_incidents_parquet"
+# Optional indexed SQLite copy of the incidents (utils/sqlite_store.py)
+SQLITE_PATH = PROJECT_ROOT / getenv('SQLITE_PATH', 'data/cache/incidents.sqlite')
 NOTEBOOKS_DIR = PROJECT_ROOT / "notebooks"
-FIGURES_DIR = PROJECT_ROOT / os.getenv('FIGURE_DIR', 'notebooks/figures')
+FIGURES_DIR = PROJECT_ROOT / getenv('FIGURE_DIR', 'notebooks/figures')
 SRC_DIR = PROJECT_ROOT / "src"
 UTILS_DIR = PROJECT_ROOT / "utils"
 TESTS_DIR = PROJECT_ROOT / "tests"
 
-# Ensure directories exist
-for dir_path in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, EXTERNAL_DATA_DIR, FIGURES_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
+
+def ensure_directories() -> None:
+    """Create the data, cache and figure directories if they are missing."""
+    for dir_path in [DATA_DIR, RAW_DATA_DIR, PROCESSED_DATA_DIR, EXTERNAL_DATA_DIR, CACHE_DIR, FIGURES_DIR]:
+        dir_path.mkdir(parents=True, exist_ok=True)
+
 
 # Data settings
-RANDOM_SEED = int(os.getenv('RANDOM_SEED', 42))
+RANDOM_SEED = int(getenv('RANDOM_SEED', 42))
 TEST_SIZE = 0.2
 VALIDATION_SIZE = 0.2
 
 # Plot settings
 FIGURE_SIZE = (12, 8)
-DPI = int(os.getenv('FIGURE_DPI', 300))
+DPI = int(getenv('FIGURE_DPI', 300))
 PLOT_STYLE = 'seaborn-v0_8'
 
 # File formats
@@ -54,6 +82,13 @@ MAX_RETRIES = 3
 LOG_LEVEL = 'INFO'
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
+# Instrumentation (utils/instrumentation.py): '' = off, 'time' = wall/CPU/rows/RSS,
+# 'memory' = also tracemalloc peaks (slower)
+INSTRUMENTATION = getenv('INSTRUMENTATION', '').strip().lower()
+TRACE_FILE = PROJECT_ROOT / getenv('TRACE_FILE', 'data/cache/trace.jsonl')
+# Keep a cProfile dump of the slowest pipeline stage
+PROFILE_SLOWEST = getenv('PROFILE_SLOWEST', '').strip().lower() in ('1', 'true', 'yes')
+
 # Model settings
 CV_FOLDS = 5
 SCORING_METRIC = 'accuracy'  # or 'roc_auc', 'f1', etc.
@@ -0,0 +1,60 @@
+"""Incidents without a parsable report date in the partitioned store."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils.incident_store import (MANIFEST_NAME, NULL_PARTITION, build_incident_store,
+                                  load_incidents, upsert_incidents)
+
+
+def _raw_incidents() -> pd.DataFrame:
+    """Incident extract in the DC CSV layout with one bad date and one missing offense."""
+    raw = pd.DataFrame({
+        'CCN': [f'{i:08d}' for i in range(6)],
+        'REPORT_DAT': ['2024/01/0%d 10:00:00+00' % day for day in range(1, 7)],
+        'METHOD': 'OTHERS',
+        'OFFENSE': 'ROBBERY',
+        'LATITUDE': 38.9,
+        'LONGITUDE': -77.02,
+        'OBJECTID': [str(700_000_000 + i) for i in range(6)],
+    })
+    raw.loc[2, 'REPORT_DAT'] = 'not a date'
+    raw.loc[3, 'OFFENSE'] = None
+    return raw
+
+
+@pytest.mark.parametrize('partition_by', [['YEAR'], ['YEAR', 'OFFENSE']])
+def test_undated_incidents_are_kept(tmp_path, partition_by):
+    raw_dir, store_dir = tmp_path / 'raw', tmp_path / 'store'
+    raw_dir.mkdir()
+    _raw_incidents().to_csv(raw_dir / 'Crime_Incidents_in_2024.csv', index=False)
+
+    summary = build_incident_store(raw_dir, store_dir, partition_by=partition_by)
+    df = load_incidents(refresh=False, store_dir=store_dir)
+
+    assert summary['undated'] == 1
+    manifest = json.loads((store_dir / MANIFEST_NAME).read_text())
+    assert manifest['sources']['Crime_Incidents_in_2024.csv']['undated'] == 1
+    assert (store_dir / f'YEAR={NULL_PARTITION}').is_dir()
+    assert len(df) == 6
+    assert df.loc[df['YEAR'].isna(), 'CCN'].tolist() == ['00000002']
+    assert df['OFFENSE'].isna().sum() == 1
+    assert len(load_incidents(years=[2024], refresh=False, store_dir=store_dir)) == 5
+
+
+def test_upsert_revises_undated_incident(tmp_path):
+    raw_dir, store_dir = tmp_path / 'raw', tmp_path / 'store'
+    raw_dir.mkdir()
+    raw = _raw_incidents()
+    raw.to_csv(raw_dir / 'Crime_Incidents_in_2024.csv', index=False)
+    build_incident_store(raw_dir, store_dir)
+
+    revised = raw.iloc[[2]].assign(METHOD='KNIFE')
+    assert upsert_incidents(revised, store_dir) == {'new': 0, 'changed': 1, 'unchanged': 0}
+    assert upsert_incidents(revised, store_dir)['unchanged'] == 1
+
+    df = load_incidents(refresh=False, store_dir=store_dir)
+    assert len(df) == 6
+    assert df.loc[df['YEAR'].isna(), 'METHOD'].tolist() == ['KNIFE']
@@ -0,0 +1,46 @@
+"""Size budget and rendering modes of map_utils."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+folium = pytest.importorskip('folium')
+
+from utils.map_utils import add_incident_layer, save_map
+
+COLORS = {'ROBBERY': '#1f77b4', 'HOMICIDE': '#ff7f0e'}
+
+
+def _incidents(n_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'LATITUDE': 38.9 + rng.normal(0, 0.03, n_rows),
+        'LONGITUDE': -77.02 + rng.normal(0, 0.03, n_rows),
+        'OFFENSE': rng.choice(list(COLORS), n_rows),
+    })
+
+
+@pytest.mark.parametrize('n_rows', [20_000, 200_000])
+def test_auto_heatmap_is_coarsened_to_the_budget(tmp_path, n_rows):
+    m = folium.Map()
+    mode = add_incident_layer(m, _incidents(n_rows), 'Incidents', colors=COLORS, color_by='OFFENSE')
+    save_map(m, tmp_path / 'map.html')
+
+    assert mode == 'heatmap'
+    assert (tmp_path / 'map.html').stat().st_size <= 400 * 1024
+
+
+def test_auto_raises_when_nothing_fits():
+    m = folium.Map()
+    with pytest.raises(ValueError, match='size budget'):
+        add_incident_layer(m, _incidents(20_000), 'Incidents', size_budget_kb=15.5)
+
+
+def test_cluster_keeps_the_color_palette():
+    m = folium.Map()
+    add_incident_layer(m, _incidents(100), 'Incidents', colors=COLORS, color_by='OFFENSE',
+                       mode='cluster')
+    html = m.get_root().render()
+
+    assert '"1": "#ff7f0e"' in html
+    assert 'palette[row[2]]' in html
@@ -0,0 +1,120 @@
+"""Parity of the Polars aggregation backend with the pandas groupby."""
+
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('polars')
+
+from utils.incident_store import build_incident_store, load_incidents, upsert_incidents
+from utils.polars_backend import incident_counts, polars_summary_table
+
+OFFENSES = ['THEFT/OTHER', 'THEFT F/AUTO', 'ROBBERY', 'HOMICIDE']
+
+
+def _raw_incidents(n_rows: int, seed: int, first_id: int = 0) -> pd.DataFrame:
+    """Small incident extract in the DC CSV layout (text columns, some wards missing)."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(first_id, first_id + n_rows)
+    report = pd.Timestamp('2024-01-01', tz='UTC') + pd.to_timedelta(
+        rng.integers(0, 2 * 365 * 86400, n_rows), unit='s')
+    ward = rng.integers(1, 9, n_rows).astype(str).astype(object)
+    ward[rng.random(n_rows) < 0.05] = ''
+    return pd.DataFrame({
+        'CCN': [f'{i:08d}' for i in ids],
+        'REPORT_DAT': report.strftime('%Y/%m/%d %H:%M:%S+00'),
+        'SHIFT': rng.choice(['DAY', 'EVENING', 'MIDNIGHT'], n_rows),
+        'METHOD': rng.choice(['GUN', 'KNIFE', 'OTHERS'], n_rows),
+        'OFFENSE': rng.choice(OFFENSES, n_rows),
+        'WARD': ward,
+        'LATITUDE': (38.9 + rng.normal(0, 0.03, n_rows)).round(6),
+        'LONGITUDE': (-77.02 + rng.normal(0, 0.03, n_rows)).round(6),
+        'OBJECTID': (ids + 700_000_000).astype(str),
+    })
+
+
+@pytest.fixture(scope='module')
+def plain_store(tmp_path_factory):
+    raw_dir = tmp_path_factory.mktemp('raw')
+    store_dir = tmp_path_factory.mktemp('store')
+    raw = _raw_incidents(2000, seed=1)
+    for year, part in raw.groupby(raw['REPORT_DAT'].str[:4]):
+        part.to_csv(raw_dir / f'Crime_Incidents_in_{year}.csv', index=False, encoding='utf-8-sig')
+    build_incident_store(raw_dir, store_dir)
+    return store_dir
+
+
+@pytest.fixture(scope='module')
+def upserted_store(plain_store, tmp_path_factory):
+    store_dir = tmp_path_factory.mktemp('upserted') / 'store'
+    shutil.copytree(plain_store, store_dir)
+    # Revise some stored records (offense and ward change) and add new ones
+    feed = _raw_incidents(150, seed=1).iloc[::3].copy()
+    feed['OFFENSE'] = 'ROBBERY'
+    feed['WARD'] = '8'
+    feed = pd.concat([feed, _raw_incidents(40, seed=2, first_id=5000)], ignore_index=True)
+    summary = upsert_incidents(feed, store_dir)
+    assert summary['changed'] > 0 and summary['new'] == 40
+    return store_dir
+
+
+@pytest.fixture(params=['plain_store', 'upserted_store'])
+def store_dir(request):
+    return request.getfixturevalue(request.param)
+
+
+@pytest.mark.parametrize('agg_func', ['sum', 'mean', 'count', 'max', 'min'])
+@pytest.mark.parametrize('group_by', ['OFFENSE', 'WARD', ['OFFENSE', 'SHIFT']])
+def test_summary_table_matches_pandas(store_dir, group_by, agg_func):
+    df = load_incidents(refresh=False, store_dir=store_dir)
+    expected = df.groupby(group_by, observed=True)[['LATITUDE', 'LONGITUDE']].agg(agg_func)
+
+    result = polars_summary_table(store_dir, group_by, ['LATITUDE', 'LONGITUDE'], agg_func)
+
+    assert result['LATITUDE'].is_monotonic_decreasing
+    # Group labels compare by value (see test_ward_index_dtype_differs_from_pandas)
+    keys = [group_by] if isinstance(group_by, str) else group_by
+    result = result.reset_index()
+    expected = expected.reset_index().astype({key: result[key].dtype for key in keys})
+    pd.testing.assert_frame_equal(result.sort_values(keys).reset_index(drop=True),
+                                  expected.sort_values(keys).reset_index(drop=True),
+                                  rtol=1e-5)
+
+
+def test_incident_counts_matches_pandas(store_dir):
+    df = load_incidents(refresh=False, store_dir=store_dir)
+    expected = df.groupby(['OFFENSE', 'YEAR'], observed=True).size()
+
+    result = incident_counts(store_dir, by=('OFFENSE', 'YEAR'))
+
+    assert result['COUNT'].dtype == 'int64'
+    assert result['COUNT'].sum() == len(df)
+    assert (result.set_index(['OFFENSE', 'YEAR'])['COUNT'].to_dict()
+            == {(str(offense), year): count for (offense, year), count in expected.items()})
+
+
+def test_incident_counts_unstack_and_where(store_dir):
+    df = load_incidents(refresh=False, store_dir=store_dir)
+    homicides = df[df['OFFENSE'] == 'HOMICIDE']
+    expected = homicides.groupby(['WARD', 'YEAR'], observed=True).size().unstack(fill_value=0)
+
+    result = incident_counts(store_dir, by=('WARD', 'YEAR'), where={'OFFENSE': 'HOMICIDE'},
+                             unstack='YEAR')
+
+    np.testing.assert_array_equal(result.to_numpy(), expected.to_numpy())
+    assert list(result.columns) == list(expected.columns)
+
+
+def test_ward_index_dtype_differs_from_pandas(plain_store):
+    # Polars groups on the stored Int8 values; pandas groups on the
+    # registry categorical, so the index dtypes differ though labels match
+    df = load_incidents(refresh=False, store_dir=plain_store)
+    expected = df.groupby('WARD', observed=True)[['LATITUDE']].count()
+
+    result = polars_summary_table(plain_store, 'WARD', ['LATITUDE'], 'count')
+
+    assert isinstance(expected.index.dtype, pd.CategoricalDtype)
+    assert result.index.dtype == 'int8'
+    assert sorted(result.index) == sorted(expected.index.astype('int8'))
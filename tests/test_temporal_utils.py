@@ -0,0 +1,42 @@
+"""Window aggregation in temporal_utils."""
+
+import numpy as np
+import pandas as pd
+
+from utils.temporal_utils import compare_windows
+
+WINDOWS = {'first': ('2025-01-01', '2025-01-03'), 'second': ('2025-01-03', '2025-01-05'),
+           'empty': ('2025-02-01', '2025-02-02')}
+
+
+def _incidents() -> pd.DataFrame:
+    return pd.DataFrame({
+        'REPORT_DATE': pd.to_datetime(['2025-01-01', '2025-01-02', '2025-01-03', '2025-01-04'],
+                                      utc=True),
+        'WARD': [1, 1, 2, 1],
+        'V': [1.5, 2.25, 0.4, 3],
+        'N': [1, 2, 3, 4],
+    })
+
+
+def test_float_sums_are_not_truncated():
+    table = compare_windows(_incidents(), WINDOWS, value_col='V', agg_func='sum')
+
+    assert table.dtypes.eq(np.float64).all()
+    assert table.loc['TOTAL'].tolist() == [3.75, 3.4, 0.0]
+
+
+def test_float_sums_by_group_fill_empty_windows_with_zero():
+    table = compare_windows(_incidents(), WINDOWS, group_by='WARD', value_col='V', agg_func='sum')
+
+    assert table.loc[1].tolist() == [3.75, 3.0, 0.0]
+    assert table.loc[2].tolist() == [0.0, 0.4, 0.0]
+
+
+def test_integer_sums_and_counts_stay_int64():
+    sums = compare_windows(_incidents(), WINDOWS, group_by='WARD', value_col='N', agg_func='sum')
+    counts = compare_windows(_incidents(), WINDOWS, group_by='WARD')
+
+    assert sums.dtypes.eq(np.int64).all() and counts.dtypes.eq(np.int64).all()
+    assert sums.loc[1].tolist() == [3, 4, 0]
+    assert counts.loc[1].tolist() == [2, 1, 0]
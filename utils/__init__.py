@@ -2,42 +2,181 @@
 Data Science Project Utilities
 
 This package contains utility functions for common data science tasks and journalism workflows.
+
+Submodules are imported on first use (PEP 562), so ``import utils`` is
+cheap and ``from utils import load_incidents`` loads only the incident
+store, not matplotlib, seaborn or folium.
 """
 
-from .data_utils import (
-    quick_info,
-    plot_distributions,
-    correlation_analysis,
-    detect_outliers,
-    clean_column_names,
-    memory_optimization,
-    create_date_features,
-    categorical_analysis
-)
-
-from .journalism_utils import (
-    quick_export_for_web,
-    create_story_charts,
-    data_fact_check,
-    quick_summary_table,
-    compare_periods
-)
-
-__all__ = [
+import importlib
+
+# Submodule -> exported names
+_SUBMODULE_EXPORTS = {
     # Data analysis utilities
-    'quick_info',
-    'plot_distributions',
-    'correlation_analysis',
-    'detect_outliers',
-    'clean_column_names',
-    'memory_optimization',
-    'create_date_features',
-    'categorical_analysis',
-    
+    'data_utils': (
+        'quick_info',
+        'plot_distributions',
+        'correlation_analysis',
+        'detect_outliers',
+        'clean_column_names',
+        'memory_optimization',
+        'create_date_features',
+        'categorical_analysis',
+    ),
+
+    # Dataset profile
+    'dataset_profile': (
+        'DatasetProfile',
+        'profile_dataset',
+    ),
+
+    # Sketches
+    'sketches': (
+        'SketchSet',
+        'update_sketches',
+        'load_sketches',
+    ),
+
     # Journalism utilities
-    'quick_export_for_web',
-    'create_story_charts',
-    'data_fact_check',
-    'quick_summary_table',
-    'compare_periods'
-]
+    'journalism_utils': (
+        'quick_export_for_web',
+        'batch_export_for_web',
+        'export_json_shards',
+        'create_story_charts',
+        'data_fact_check',
+        'quick_summary_table',
+        'compare_periods',
+    ),
+
+    # Chart batches
+    'charts': (
+        'ChartSpec',
+        'render_charts',
+    ),
+
+    # Spatial utilities
+    'spatial_utils': (
+        'haversine_distance',
+        'count_within_radius',
+        'count_within_radius_by_group',
+        'DensitySurface',
+        'density_surface',
+    ),
+
+    # Incident store
+    'incident_store': (
+        'clean_incidents',
+        'build_incident_store',
+        'load_incidents',
+        'upsert_incidents',
+    ),
+
+    # SQLite store
+    'sqlite_store': (
+        'build_sqlite_store',
+        'sqlite_incidents',
+        'sqlite_summary_table',
+    ),
+
+    # Incident schema
+    'schema': (
+        'INCIDENT_SCHEMA',
+        'CATEGORICAL_COLUMNS',
+        'apply_schema',
+    ),
+
+    # Date parsing
+    'dates': (
+        'parse_timestamps',
+        'date_parts',
+    ),
+
+    # Temporal utilities
+    'temporal_utils': (
+        'IncidentTimeline',
+        'same_window_mask',
+        'same_window_by_year',
+        'compare_windows',
+    ),
+
+    # Map utilities
+    'map_utils': (
+        'points_to_geojson',
+        'add_incident_layer',
+        'create_incident_map',
+        'add_reference_points',
+        'add_boundary_layer',
+        'save_map',
+    ),
+
+    # Geography
+    'geography': (
+        'BoundaryIndex',
+        'load_boundaries',
+        'assign_boundaries',
+        'validate_boundaries',
+        'city_grid_centers',
+        'prepare_boundaries',
+        'boundary_topojson',
+        'clear_boundary_caches',
+    ),
+
+    # Crime cube
+    'crime_cube': (
+        'CrimeCube',
+        'build_crime_cube',
+    ),
+
+    # Polars backend
+    'polars_backend': (
+        'scan_incidents',
+        'incident_counts',
+        'polars_summary_table',
+    ),
+
+    # Query service
+    'query_service': (
+        'QueryService',
+        'serve_aggregates',
+    ),
+
+    # Pipeline
+    'pipeline': (
+        'run_pipeline',
+    ),
+
+    # Instrumentation
+    'instrumentation': (
+        'span',
+        'traced',
+        'trace_summary',
+    ),
+}
+
+_EXPORTS = {name: module for module, names in _SUBMODULE_EXPORTS.items() for name in names}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """Import the submodule defining ``name`` on first access."""
+    if name in _SUBMODULE_EXPORTS:
+        return importlib.import_module(f'.{name}', __name__)
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_SUBMODULE_EXPORTS))
+
+
+# Opt-in tracing of the exported functions (INSTRUMENTATION=time|memory);
+# tracing wraps every export, so they are all imported up front
+from .instrumentation import ENABLED as _INSTRUMENTED, instrument_exports as _instrument_exports
+if _INSTRUMENTED:
+    for _name in __all__:
+        __getattr__(_name)
+    _instrument_exports(globals(), __all__)
@@ -0,0 +1,58 @@
+"""
+Project configuration lookup shared by the utils modules.
+
+``config.py`` is loaded from the project root by file location, so
+``sys.path`` is not modified and an unrelated ``config`` module elsewhere
+on the path is never picked up.
+"""
+
+from pathlib import Path
+import importlib.util
+import os
+import sys
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / "config.py"
+
+
+def _load_config():
+    """Return the project's config module, loading it once by file location."""
+    module = sys.modules.get("config")
+    if module is not None and Path(getattr(module, "__file__", "") or "").resolve() == CONFIG_FILE:
+        return module
+    spec = importlib.util.spec_from_file_location("config", CONFIG_FILE)
+    if spec is None or not CONFIG_FILE.exists():
+        raise ImportError(f"No project config at {CONFIG_FILE}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # Share the module with notebooks and scripts that ``import config``
+    sys.modules.setdefault("config", module)
+    return module
+
+
+try:
+    config = _load_config()
+    PROJECT_ROOT = config.PROJECT_ROOT
+    RAW_DATA_DIR = config.RAW_DATA_DIR
+    PROCESSED_DATA_DIR = config.PROCESSED_DATA_DIR
+    CACHE_DIR = config.CACHE_DIR
+    INCIDENT_STORE_DIR = config.INCIDENT_STORE_DIR
+    SQLITE_PATH = config.SQLITE_PATH
+    FIGURES_DIR = config.FIGURES_DIR
+    DPI = config.DPI
+    INSTRUMENTATION = config.INSTRUMENTATION
+    TRACE_FILE = config.TRACE_FILE
+    PROFILE_SLOWEST = config.PROFILE_SLOWEST
+except ImportError:
+    # Fallback if config not available (shouldn't happen in normal use)
+    config = None
+    PROJECT_ROOT = Path.cwd()
+    RAW_DATA_DIR = PROJECT_ROOT / "data" / "raw"
+    PROCESSED_DATA_DIR = PROJECT_ROOT / "data" / "processed"
+    CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+    INCIDENT_STORE_DIR = PROCESSED_DATA_DIR / "crime_incidents_parquet"
+    SQLITE_PATH = CACHE_DIR / "incidents.sqlite"
+    FIGURES_DIR = PROJECT_ROOT / "notebooks" / "figures"
+    DPI = 300
+    INSTRUMENTATION = os.getenv('INSTRUMENTATION', '').strip().lower()
+    TRACE_FILE = CACHE_DIR / "trace.jsonl"
+    PROFILE_SLOWEST = os.getenv('PROFILE_SLOWEST', '').strip().lower() in ('1', 'true', 'yes')
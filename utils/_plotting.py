@@ -0,0 +1,52 @@
+"""
+Lazy matplotlib / seaborn access for the plotting helpers.
+
+Plotting libraries are imported on the first chart, not when ``utils`` is
+imported, so export and aggregation jobs never pay for them. Without a
+display (CI, cron, pipeline worker processes) the non-interactive Agg
+backend is selected before pyplot is first imported.
+"""
+
+import os
+import sys
+
+
+def is_headless() -> bool:
+    """
+    Check whether charts can only be written to files.
+
+    Returns:
+        True when no backend is configured, the process is not a Jupyter
+        kernel and (on Linux) there is no X11 or Wayland display
+    """
+    if os.environ.get('MPLBACKEND') or 'ipykernel' in sys.modules:
+        return False
+    if sys.platform.startswith('linux'):
+        return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    return False
+
+
+def pyplot():
+    """
+    Import ``matplotlib.pyplot``, using the Agg backend when headless.
+
+    Returns:
+        The pyplot module
+    """
+    if 'matplotlib.pyplot' not in sys.modules and is_headless():
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def seaborn():
+    """
+    Import seaborn (after selecting the pyplot backend).
+
+    Returns:
+        The seaborn module
+    """
+    pyplot()
+    import seaborn as sns
+    return sns
@@ -0,0 +1,373 @@
+"""
+Chart Batches
+
+Renders many charts at once for a story: each chart is a ``ChartSpec``
+(data, chart kind, options), charts are drawn headless on a process pool,
+and a chart whose data and spec hash matches the last render is skipped.
+
+Hashes are kept per output file in ``_chart_hashes.json`` in the output
+directory, so regenerating an unchanged chart set never imports matplotlib.
+Each worker draws its share of the charts on one reused ``Figure`` (not
+registered with pyplot), so nothing is shown and no figures accumulate.
+
+The drawing functions are shared with ``create_story_charts``,
+``plot_distributions`` and ``correlation_analysis``.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+import numpy as np
+
+from ._config import DPI, FIGURES_DIR
+from .journalism_utils import frame_hash
+
+CHART_FORMATS = ('png', 'svg', 'pdf')
+CHART_MANIFEST = '_chart_hashes.json'
+
+
+def draw_story_chart(ax, df: pd.DataFrame, column: str, chart_type: str = 'auto',
+                     title: Optional[str] = None) -> None:
+    """
+    Draw a ``create_story_charts`` chart on an axes.
+
+    Args:
+        ax: Matplotlib axes
+        df: pandas DataFrame
+        column: Column to visualize
+        chart_type: 'auto', 'bar', 'line', 'histogram', 'pie'
+        title: Chart title (auto-generated if None)
+    """
+    if title is None:
+        title = f"Analysis of {column.replace('_', ' ').title()}"
+
+    # Auto-detect chart type based on data
+    if chart_type == 'auto':
+        if df[column].dtype in ['object', 'category']:
+            chart_type = 'bar'
+        elif pd.api.types.is_numeric_dtype(df[column]):
+            if df[column].nunique() < 20:
+                chart_type = 'bar'
+            else:
+                chart_type = 'histogram'
+
+    if chart_type == 'bar':
+        value_counts = df[column].value_counts().head(10)
+        bars = ax.bar(range(len(value_counts)), value_counts.values.tolist())
+        ax.set_xticks(range(len(value_counts)))
+        ax.set_xticklabels(value_counts.index, rotation=45, ha='right')
+        ax.set_ylabel('Count')
+
+        # Add value labels on bars
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                    f'{int(height)}', ha='center', va='bottom')
+
+    elif chart_type == 'line':
+        if df.index.dtype == 'datetime64[ns]' or 'date' in column.lower():
+            df.plot(y=column, ax=ax, linewidth=2)
+        else:
+            ax.plot(df.index, df[column], linewidth=2)
+        ax.set_ylabel(column.replace('_', ' ').title())
+
+    elif chart_type == 'histogram':
+        ax.hist(df[column].dropna(), bins=30, alpha=0.7, edgecolor='black')
+        ax.set_xlabel(column.replace('_', ' ').title())
+        ax.set_ylabel('Frequency')
+
+    elif chart_type == 'pie':
+        value_counts = df[column].value_counts().head(8)
+        ax.pie(value_counts.values.tolist(), labels=value_counts.index.tolist(), autopct='%1.1f%%')
+
+    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+
+
+def draw_distributions(fig, df: pd.DataFrame, numeric_cols: Optional[List[str]] = None) -> None:
+    """
+    Draw ``plot_distributions`` histograms (three per row) on a figure.
+
+    Args:
+        fig: Matplotlib figure
+        df: pandas DataFrame
+        numeric_cols: Columns to plot (default: all numeric columns)
+    """
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+    n_cols = min(3, len(numeric_cols))
+    n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
+    axes = fig.subplots(n_rows, n_cols, squeeze=False).flatten()
+
+    for ax, col in zip(axes, numeric_cols):
+        ax.hist(df[col].dropna(), bins=30, alpha=0.7, edgecolor='black')
+        ax.grid(True)
+        ax.set_title(f'Distribution of {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Frequency')
+
+    # Hide empty subplots
+    for ax in axes[len(numeric_cols):]:
+        ax.set_visible(False)
+
+
+def draw_correlation(ax, corr_matrix: pd.DataFrame, method: str = 'pearson') -> None:
+    """
+    Draw a ``correlation_analysis`` heatmap (lower triangle) on an axes.
+
+    Args:
+        ax: Matplotlib axes
+        corr_matrix: Correlation matrix
+        method: Correlation method, for the title
+    """
+    from ._plotting import seaborn
+    sns = seaborn()
+    mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+    sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm',
+                center=0, square=True, fmt='.2f', ax=ax)
+    ax.set_title(f'{method.capitalize()} Correlation Matrix')
+
+
+def draw_bar_panels(fig, df: pd.DataFrame, panels: Sequence[Dict[str, Any]], ncols: int = 3) -> None:
+    """
+    Draw a grid of labelled bar charts sharing the frame's index (e.g. wards).
+
+    Args:
+        fig: Matplotlib figure
+        df: DataFrame indexed by the bar labels, one column per panel
+        panels: Per panel: 'column', and optionally 'title', 'ylabel',
+            'color' and 'fmt' (value label format, default '{:.0f}')
+        ncols: Panels per row
+    """
+    nrows = (len(panels) + ncols - 1) // ncols
+    axes = fig.subplots(nrows, ncols, squeeze=False).flatten()
+    labels = df.index.astype(str)
+
+    for ax, panel in zip(axes, panels):
+        values = df[panel['column']]
+        bars = ax.bar(labels, values, color=panel.get('color'), alpha=0.7)
+        ax.set_title(panel.get('title', panel['column']), fontsize=12, fontweight='bold')
+        ax.set_xlabel(df.index.name or '')
+        ax.set_ylabel(panel.get('ylabel', ''))
+        ax.grid(True, alpha=0.3)
+
+        # Add value labels on bars
+        fmt = panel.get('fmt', '{:.0f}')
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
+                    fmt.format(height), ha='center', va='bottom', fontsize=9)
+
+    for ax in axes[len(panels):]:
+        ax.set_visible(False)
+
+
+def _story(fig, data, **options):
+    draw_story_chart(fig.add_subplot(), data, **options)
+
+
+def _correlation(fig, data, method: str = 'pearson'):
+    draw_correlation(fig.add_subplot(), data, method)
+
+
+# Chart kind -> function drawing ``data`` on an empty figure
+CHART_KINDS: Dict[str, Callable[..., None]] = {
+    'story': _story,
+    'distributions': draw_distributions,
+    'correlation': _correlation,
+    'bar_panels': draw_bar_panels,
+}
+
+
+class ChartSpec:
+    """
+    One chart of a batch.
+
+    ``kind`` is a name in ``CHART_KINDS`` or a module-level function
+    ``draw(fig, data, **options)`` (it must be importable by the worker
+    processes); the function's source is part of the chart's hash.
+    """
+
+    def __init__(self, name: str, data: Union[pd.DataFrame, pd.Series],
+                 kind: Union[str, Callable[..., None]] = 'story',
+                 figsize: Tuple[float, float] = (10, 6),
+                 style: Optional[str] = None, **options: Any):
+        """
+        Args:
+            name: Output file name (without extension)
+            data: Data the chart is drawn from
+            kind: Chart kind or drawing function
+            figsize: Figure size in inches
+            style: Matplotlib style (default: 'seaborn-v0_8' for story
+                charts, matplotlib's default otherwise)
+            **options: Keyword arguments of the drawing function, e.g.
+                ``column`` and ``chart_type`` for story charts
+        """
+        if isinstance(kind, str) and kind not in CHART_KINDS:
+            raise ValueError(f"Unknown chart kind {kind!r}; use {', '.join(CHART_KINDS)} or a function")
+        self.name = name
+        self.data = data
+        self.kind = kind
+        self.figsize = tuple(figsize)
+        self.style = style if style is not None else ('seaborn-v0_8' if kind == 'story' else 'default')
+        self.options = options
+
+    def draw_function(self) -> Callable[..., None]:
+        return CHART_KINDS[self.kind] if isinstance(self.kind, str) else self.kind
+
+    def spec_hash(self, data_hashes: Optional[Dict[int, str]] = None) -> str:
+        """
+        Hash of the data, the options and the drawing code.
+
+        Args:
+            data_hashes: Cache of data hashes by object id, for specs that
+                share a frame
+        """
+        data_hashes = {} if data_hashes is None else data_hashes
+        if id(self.data) not in data_hashes:
+            data = self.data.to_frame() if isinstance(self.data, pd.Series) else self.data
+            data_hashes[id(self.data)] = frame_hash(data, index=True)
+        kind = self.kind if isinstance(self.kind, str) else f'{self.kind.__module__}.{self.kind.__qualname__}'
+        digest = hashlib.sha256(json.dumps([kind, self.figsize, self.style, self.options],
+                                           sort_keys=True, default=repr).encode())
+        digest.update(data_hashes[id(self.data)].encode())
+        digest.update(inspect.getsource(self.draw_function()).encode())
+        return digest.hexdigest()
+
+
+def _code_hash() -> str:
+    """Hash of this module (the built-in drawing functions)."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def _init_worker() -> None:
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _render_group(jobs: List[Tuple[ChartSpec, List[Tuple[Path, str]]]], dpi: int) -> List[Tuple[str, str]]:
+    """
+    Draw a group of charts on one reused figure and save every format.
+
+    Returns:
+        (file name, hash) of each written file
+    """
+    import matplotlib
+    from matplotlib import style
+    from matplotlib.figure import Figure
+
+    written = []
+    fig = None
+    for spec, targets in jobs:
+        with style.context(spec.style):
+            if fig is None:
+                fig = Figure()
+            else:
+                fig.clear()
+            fig.set_size_inches(spec.figsize)
+            fig.set_facecolor(matplotlib.rcParams['figure.facecolor'])
+            spec.draw_function()(fig, spec.data, **spec.options)
+            fig.tight_layout()
+            for path, digest in targets:
+                fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+                os.close(fd)
+                try:
+                    fig.savefig(tmp, format=path.suffix[1:], dpi=dpi, bbox_inches='tight')
+                    os.replace(tmp, path)
+                except BaseException:
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    raise
+                written.append((path.name, digest))
+    return written
+
+
+def render_charts(specs: Sequence[ChartSpec],
+                  formats: Union[str, List[str]] = 'png',
+                  output_dir: Union[str, Path, None] = None,
+                  dpi: Optional[int] = None,
+                  skip_unchanged: bool = True,
+                  jobs: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Render a batch of charts to files, headless and in parallel.
+
+    Args:
+        specs: Charts to render (names must be unique)
+        formats: Format or list of formats ('png', 'svg', 'pdf')
+        output_dir: Target directory (default: the figures directory)
+        dpi: Resolution of raster formats (default: the configured DPI)
+        skip_unchanged: Skip files whose data and spec hash is unchanged
+        jobs: Worker processes (default: one per CPU; 1 renders in this
+            process)
+
+    Returns:
+        Dictionary of chart name -> {format: path}
+    """
+    formats = [formats] if isinstance(formats, str) else list(formats)
+    unknown = [fmt for fmt in formats if fmt not in CHART_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown format(s) {', '.join(unknown)}; use {', '.join(CHART_FORMATS)}")
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("Chart names must be unique")
+    dpi = dpi or DPI
+    chart_dir = Path(output_dir) if output_dir is not None else FIGURES_DIR
+    chart_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = chart_dir / CHART_MANIFEST
+    previous = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    hashes = dict(previous)
+
+    results = {spec.name: {} for spec in specs}
+    code = _code_hash()
+    data_hashes: Dict[int, str] = {}
+    todo = []
+    skipped = 0
+    for spec in specs:
+        base = spec.spec_hash(data_hashes)
+        targets = []
+        for fmt in formats:
+            path = chart_dir / f'{spec.name}.{fmt}'
+            results[spec.name][fmt] = str(path)
+            digest = hashlib.sha256(f'{base}:{code}:{fmt}:{dpi}'.encode()).hexdigest()
+            if skip_unchanged and previous.get(path.name) == digest and path.exists():
+                skipped += 1
+            else:
+                targets.append((path, digest))
+        if targets:
+            todo.append((spec, targets))
+
+    workers = min(len(todo), jobs or os.cpu_count() or 1)
+    written, error = [], None
+    if workers > 1:
+        # One group per worker, so each worker reuses a single figure
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_render_group, todo[i::workers], dpi) for i in range(workers)]
+            for future in futures:
+                try:
+                    written.extend(future.result())
+                except Exception as exc:
+                    error = error or exc
+    elif todo:
+        from ._plotting import pyplot
+        pyplot()  # selects the Agg backend when headless
+        written = _render_group(todo, dpi)
+
+    # Record what was written even if another group failed
+    hashes.update(written)
+    if hashes != previous:
+        fd, tmp = tempfile.mkstemp(dir=chart_dir, prefix=f'.{CHART_MANIFEST}.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(hashes, handle, indent=2, sort_keys=True)
+        os.replace(tmp, manifest_path)
+    if error is not None:
+        raise error
+
+    print(f"📊 Rendered {len(written)} chart file(s) to {chart_dir} ({skipped} unchanged, skipped)")
+    return results
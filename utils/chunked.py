@@ -0,0 +1,386 @@
+"""
+Chunked Summaries
+
+Out-of-core versions of ``quick_summary_table``, ``data_fact_check`` and
+``detect_outliers`` for files larger than memory.
+
+A source (CSV, Parquet file or directory, the incident store or a pyarrow
+Dataset) is read in batches of ``chunk_size`` rows and only per-batch
+partial results are kept: grouped sums, counts, minima and maxima are
+combined across batches, means and standard deviations are merged from
+per-batch moments, and value counts are merged while a column has at most
+``MAX_TRACKED_VALUES`` distinct values. Quantiles come from those exact
+counts, or for high-cardinality numeric columns from a second pass that
+fills a ``HISTOGRAM_BINS``-bin histogram between the column's minimum and
+maximum (error below one bin width).
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from pathlib import Path
+
+from .dataset_profile import DatasetProfile, _is_numeric, _tally, _weighted_quantiles, QUANTILES
+from .incident_store import MANIFEST_NAME, iter_incidents, standardize_columns
+from .schema import csv_dtypes, to_pandas
+
+DEFAULT_CHUNK_SIZE = 250_000
+MAX_TRACKED_VALUES = 100_000
+HISTOGRAM_BINS = 2**16
+
+Source = Union[str, Path, ds.Dataset]
+
+# Per-batch aggregation -> how the partial results are combined
+_COMBINE = {'sum': 'sum', 'count': 'sum', 'min': 'min', 'max': 'max'}
+
+
+def _arrow_format(path: Path) -> str:
+    return 'ipc' if path.suffix in ('.feather', '.arrow') else 'parquet'
+
+
+def _csv_names(path: Path) -> Dict[str, str]:
+    """Raw CSV header -> standardized column name."""
+    header = pd.read_csv(path, nrows=0).columns
+    return dict(zip(header, standardize_columns(pd.DataFrame(columns=header)).columns))
+
+
+def source_columns(source: Source) -> List[str]:
+    """
+    Column names of a source, read from its schema or header only.
+
+    Args:
+        source: CSV / Parquet / Feather path, Parquet directory, incident
+            store directory or pyarrow Dataset
+
+    Returns:
+        List of column names
+    """
+    if isinstance(source, ds.Dataset):
+        return list(source.schema.names)
+    path = Path(source)
+    if path.is_dir() and (path / MANIFEST_NAME).exists():
+        from .incident_store import incident_dataset
+        return [name for name in incident_dataset(path).schema.names if not name.startswith('_')]
+    if path.is_dir() or path.suffix in ('.parquet', '.feather', '.arrow'):
+        return list(ds.dataset(path, format=_arrow_format(path),
+                               partitioning='hive' if path.is_dir() else None).schema.names)
+    return list(_csv_names(path).values())
+
+
+def iter_chunks(source: Source, columns: Optional[Sequence[str]] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Read a source in DataFrame chunks of at most ``chunk_size`` rows.
+
+    Incident columns get their registry dtypes and CSV headers are
+    standardized (e.g. ``REPORT_DAT`` -> ``REPORT_DATE``). An incident
+    store directory is read like ``load_incidents`` (feed rows replace
+    yearly rows).
+
+    Args:
+        source: CSV (optionally compressed), Parquet or Feather path,
+            Parquet directory, incident store directory or pyarrow Dataset
+        columns: Columns to read; None reads all
+        chunk_size: Maximum rows per chunk
+
+    Yields:
+        pandas DataFrames
+    """
+    columns = None if columns is None else list(columns)
+    if not isinstance(source, ds.Dataset):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"No data at {path}")
+        if path.is_dir() and (path / MANIFEST_NAME).exists():
+            yield from iter_incidents(columns, batch_size=chunk_size, store_dir=path)
+            return
+        if not (path.is_dir() or path.suffix in ('.parquet', '.feather', '.arrow')):
+            yield from _csv_chunks(path, columns, chunk_size)
+            return
+        if path.suffix == '.parquet':
+            # Decodes one row group at a time (the dataset scanner reads ahead)
+            batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+        else:
+            source = ds.dataset(path, format=_arrow_format(path),
+                                partitioning='hive' if path.is_dir() else None)
+    if isinstance(source, ds.Dataset):
+        batches = source.to_batches(columns=columns, batch_size=chunk_size,
+                                    batch_readahead=1, fragment_readahead=1)
+
+    for batch in batches:
+        if batch.num_rows:
+            yield to_pandas(pa.Table.from_batches([batch]))
+
+
+def _csv_chunks(path: Path, columns: Optional[List[str]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    names = _csv_names(path)
+    usecols = None
+    if columns is not None:
+        unknown = set(columns) - set(names.values())
+        if unknown:
+            raise KeyError(f"Column(s) not in {path.name}: {', '.join(sorted(unknown))}")
+        usecols = [raw for raw, name in names.items() if name in columns]
+    reader = pd.read_csv(path, dtype=csv_dtypes(names), usecols=usecols, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            chunk = chunk.rename(columns=names)
+            yield chunk if columns is None else chunk[columns]
+
+
+def chunked_summary_table(source: Source, group_by: str, aggregate_cols: List[str],
+                          agg_func: str = 'sum',
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Grouped aggregation of a source, combined across chunks.
+
+    Only ``group_by`` and ``aggregate_cols`` are read. Memory holds one
+    chunk plus one partial row per group.
+
+    Args:
+        source: Source accepted by ``iter_chunks``
+        group_by: Column to group by
+        aggregate_cols: Columns to aggregate
+        agg_func: 'sum', 'mean', 'count', 'max', 'min'
+        chunk_size: Rows per chunk
+
+    Returns:
+        DataFrame indexed by ``group_by``, sorted by the first aggregate
+        column (descending)
+    """
+    if agg_func not in ('mean', *_COMBINE):
+        raise ValueError("agg_func must be 'sum', 'mean', 'count', 'max' or 'min'")
+    partial_funcs = ['sum', 'count'] if agg_func == 'mean' else [agg_func]
+    columns = list(dict.fromkeys([group_by] + list(aggregate_cols)))
+
+    # Partial aggregate -> DataFrame indexed by group
+    combined: Dict[str, pd.DataFrame] = {}
+    for chunk in iter_chunks(source, columns, chunk_size):
+        key = chunk[group_by]
+        if isinstance(key.dtype, pd.CategoricalDtype):
+            # Categories differ between chunks; combine on the values
+            key = key.astype(key.cat.categories.dtype)
+        grouped = chunk[aggregate_cols].groupby(key)
+        for func in partial_funcs:
+            partial = grouped.agg(func)
+            if func in combined:
+                partial = pd.concat([combined[func], partial]).groupby(level=0).agg(_COMBINE[func])
+            combined[func] = partial
+
+    if not combined:
+        return pd.DataFrame(columns=aggregate_cols, index=pd.Index([], name=group_by))
+    if agg_func == 'mean':
+        summary = combined['sum'] / combined['count']
+    else:
+        summary = combined[agg_func]
+    summary.index.name = group_by
+    return summary.sort_values(summary.columns[0], ascending=False)
+
+
+class _ColumnAccumulator:
+    """Statistics of one column merged across chunks."""
+
+    def __init__(self, name: str, dtype):
+        self.name = name
+        self.dtype = dtype
+        self.numeric = _is_numeric(dtype)
+        self.missing = 0
+        self.n = 0
+        self.counts: Optional[pd.Series] = None
+        self.tracked = True
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.zeros = 0
+        self.negatives = 0
+        self.histogram: Optional[np.ndarray] = None
+
+    def update(self, series: pd.Series) -> np.ndarray:
+        """Add one chunk of the column; returns its missing-value mask."""
+        uniques, counts, mask, _ = _tally(series, need_codes=False)
+        self.missing += int(mask.sum())
+        observed = counts > 0
+        counts = counts[observed]
+        if isinstance(uniques, pd.CategoricalIndex):
+            uniques = pd.Index(uniques.to_numpy())
+        uniques = uniques[observed]
+        n = int(counts.sum())
+
+        if self.tracked:
+            chunk = pd.Series(counts, index=uniques)
+            self.counts = chunk if self.counts is None else self.counts.add(chunk, fill_value=0)
+            if len(self.counts) > MAX_TRACKED_VALUES:
+                self.counts, self.tracked = None, False
+
+        if self.numeric and n:
+            values = uniques.to_numpy(dtype=np.float64)
+            mean = float(np.dot(values, counts) / n)
+            m2 = float(np.dot(counts, (values - mean) ** 2))
+            # Chan et al. parallel update of the mean and sum of squares
+            total = self.n + n
+            delta = mean - self.mean
+            self.mean += delta * n / total
+            self.m2 += m2 + delta ** 2 * self.n * n / total
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.zeros += int(counts[values == 0].sum())
+            self.negatives += int(counts[values < 0].sum())
+        self.n += n
+        return mask
+
+    @property
+    def needs_histogram(self) -> bool:
+        return self.numeric and not self.tracked and self.n > 0
+
+    def add_to_histogram(self, series: pd.Series) -> None:
+        """Second pass: count the chunk's values into fine bins."""
+        if self.histogram is None:
+            self.histogram = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        width = (self.max - self.min) or 1.0
+        bins = ((values - self.min) * (HISTOGRAM_BINS / width)).astype(np.int64)
+        np.clip(bins, 0, HISTOGRAM_BINS - 1, out=bins)
+        self.histogram += np.bincount(bins, minlength=HISTOGRAM_BINS)
+
+    def _histogram_quantiles(self) -> List[float]:
+        """Quantiles from the histogram, spreading each bin's values evenly."""
+        width = (self.max - self.min) / HISTOGRAM_BINS
+        ends = np.cumsum(self.histogram)
+
+        def value_at(rank: int) -> float:
+            b = int(np.searchsorted(ends, rank, side='right'))
+            before = ends[b] - self.histogram[b]
+            return self.min + width * (b + (rank - before + 0.5) / self.histogram[b])
+
+        result = []
+        for q in QUANTILES:
+            position = (self.n - 1) * q
+            lo, hi = int(np.floor(position)), int(np.ceil(position))
+            v_lo, v_hi = value_at(lo), value_at(hi)
+            result.append(float(np.clip(v_lo + (position - lo) * (v_hi - v_lo), self.min, self.max)))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Merged statistics in the layout of ``dataset_profile._column_stats``."""
+        stats: Dict[str, Any] = {'unique': len(self.counts) if self.tracked else None}
+        if self.tracked and self.n:
+            top = self.counts.idxmax()
+            stats.update(top=top, freq=int(self.counts[top]))
+        if self.numeric and self.n:
+            if self.tracked:
+                ordered = self.counts.sort_index()
+                q25, q50, q75 = _weighted_quantiles(ordered.index.to_numpy(dtype=np.float64),
+                                                    ordered.to_numpy(), QUANTILES)
+            elif self.histogram is not None:
+                q25, q50, q75 = self._histogram_quantiles()
+            else:
+                q25 = q50 = q75 = np.nan
+            stats.update(mean=self.mean, std=np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan,
+                         min=self.min, q25=q25, median=q50, q75=q75, max=self.max,
+                         zeros=self.zeros, negatives=self.negatives)
+        return stats
+
+    def value_counts(self) -> pd.Series:
+        counts = self.counts.astype('int64').rename('count')
+        counts.index.name = self.name
+        return counts
+
+
+def profile_source(source: Source, columns: Optional[Sequence[str]] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   duplicates: bool = True) -> DatasetProfile:
+    """
+    Profile a source too large to load, one chunk at a time.
+
+    Produces the same ``DatasetProfile`` as ``profile_dataset``. Value
+    counts (distinct / top values, exact quantiles) are kept only for
+    columns with at most ``MAX_TRACKED_VALUES`` distinct values; the
+    quartiles of other numeric columns come from a second, histogram pass
+    and their distinct count is None.
+
+    Args:
+        source: Source accepted by ``iter_chunks``
+        columns: Columns to profile; None profiles all
+        chunk_size: Rows per chunk
+        duplicates: Count duplicate rows from 64-bit row hashes (keeps 8
+            bytes per distinct row; 0 is reported when False)
+
+    Returns:
+        DatasetProfile
+    """
+    accumulators: Dict[str, _ColumnAccumulator] = {}
+    dtypes = None
+    n_rows = memory_bytes = empty_rows = 0
+    row_hashes = []
+
+    for chunk in iter_chunks(source, columns, chunk_size):
+        if dtypes is None:
+            dtypes = chunk.dtypes
+            accumulators = {col: _ColumnAccumulator(col, dtype) for col, dtype in dtypes.items()}
+        empty = np.ones(len(chunk), dtype=bool)
+        for col, accumulator in accumulators.items():
+            empty &= accumulator.update(chunk[col])
+        n_rows += len(chunk)
+        empty_rows += int(empty.sum())
+        memory_bytes += int(chunk.memory_usage(index=False, deep=True).sum())
+        if duplicates:
+            row_hashes.append(pd.unique(pd.util.hash_pandas_object(chunk, index=False).to_numpy()))
+
+    if dtypes is None:
+        raise ValueError(f"No rows in {source}")
+
+    histogram_cols = [col for col, accumulator in accumulators.items() if accumulator.needs_histogram]
+    if histogram_cols:
+        for chunk in iter_chunks(source, histogram_cols, chunk_size):
+            for col in histogram_cols:
+                accumulators[col].add_to_histogram(chunk[col])
+
+    duplicate_rows = n_rows - len(pd.unique(np.concatenate(row_hashes))) if duplicates else 0
+    return DatasetProfile(n_rows=n_rows, dtypes=dtypes, memory_bytes=memory_bytes,
+                          counts={col: acc.value_counts() for col, acc in accumulators.items() if acc.tracked},
+                          missing={col: acc.missing for col, acc in accumulators.items()},
+                          duplicate_rows=duplicate_rows, empty_rows=empty_rows,
+                          stats={col: acc.stats() for col, acc in accumulators.items()})
+
+
+def chunked_outliers(source: Source, columns: Optional[List[str]] = None, method: str = 'iqr',
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, List[int]]:
+    """
+    ``detect_outliers`` over a source, one chunk at a time.
+
+    The bounds come from ``profile_source`` (quartiles or mean and
+    standard deviation); a final pass collects the outlying rows.
+
+    Args:
+        source: Source accepted by ``iter_chunks``
+        columns: Numeric columns to check (default: all numeric columns)
+        method: 'iqr' or 'zscore'
+        chunk_size: Rows per chunk
+
+    Returns:
+        Dictionary of column -> row positions (0-based, in reading order)
+    """
+    if method not in ('iqr', 'zscore'):
+        raise ValueError("method must be 'iqr' or 'zscore'")
+    if columns is None:
+        first = next(iter_chunks(source, chunk_size=1000), None)
+        columns = [] if first is None else first.select_dtypes(include=[np.number]).columns.tolist()
+    if not columns:
+        return {}
+
+    profile = profile_source(source, columns, chunk_size, duplicates=False)
+    bounds = {col: profile.outlier_bounds(col, method) for col in columns}
+
+    outliers = {col: [] for col in columns}
+    offset = 0
+    for chunk in iter_chunks(source, columns, chunk_size):
+        for col, (lower, upper) in bounds.items():
+            values = chunk[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            positions = np.flatnonzero((values < lower) | (values > upper)) + offset
+            outliers[col].extend(positions.tolist())
+        offset += len(chunk)
+    return outliers
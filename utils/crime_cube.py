@@ -0,0 +1,225 @@
+"""
+Crime Cube
+
+Materialized incident counts over ward x year x month x offense x
+method x shift.
+
+The cube is built in one pass over the incidents and stored as a small
+Parquet file; offense/year tables, ward breakdowns and totals rows are
+then roll-ups of the cube rather than fresh scans of the incidents.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Callable, List, Optional, Sequence, Union
+from pathlib import Path
+
+from ._config import INCIDENT_STORE_DIR, PROCESSED_DATA_DIR, RAW_DATA_DIR
+
+CUBE_DIMENSIONS = ['WARD', 'YEAR', 'MONTH', 'OFFENSE', 'METHOD', 'SHIFT']
+# Dimensions derived from the date column rather than read from it
+DATE_PARTS = {'MONTH': 'month', 'DAY': 'day', 'HOUR': 'hour', 'DAYOFWEEK': 'dayofweek'}
+COUNT_COLUMN = 'COUNT'
+CUBE_FILE = PROCESSED_DATA_DIR / 'crime_cube.parquet'
+
+Filter = Union[object, Sequence[object]]
+
+
+def _as_dimension(series: pd.Series) -> pd.Series:
+    """Encode a dimension column as a categorical (integral floats as ints)."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = series.dropna()
+        if (values % 1 == 0).all():
+            series = series.astype('Int16')
+    return series.astype('category')
+
+
+class CrimeCube:
+    """
+    Incident counts for every observed combination of the cube dimensions.
+
+    Missing dimension values (e.g. incidents without a ward) are kept as
+    their own cells, so the cube total always equals the incident count;
+    roll-ups drop them like ``groupby`` does.
+    """
+
+    def __init__(self, counts: pd.DataFrame):
+        """
+        Args:
+            counts: One row per cell with the dimension columns and ``COUNT``
+        """
+        self.counts = counts
+        self.dimensions = [col for col in counts.columns if col != COUNT_COLUMN]
+
+    @classmethod
+    def from_incidents(cls, df: pd.DataFrame,
+                       dimensions: Sequence[str] = CUBE_DIMENSIONS,
+                       date_col: str = 'REPORT_DATE') -> 'CrimeCube':
+        """
+        Build the cube from incidents in a single groupby.
+
+        Args:
+            df: Incident DataFrame
+            dimensions: Dimension columns; MONTH, DAY, HOUR and DAYOFWEEK
+                are derived from ``date_col``
+            date_col: Datetime column for the derived dimensions
+
+        Returns:
+            CrimeCube
+        """
+        keys = []
+        for dim in dimensions:
+            if dim in DATE_PARTS and dim not in df.columns:
+                part = getattr(pd.to_datetime(df[date_col]).dt, DATE_PARTS[dim])
+                keys.append(part.astype('Int8').rename(dim))
+            else:
+                keys.append(df[dim])
+        counts = (df.groupby(keys, observed=True, dropna=False, sort=True)
+                  .size()
+                  .astype(np.int32)
+                  .rename(COUNT_COLUMN)
+                  .reset_index())
+        for dim in counts.columns.drop(COUNT_COLUMN):
+            counts[dim] = _as_dimension(counts[dim])
+        return cls(counts)
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = CUBE_FILE) -> 'CrimeCube':
+        """
+        Load a cube written by ``save``.
+
+        Args:
+            path: Parquet file path
+
+        Returns:
+            CrimeCube
+        """
+        counts = pd.read_parquet(path)
+        # Parquet only restores text categoricals; re-encode the code dimensions
+        for dim in counts.columns.drop(COUNT_COLUMN):
+            counts[dim] = _as_dimension(counts[dim])
+        return cls(counts)
+
+    def save(self, path: Union[str, Path] = CUBE_FILE) -> str:
+        """
+        Write the cube to a compressed Parquet file.
+
+        Args:
+            path: Parquet file path
+
+        Returns:
+            Path to the written file
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.counts.to_parquet(path, index=False, compression='zstd')
+        print(f"✅ Saved crime cube: {len(self.counts):,} cells, {self.total():,} incidents -> {path}")
+        return str(path)
+
+    def where(self, condition: Optional[Callable[[pd.DataFrame], pd.Series]] = None,
+              **filters: Filter) -> 'CrimeCube':
+        """
+        Slice the cube.
+
+        Keyword filters keep cells whose dimension equals a value or is in a
+        list of values (``OFFENSE='HOMICIDE'``, ``YEAR=['2024', '2025']``).
+        ``condition`` takes the cell frame and returns a boolean mask, for
+        selections that span dimensions, e.g. violent or gun crimes.
+
+        Args:
+            condition: Optional callable returning a mask over ``counts``
+            **filters: Dimension -> value or list of values
+
+        Returns:
+            New CrimeCube with the matching cells
+        """
+        mask = np.ones(len(self.counts), dtype=bool)
+        for dim, value in filters.items():
+            if dim not in self.dimensions:
+                raise KeyError(f"'{dim}' is not a cube dimension ({', '.join(self.dimensions)})")
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.counts[dim].isin(values).to_numpy()
+        if condition is not None:
+            mask &= np.asarray(condition(self.counts), dtype=bool)
+        return CrimeCube(self.counts[mask].reset_index(drop=True))
+
+    def total(self) -> int:
+        """Total number of incidents in the cube."""
+        return int(self.counts[COUNT_COLUMN].sum())
+
+    def rollup(self, by: Union[str, List[str]], unstack: Optional[str] = None,
+               row_total: Optional[str] = None,
+               column_total: Optional[str] = None) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Sum the cube over every dimension not in ``by``.
+
+        Equivalent to ``incidents.groupby(by).size()`` (optionally followed
+        by ``.unstack(fill_value=0)``) on the incidents the cube was built from.
+
+        Args:
+            by: Dimension(s) to keep
+            unstack: Optional dimension in ``by`` to pivot into columns
+            row_total: Label of a totals row to append (tables only)
+            column_total: Label of a totals column to append (tables only)
+
+        Returns:
+            Series of counts indexed by ``by``, or a table when ``unstack``
+            is given
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        cells = self.counts.dropna(subset=by)
+        result = cells.groupby(by, observed=True, sort=True)[COUNT_COLUMN].sum().astype(np.int64)
+        # Plain (non-categorical) labels, as a groupby on the incidents would give
+        flat = result.reset_index()
+        for dim in by:
+            if isinstance(flat[dim].dtype, pd.CategoricalDtype):
+                flat[dim] = flat[dim].astype(flat[dim].cat.categories.dtype)
+        result = flat.set_index(by)[COUNT_COLUMN]
+        if unstack is None:
+            if row_total or column_total:
+                raise ValueError("row_total and column_total need unstack")
+            return result
+
+        table = result.unstack(unstack, fill_value=0)
+        table.columns.name = unstack
+        if column_total:
+            table[column_total] = table.sum(axis=1)
+        if row_total:
+            totals = table.sum(axis=0).to_frame(row_total).T
+            table = pd.concat([table, totals])
+        return table
+
+
+def build_crime_cube(years: Optional[Sequence[Union[int, str]]] = None,
+                     dimensions: Sequence[str] = CUBE_DIMENSIONS,
+                     path: Optional[Union[str, Path]] = CUBE_FILE,
+                     refresh: bool = True,
+                     raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                     store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> CrimeCube:
+    """
+    Build the crime cube from the incident store and save it.
+
+    Only the dimension and date columns are read from the store.
+
+    Args:
+        years: Years to include; None includes all
+        dimensions: Cube dimensions
+        path: Where to save the cube (None to skip saving)
+        refresh: Rebuild stale store partitions first
+        raw_dir: Directory containing the yearly source CSVs
+        store_dir: Root directory of the Parquet incident store
+
+    Returns:
+        CrimeCube
+    """
+    from .incident_store import load_incidents
+
+    columns = [dim for dim in dimensions if dim not in DATE_PARTS] + ['REPORT_DATE']
+    incidents = load_incidents(years=years, columns=list(dict.fromkeys(columns)),
+                               refresh=refresh, raw_dir=raw_dir, store_dir=store_dir)
+    cube = CrimeCube.from_incidents(incidents, dimensions)
+    if path is not None:
+        cube.save(path)
+    return cube
@@ -6,51 +6,55 @@ Common functions for data analysis and preprocessing.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, Union
+from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from ._plotting import pyplot
+from .dataset_profile import DatasetProfile, profile_dataset
+from .sketches import SketchSet
+from .dates import LOCAL_TIMEZONE, date_parts, parse_timestamps
 
-def quick_info(df: pd.DataFrame) -> None:
+
+def quick_info(df: pd.DataFrame, profile: Optional[DatasetProfile] = None) -> None:
     """
     Display quick information about a DataFrame.
     
     Args:
         df: pandas DataFrame
+        profile: Profile from ``profile_dataset(df)`` to reuse (computed
+            if None)
     """
+    if profile is None:
+        profile = profile_dataset(df)
     print("=" * 50)
     print("DATASET OVERVIEW")
     print("=" * 50)
     print(f"Shape: {df.shape}")
-    print(f"Memory usage: {df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+    print(f"Memory usage: {profile.memory_bytes / 1024**2:.2f} MB")
+    print(f"Duplicate rows: {profile.duplicate_rows:,}")
     print("\nColumn Types:")
-    print(df.dtypes.value_counts())
+    print(profile.dtypes.value_counts())
     
     print("\n" + "=" * 50)
     print("MISSING VALUES")
     print("=" * 50)
-    missing = df.isnull().sum()
-    missing_pct = 100 * missing / len(df)
-    missing_table = pd.DataFrame({
-        'Missing_Count': missing,
-        'Missing_Percentage': missing_pct
-    })
-    missing_table = missing_table[missing_table['Missing_Count'] > 0]
+    missing_table = profile.missing_table()
     if len(missing_table) > 0:
-        print(missing_table.sort_values('Missing_Count', ascending=False))
+        print(missing_table)
     else:
         print("No missing values found!")
     
     print("\n" + "=" * 50)
     print("BASIC STATISTICS")
     print("=" * 50)
-    print(df.describe())
+    print(profile.describe())
 
 
 def plot_distributions(df: pd.DataFrame, numeric_cols: Optional[List[str]] = None, 
-                      figsize: Tuple[int, int] = (15, 10)) -> None:
+                      figsize: Tuple[int, int] = (15, 10),
+                      save_path: Optional[str] = None, show: bool = True) -> None:
     """
     Plot distributions of numeric columns.
     
@@ -58,80 +62,98 @@ def plot_distributions(df: pd.DataFrame, numeric_cols: Optional[List[str]] = Non
         df: pandas DataFrame
         numeric_cols: List of numeric columns to plot
         figsize: Figure size tuple
+        save_path: Save the figure to this file (optional)
+        show: Display the figure; otherwise it is only saved and closed
     """
-    if numeric_cols is None:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-    
-    n_cols = min(3, len(numeric_cols))
-    n_rows = (len(numeric_cols) + n_cols - 1) // n_cols
-    
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=figsize)
-    if n_rows == 1 and n_cols == 1:
-        axes = [axes]
-    elif n_rows == 1:
-        axes = axes
-    else:
-        axes = axes.flatten()
-    
-    for i, col in enumerate(numeric_cols):
-        if i < len(axes):
-            df[col].hist(bins=30, ax=axes[i], alpha=0.7, edgecolor='black')
-            axes[i].set_title(f'Distribution of {col}')
-            axes[i].set_xlabel(col)
-            axes[i].set_ylabel('Frequency')
-    
-    # Hide empty subplots
-    for j in range(len(numeric_cols), len(axes)):
-        axes[j].set_visible(False)
-    
+    from .charts import draw_distributions
+
+    plt = pyplot()
+    fig = plt.figure(figsize=figsize)
+    draw_distributions(fig, df, numeric_cols)
     plt.tight_layout()
-    plt.show()
+    _finish_figure(plt, fig, save_path, show)
 
 
-def correlation_analysis(df: pd.DataFrame, method: str = 'pearson', 
-                        figsize: Tuple[int, int] = (10, 8)) -> pd.DataFrame:
+def correlation_analysis(df: Union[pd.DataFrame, SketchSet], method: str = 'pearson', 
+                        figsize: Tuple[int, int] = (10, 8),
+                        save_path: Optional[str] = None, show: bool = True) -> pd.DataFrame:
     """
     Perform correlation analysis on numeric columns.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, or a ``SketchSet`` (Pearson only, from the
+            merged co-moments)
         method: Correlation method ('pearson', 'spearman', 'kendall')
         figsize: Figure size tuple
+        save_path: Save the heatmap to this file (optional)
+        show: Display the heatmap; otherwise it is only saved and closed
         
     Returns:
         Correlation matrix
     """
-    numeric_df = df.select_dtypes(include=[np.number])
-    corr_matrix = numeric_df.corr(method=method)
+    from .charts import draw_correlation
+
+    if isinstance(df, SketchSet):
+        if method != 'pearson':
+            raise ValueError("Sketches give the Pearson correlation only")
+        corr_matrix = df.correlation()
+    else:
+        numeric_df = df.select_dtypes(include=[np.number])
+        corr_matrix = numeric_df.corr(method=method)
     
-    plt.figure(figsize=figsize)
-    mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-    sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', 
-                center=0, square=True, fmt='.2f')
-    plt.title(f'{method.capitalize()} Correlation Matrix')
+    plt = pyplot()
+    fig, ax = plt.subplots(figsize=figsize)
+    draw_correlation(ax, corr_matrix, method)
     plt.tight_layout()
-    plt.show()
+    _finish_figure(plt, fig, save_path, show)
     
     return corr_matrix
 
 
-def detect_outliers(df: pd.DataFrame, columns: Optional[List[str]] = None,
-                   method: str = 'iqr') -> Dict[str, List[int]]:
+def _finish_figure(plt, fig, save_path: Optional[str], show: bool) -> None:
+    """Save the figure if requested, then show or close it."""
+    if save_path:
+        fig.savefig(save_path, dpi=300, bbox_inches='tight')
+        print(f"📊 Chart saved as: {save_path}")
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+
+
+def detect_outliers(df: Union[pd.DataFrame, str, Path], columns: Optional[List[str]] = None,
+                   method: str = 'iqr', chunk_size: int = 250_000,
+                   sketches: Optional[SketchSet] = None) -> Dict[str, List[int]]:
     """
     Detect outliers using IQR or Z-score method.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, or a CSV / Parquet path, incident store
+            directory or pyarrow Dataset to stream in chunks (see
+            ``chunked.chunked_outliers``)
         columns: List of columns to check
         method: 'iqr' or 'zscore'
+        chunk_size: Rows per chunk when streaming
+        sketches: Take the bounds from these sketches (e.g. the full
+            history from ``load_sketches``) and only flag the rows of ``df``
         
     Returns:
         Dictionary with column names as keys and outlier indices as values
+        (row positions when streaming)
     """
+    if not isinstance(df, pd.DataFrame):
+        from .chunked import chunked_outliers
+        return chunked_outliers(df, columns, method, chunk_size)
     if columns is None:
         columns = df.select_dtypes(include=[np.number]).columns.tolist()
     
     outliers = {}
+    if sketches is not None:
+        profile = sketches.profile()
+        for col in columns:
+            lower_bound, upper_bound = profile.outlier_bounds(col, method)
+            outliers[col] = df[(df[col] < lower_bound) | (df[col] > upper_bound)].index.tolist()
+        return outliers
     
     for col in columns:
         if method == 'iqr':
@@ -170,51 +192,103 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     return df_cleaned
 
 
-def memory_optimization(df: pd.DataFrame) -> pd.DataFrame:
+def memory_optimization(df: pd.DataFrame, categorical_threshold: float = 0.5,
+                        verbose: bool = True) -> pd.DataFrame:
     """
     Optimize DataFrame memory usage by converting to optimal dtypes.
     
+    Integers are downcast to the smallest type that holds their range,
+    floats to float32, repeated text to categoricals, other text to
+    Arrow-backed strings, and categoricals drop unused categories. The
+    result is assembled from the converted columns without copying the
+    untouched ones.
+    
     Args:
         df: pandas DataFrame
+        categorical_threshold: Convert text columns whose ratio of unique
+            values to rows is below this to categoricals
+        verbose: Print the bytes saved per column
         
     Returns:
         Memory optimized DataFrame
     """
-    df_optimized = df.copy()
-    
-    for col in df_optimized.columns:
-        col_type = df_optimized[col].dtype
+    columns = {}
+    for col in df.columns:
+        series = df[col]
+        col_type = series.dtype
         
-        if col_type != 'object':
-            c_min = df_optimized[col].min()
-            c_max = df_optimized[col].max()
-            
-            if str(col_type)[:3] == 'int':
-                if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                    df_optimized[col] = df_optimized[col].astype(np.int8)
-                elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                    df_optimized[col] = df_optimized[col].astype(np.int16)
-                elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                    df_optimized[col] = df_optimized[col].astype(np.int32)
-                    
-            elif str(col_type)[:5] == 'float':
-                if c_min > np.finfo(np.float32).min and c_max < np.finfo(np.float32).max:
-                    df_optimized[col] = df_optimized[col].astype(np.float32)
+        if isinstance(col_type, pd.CategoricalDtype):
+            series = series.cat.remove_unused_categories()
+        elif pd.api.types.is_bool_dtype(col_type):
+            pass
+        elif pd.api.types.is_integer_dtype(col_type):
+            series = pd.to_numeric(series, downcast='integer')
+        elif pd.api.types.is_float_dtype(col_type):
+            c_min, c_max = series.min(), series.max()
+            if pd.isna(c_min) or (c_min > np.finfo(np.float32).min and c_max < np.finfo(np.float32).max):
+                series = series.astype(np.float32)
+        elif col_type == object or isinstance(col_type, pd.StringDtype):
+            if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+                n_unique = series.nunique(dropna=True)
+                if len(series) and n_unique / len(series) < categorical_threshold:
+                    series = series.astype('category')
+                else:
+                    series = series.astype('string[pyarrow]')
+        columns[col] = series
+    
+    df_optimized = pd.DataFrame(columns, index=df.index, copy=False)
+    
+    if verbose:
+        before = df.memory_usage(index=False, deep=True)
+        after = df_optimized.memory_usage(index=False, deep=True)
+        saved = (before - after).sort_values(ascending=False)
+        print(f"✅ Memory: {before.sum() / 1024**2:.2f} MB -> {after.sum() / 1024**2:.2f} MB "
+              f"({saved.sum() / 1024**2:.2f} MB saved)")
+        for col in saved.index[saved > 0]:
+            print(f"   {col}: {df[col].dtype} -> {df_optimized[col].dtype}, "
+                  f"{saved[col]:,} bytes saved")
     
     return df_optimized
 
 
-def create_date_features(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
+def create_date_features(df: pd.DataFrame, date_col: str, compact: bool = False,
+                         tz: Optional[str] = LOCAL_TIMEZONE,
+                         end_col: Optional[str] = None) -> pd.DataFrame:
     """
     Create date-based features from a datetime column.
     
+    The default mode copies the frame and adds int64 year/month/day/
+    weekday/quarter/ISO week columns. ``compact=True`` instead adds the
+    columns to ``df`` itself, derived in one pass over the timestamps as
+    nullable Int16 (year) / Int8 columns, plus the hour, the local-time
+    timestamps and, with ``end_col``, the incident duration.
+    
     Args:
         df: pandas DataFrame
         date_col: Name of the datetime column
+        compact: Add compact features in place instead of copying
+        tz: Time zone of the compact features and of the
+            ``{date_col}_local`` column (ignored for naive timestamps)
+        end_col: Datetime column ending the incident; adds
+            ``{date_col}_duration_hours`` (float32) in compact mode
         
     Returns:
         DataFrame with additional date features
     """
+    if compact:
+        for col in filter(None, (date_col, end_col)):
+            if not pd.api.types.is_datetime64_any_dtype(df[col]):
+                df[col] = parse_timestamps(df[col])
+        dates = df[date_col]
+        for part, values in date_parts(dates, tz=tz).items():
+            df[f'{date_col}_{part}'] = values
+        if tz is not None and dates.dt.tz is not None:
+            df[f'{date_col}_local'] = dates.dt.tz_convert(tz)
+        if end_col is not None:
+            seconds = (df[end_col] - dates).dt.total_seconds()
+            df[f'{date_col}_duration_hours'] = (seconds / 3600).astype('float32')
+        return df
+
     df_with_dates = df.copy()
     df_with_dates[date_col] = pd.to_datetime(df_with_dates[date_col])
     
@@ -228,33 +302,44 @@ def create_date_features(df: pd.DataFrame, date_col: str) -> pd.DataFrame:
     return df_with_dates
 
 
-def categorical_analysis(df: pd.DataFrame, cat_cols: Optional[List[str]] = None,
-                        max_categories: int = 20) -> None:
+def categorical_analysis(df: Union[pd.DataFrame, SketchSet], cat_cols: Optional[List[str]] = None,
+                        max_categories: int = 20,
+                        profile: Optional[DatasetProfile] = None) -> None:
     """
     Analyze categorical columns.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, or a ``SketchSet`` (estimated distinct counts
+            and the kept most frequent values)
         cat_cols: List of categorical columns
         max_categories: Maximum number of categories to display
+        profile: Profile from ``profile_dataset(df)`` to reuse (the
+            categorical columns are profiled if None)
     """
+    if isinstance(df, SketchSet):
+        profile = df.profile()
+        df = profile.schema()
     if cat_cols is None:
         cat_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    if profile is None or not set(cat_cols) <= set(profile.dtypes.index):
+        profile = profile_dataset(df, columns=cat_cols)
     
     for col in cat_cols:
         print(f"\n{'='*50}")
         print(f"ANALYSIS OF COLUMN: {col}")
         print(f"{'='*50}")
         
-        value_counts = df[col].value_counts()
-        print(f"Number of unique values: {df[col].nunique()}")
+        value_counts = profile.value_counts(col)
+        n_unique = profile.columns.at[col, 'unique']
+        print(f"Number of unique values: {n_unique}")
         print(f"Most frequent value: '{value_counts.index[0]}' ({value_counts.iloc[0]} occurrences)")
         
-        if df[col].nunique() <= max_categories:
+        if n_unique <= max_categories:
             print(f"\nValue counts:")
             print(value_counts)
             
             # Plot
+            plt = pyplot()
             plt.figure(figsize=(12, 6))
             value_counts.plot(kind='bar')
             plt.title(f'Distribution of {col}')
@@ -0,0 +1,309 @@
+"""
+Dataset Profile
+
+Single-pass column profiling behind ``quick_info``, ``data_fact_check`` and
+``categorical_analysis``.
+
+Each column is reduced once to its distinct values and their counts:
+numeric and datetime columns by one sort, categoricals from their codes
+and other columns by ``pd.factorize`` with ``np.bincount``. Every statistic (missing values,
+distinct and top values, min/max, mean, std, quantiles, zero and negative
+counts) is then derived from the small table of distinct values and their
+counts, and the same codes are combined into a row key for duplicate and
+empty-row counts. Profiling the frame therefore costs about one scan
+instead of separate ``isnull()``, ``describe()``, ``duplicated()``,
+``nunique()`` and ``value_counts()`` passes.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Above this the combined row key is re-factorized to stay within int64
+_MAX_KEY_SIZE = 2**62
+
+
+def _is_numeric(dtype) -> bool:
+    """Numeric for profiling purposes (booleans are counted like labels)."""
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _tally(series: pd.Series, need_codes: bool) -> Tuple[pd.Index, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    Distinct values of a column with their counts.
+
+    Numeric and datetime columns are sorted once (faster than hashing and
+    gives the distinct values in order); categoricals reuse their codes
+    and keep unused categories, like ``value_counts()``; other columns are
+    factorized.
+
+    Args:
+        series: Column
+        need_codes: Also return per-row codes (for the duplicate row key)
+
+    Returns:
+        Distinct values, their counts, the missing-value mask and the codes
+        (-1 for missing; None unless requested)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        counts = np.bincount(codes + 1, minlength=len(series.cat.categories) + 1)[1:]
+        return pd.CategoricalIndex(series.cat.categories, dtype=series.dtype), counts, codes < 0, codes
+
+    if _is_numeric(series.dtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        mask = series.isna().to_numpy()
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            values = pd.DatetimeIndex(series).asi8
+        else:
+            dtype = getattr(series.dtype, 'numpy_dtype', series.dtype)
+            values = series.to_numpy(dtype=dtype, na_value=np.nan if dtype.kind == 'f' else 0)
+        valid = values[~mask]
+        order = np.argsort(valid) if need_codes else None
+        ordered = valid[order] if need_codes else np.sort(valid)
+        is_start = np.empty(len(ordered), dtype=bool)
+        is_start[:1] = True
+        np.not_equal(ordered[1:], ordered[:-1], out=is_start[1:])
+        starts = np.flatnonzero(is_start)
+        distinct = ordered[starts]
+        counts = np.diff(np.append(starts, len(ordered)))
+        codes = None
+        if need_codes:
+            # Rank of each row's value among the distinct values
+            valid_codes = np.empty(len(valid), dtype=np.int64)
+            valid_codes[order] = np.cumsum(is_start) - 1
+            codes = np.full(len(values), -1, dtype=np.int64)
+            codes[~mask] = valid_codes
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            uniques = pd.DatetimeIndex(distinct.view(f'datetime64[{series.dt.unit}]'))
+            if series.dt.tz is not None:
+                uniques = uniques.tz_localize('UTC').tz_convert(series.dt.tz)
+        else:
+            uniques = pd.Index(distinct)
+        return uniques, counts, mask, codes
+
+    codes, uniques = pd.factorize(series)
+    codes = codes.astype(np.int64, copy=False)
+    counts = np.bincount(codes + 1, minlength=len(uniques) + 1)[1:]
+    return pd.Index(uniques), counts, codes < 0, codes
+
+
+def _weighted_quantiles(values: np.ndarray, counts: np.ndarray,
+                        quantiles: Sequence[float]) -> List[float]:
+    """
+    Quantiles of sorted distinct values with counts.
+
+    Uses linear interpolation between ranks, like ``Series.quantile``.
+    """
+    n = counts.sum()
+    ends = np.cumsum(counts)
+    result = []
+    for q in quantiles:
+        position = (n - 1) * q
+        lo, hi = int(np.floor(position)), int(np.ceil(position))
+        v_lo = values[np.searchsorted(ends, lo, side='right')]
+        v_hi = values[np.searchsorted(ends, hi, side='right')]
+        result.append(float(v_lo + (position - lo) * (v_hi - v_lo)))
+    return result
+
+
+def _column_stats(uniques: pd.Index, counts: np.ndarray, dtype) -> Dict[str, object]:
+    """Summary statistics of one column from its distinct values and counts."""
+    observed = counts > 0
+    n = int(counts.sum())
+    stats = {'unique': int(observed.sum())}
+    if n:
+        top = int(np.argmax(counts))
+        stats.update(top=uniques[top], freq=int(counts[top]))
+
+    if _is_numeric(dtype) and n:
+        values = uniques.to_numpy(dtype=np.float64)[observed]
+        weights = counts[observed]
+        if not uniques.is_monotonic_increasing:
+            order = np.argsort(values)
+            values, weights = values[order], weights[order]
+        mean = float(np.dot(values, weights) / n)
+        var = float(np.dot(weights, (values - mean) ** 2) / (n - 1)) if n > 1 else np.nan
+        q25, q50, q75 = _weighted_quantiles(values, weights, QUANTILES)
+        stats.update(mean=mean, std=np.sqrt(var), min=float(values[0]), q25=q25, median=q50,
+                     q75=q75, max=float(values[-1]),
+                     zeros=int(weights[values == 0].sum()), negatives=int(weights[values < 0].sum()))
+    return stats
+
+
+class DatasetProfile:
+    """
+    Column statistics of a DataFrame computed in one pass.
+
+    Attributes:
+        n_rows: Number of rows
+        n_columns: Number of profiled columns
+        dtypes: Column dtypes
+        memory_bytes: Deep memory usage of the profiled columns
+        duplicate_rows: Rows identical to an earlier row (None when not
+            tracked, e.g. for a profile answered from sketches)
+        empty_rows: Rows where every profiled column is missing
+        columns: One row per column with missing / unique / top / freq and,
+            for numeric columns, mean, std, min, quartiles, max, zeros and
+            negatives
+    """
+
+    def __init__(self, n_rows: int, dtypes: pd.Series, memory_bytes: int,
+                 counts: Dict[str, pd.Series], missing: Dict[str, int],
+                 duplicate_rows: Optional[int], empty_rows: int,
+                 stats: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Args:
+            n_rows: Number of rows
+            dtypes: Column dtypes
+            memory_bytes: Deep memory usage
+            counts: Column -> Series of counts indexed by distinct value
+                (columns may be left out when ``stats`` covers them)
+            missing: Column -> missing count
+            duplicate_rows: Duplicate row count (None if not tracked)
+            empty_rows: All-missing row count
+            stats: Column -> precomputed statistics (as returned by
+                ``_column_stats``), e.g. merged across chunks
+        """
+        self.n_rows = n_rows
+        self.n_columns = len(dtypes)
+        self.dtypes = dtypes
+        self.memory_bytes = memory_bytes
+        self.duplicate_rows = duplicate_rows
+        self.empty_rows = empty_rows
+        self._counts = counts
+
+        stats = stats or {}
+        rows = {}
+        for col, dtype in dtypes.items():
+            col_stats = stats[col] if col in stats else _column_stats(counts[col].index,
+                                                                       counts[col].to_numpy(), dtype)
+            rows[col] = {'dtype': str(dtype), 'missing': missing[col], **col_stats}
+        self.columns = pd.DataFrame.from_dict(rows, orient='index')
+        self.columns['missing_pct'] = 100 * self.columns['missing'] / n_rows if n_rows else 0.0
+
+    @property
+    def total_missing(self) -> int:
+        """Missing values over all profiled columns."""
+        return int(self.columns['missing'].sum())
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        """Profiled columns with a numeric (non-boolean) dtype."""
+        return [col for col, dtype in self.dtypes.items() if _is_numeric(dtype)]
+
+    def schema(self) -> pd.DataFrame:
+        """Empty DataFrame with the profiled columns and dtypes."""
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in self.dtypes.items()})
+
+    def value_counts(self, column: str, dropna: bool = True) -> pd.Series:
+        """
+        Counts of each value, most frequent first (like ``Series.value_counts``).
+
+        Args:
+            column: Profiled column
+            dropna: Leave out the missing-value count
+
+        Returns:
+            Series named 'count' indexed by value
+        """
+        if column not in self._counts:
+            raise ValueError(f"Value counts for {column} were not kept (too many distinct values)")
+        counts = self._counts[column].sort_values(ascending=False, kind='stable')
+        missing = int(self.columns.at[column, 'missing'])
+        if not dropna and missing:
+            counts = pd.concat([counts, pd.Series([missing], index=[np.nan])])
+            counts = counts.sort_values(ascending=False, kind='stable').rename('count')
+            counts.index.name = column
+        return counts
+
+    def outlier_bounds(self, column: str, method: str = 'iqr') -> Tuple[float, float]:
+        """
+        Bounds outside which values of a numeric column are outliers.
+
+        Args:
+            column: Profiled numeric column
+            method: 'iqr' (1.5 IQR beyond the quartiles) or 'zscore'
+                (3 standard deviations from the mean)
+
+        Returns:
+            (lower, upper)
+        """
+        stats = self.columns.loc[column]
+        if method == 'iqr':
+            iqr = stats['q75'] - stats['q25']
+            return stats['q25'] - 1.5 * iqr, stats['q75'] + 1.5 * iqr
+        if method == 'zscore':
+            return stats['mean'] - 3 * stats['std'], stats['mean'] + 3 * stats['std']
+        raise ValueError("method must be 'iqr' or 'zscore'")
+
+    def missing_table(self) -> pd.DataFrame:
+        """Columns with missing values, most missing first."""
+        table = self.columns.loc[self.columns['missing'] > 0, ['missing', 'missing_pct']]
+        table.columns = ['Missing_Count', 'Missing_Percentage']
+        return table.sort_values('Missing_Count', ascending=False)
+
+    def describe(self) -> pd.DataFrame:
+        """
+        Summary table in the layout of ``DataFrame.describe()``.
+
+        Returns:
+            count / mean / std / min / quartiles / max for numeric columns,
+            or count / unique / top / freq when there are none
+        """
+        numeric = self.numeric_columns
+        count = self.n_rows - self.columns['missing']
+        if numeric:
+            table = self.columns.loc[numeric, ['mean', 'std', 'min', 'q25', 'median', 'q75', 'max']]
+            table = table.rename(columns={'q25': '25%', 'median': '50%', 'q75': '75%'})
+            table.insert(0, 'count', count[numeric])
+            return table.astype(float).T
+        table = self.columns[['unique', 'top', 'freq']].copy()
+        table.insert(0, 'count', count)
+        return table.T
+
+
+def profile_dataset(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> DatasetProfile:
+    """
+    Profile a DataFrame in one pass over its columns.
+
+    Args:
+        df: pandas DataFrame
+        columns: Columns to profile (default: all); duplicate and empty
+            rows are counted over these columns
+
+    Returns:
+        DatasetProfile
+    """
+    frame = df if columns is None else df[list(columns)]
+    n_rows = len(frame)
+    counts, missing = {}, {}
+    # Row key combining the codes of the columns seen so far (None once
+    # every row is known to be distinct, e.g. after an id column)
+    key, key_size = np.zeros(n_rows, dtype=np.int64), 1
+    empty = np.ones(n_rows, dtype=bool)
+
+    for position, col in enumerate(frame.columns):
+        uniques, tally, mask, codes = _tally(frame.iloc[:, position], need_codes=key is not None)
+        missing[col] = int(mask.sum())
+        counts[col] = pd.Series(tally, index=uniques.rename(col), name='count')
+        empty &= mask
+
+        if key is None:
+            continue
+        if n_rows and tally.max(initial=0) <= 1 and missing[col] <= 1:
+            key = None
+            continue
+        cardinality = len(uniques) + 1
+        if key_size * cardinality > _MAX_KEY_SIZE:
+            key, distinct = pd.factorize(key)
+            key_size = len(distinct)
+        key = key * cardinality + (codes + 1)
+        key_size *= cardinality
+
+    duplicate_rows = 0 if key is None else n_rows - len(pd.unique(key))
+    return DatasetProfile(n_rows=n_rows, dtypes=frame.dtypes,
+                          memory_bytes=int(frame.memory_usage(deep=True).sum()),
+                          counts=counts, missing=missing,
+                          duplicate_rows=duplicate_rows, empty_rows=int(empty.sum()))
@@ -0,0 +1,211 @@
+"""
+Date Parsing
+
+Fixed-format timestamp parsing for the DC crime incident columns.
+
+``REPORT_DAT``, ``START_DATE`` and ``END_DATE`` are always written as
+``YYYY/MM/DD HH:MM:SS+00``. Instead of letting ``pd.to_datetime`` infer a
+format on every load, the format of a column is detected once from a few
+sample values (and cached by the shape of those values), and the strings
+are parsed in a single vectorized pass by Arrow's ``strptime``.
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from datetime import datetime
+from typing import Dict, Optional
+
+DC_TIMESTAMP_FORMAT = '%Y/%m/%d %H:%M:%S+00'
+LOCAL_TIMEZONE = 'America/New_York'
+
+# Formats tried, in order, when a column's format is not given
+KNOWN_FORMATS = (
+    DC_TIMESTAMP_FORMAT,
+    '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d %H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y/%m/%d',
+    '%Y-%m-%d',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y',
+)
+
+SAMPLE_SIZE = 5
+
+# Value shape (digits replaced by '0') -> detected format, None if unknown
+_FORMAT_CACHE: Dict[str, Optional[str]] = {}
+
+_DIGITS = str.maketrans('0123456789', '0000000000')
+
+
+def detect_format(values: pd.Series) -> Optional[str]:
+    """
+    Detect the timestamp format of a text column from a few sample values.
+
+    The result is cached by the shape of the first sample (``2024/08/13
+    16:02:18+00`` -> ``0000/00/00 00:00:00+00``), so repeated loads of the
+    same files skip detection entirely.
+
+    Args:
+        values: Series of timestamp strings
+
+    Returns:
+        ``strptime`` format string, or None if no known format fits
+    """
+    sample = values.dropna().head(SAMPLE_SIZE).astype(str).tolist()
+    if not sample:
+        return None
+    shapes = [value.strip().translate(_DIGITS) for value in sample]
+    shape = shapes[0]
+    if shape not in _FORMAT_CACHE:
+        # Only values laid out like the first decide (and key) the format
+        alike = [value for value, other in zip(sample, shapes) if other == shape]
+        _FORMAT_CACHE[shape] = next((fmt for fmt in KNOWN_FORMATS if _parses(alike, fmt)), None)
+    return _FORMAT_CACHE[shape]
+
+
+def _parses(sample, fmt: str) -> bool:
+    """Whether every sample value parses with ``fmt``."""
+    try:
+        for value in sample:
+            datetime.strptime(value.strip(), fmt)
+    except ValueError:
+        return False
+    return True
+
+
+def _as_arrow_strings(values: pd.Series) -> pa.Array:
+    """Arrow string array of a text column (zero-copy for Arrow-backed strings)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    array = pa.array(values, from_pandas=True)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if not pa.types.is_string(array.type) and not pa.types.is_large_string(array.type):
+        array = array.cast(pa.string())
+    return array
+
+
+def parse_timestamps(values: pd.Series, format: Optional[str] = None) -> pd.Series:
+    """
+    Parse a column of timestamp strings to UTC datetimes.
+
+    The format is detected with ``detect_format`` when not given. Known
+    formats are parsed in one vectorized pass; values that do not match
+    fall back to ``pd.to_datetime`` individually, and unparseable values
+    become NaT (like ``errors='coerce'``). Timestamps without an offset
+    are taken to be UTC, as the DC feeds are.
+
+    Args:
+        values: Series of timestamp strings (object, string or categorical)
+        format: ``strptime`` format (detected if None)
+
+    Returns:
+        ``datetime64[ns, UTC]`` Series aligned with ``values``
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.to_datetime(values, utc=True)
+    if format is None:
+        format = detect_format(values)
+    if format is None:
+        return pd.to_datetime(values, errors='coerce', utc=True)
+
+    strings = _as_arrow_strings(values)
+    parsed = pc.strptime(strings, format=format, unit='ns', error_is_null=True)
+    result = pd.Series(parsed.cast(pa.timestamp('ns', tz='UTC')).to_pandas(),
+                       index=values.index, name=values.name)
+    # Rows in another layout (hand-edited files, mixed extracts)
+    missed = result.isna().to_numpy() & pc.is_valid(strings).to_numpy(zero_copy_only=False)
+    if missed.any():
+        result[missed] = pd.to_datetime(values[missed], errors='coerce', utc=True, format='mixed')
+    return result
+
+
+def _is_leap(year: np.ndarray) -> np.ndarray:
+    """Leap-year mask of an int year array."""
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def _calendar(days: np.ndarray) -> Dict[str, np.ndarray]:
+    """Year, month, day, weekday, quarter and ISO week of days since 1970-01-01."""
+    weekday = (days + 3) % 7
+
+    # Civil date from the day number (H. Hinnant's algorithm)
+    z = days + 719_468
+    era = z // 146_097
+    doe = z - era * 146_097
+    yoe = (doe - doe // 1_460 + doe // 36_524 - doe // 146_096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+
+    # ISO week from the day of the year and the weekday; a year has 53
+    # weeks if it starts on a Thursday (or a Wednesday in leap years)
+    leap = _is_leap(year)
+    cumulative = np.array([0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+    ordinal = cumulative[month] + day + (leap & (month > 2))
+    week = (ordinal - weekday + 9) // 7
+    jan1 = (weekday - ordinal + 1) % 7
+    prev_leap = _is_leap(year - 1)
+    prev_jan1 = (jan1 - 1 - prev_leap) % 7
+    weeks = 52 + ((jan1 == 3) | ((jan1 == 2) & leap))
+    prev_weeks = 52 + ((prev_jan1 == 3) | ((prev_jan1 == 2) & prev_leap))
+    week = np.where(week < 1, prev_weeks, np.where(week > weeks, 1, week))
+
+    return {
+        'year': year.astype('int16'),
+        'month': month.astype('int8'),
+        'day': day.astype('int8'),
+        'weekday': weekday.astype('int8'),
+        'quarter': ((month - 1) // 3 + 1).astype('int8'),
+        'week': week.astype('int8'),
+    }
+
+
+def date_parts(dates: pd.Series, tz: Optional[str] = LOCAL_TIMEZONE) -> Dict[str, pd.arrays.IntegerArray]:
+    """
+    Derive calendar parts of datetimes in one pass over their int64 values.
+
+    The timestamps are split once into a day number and an hour; year,
+    month, day, weekday (Monday=0), quarter and ISO week are computed with
+    integer arithmetic for each day in the span covered (a few thousand
+    for incident data) and gathered back per row, so no intermediate
+    datetime Series is built per part.
+
+    Args:
+        dates: Datetime Series (tz-aware or naive)
+        tz: Time zone the parts are taken in (``America/New_York`` by
+            default, so hours match the DC wall clock); None keeps the
+            series as is
+
+    Returns:
+        Dictionary of part name -> nullable Int16 (year) / Int8 array
+    """
+    if tz is not None and dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(tz)
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    missing = np.isnat(values)
+    ns = values.view(np.int64)
+    if missing.any():
+        # Missing rows borrow a valid day so they do not widen the span
+        fill = 0 if missing.all() else ns[~missing][0]
+        ns = np.where(missing, fill, ns)
+
+    days, rest = np.divmod(ns, 86_400 * 10**9)
+    first = int(days.min()) if len(days) else 0
+    offsets = days - first
+    span = int(offsets.max()) + 1 if len(days) else 0
+    calendar = _calendar(np.arange(first, first + span))
+
+    parts = {name: table[offsets] for name, table in calendar.items()}
+    parts['hour'] = (rest // (3_600 * 10**9)).astype('int8')
+    return {name: pd.arrays.IntegerArray(values, missing) for name, values in parts.items()}
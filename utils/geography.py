@@ -0,0 +1,525 @@
+"""
+Geography
+
+Cached DC boundary layers and vectorized point-in-polygon assignment.
+
+Ward, PSA and police district boundaries are parsed from the raw GeoJSON
+once and cached as GeoParquet; each layer is wrapped in a
+``BoundaryIndex`` with prepared polygons and an STRtree, so incidents or
+grid points are assigned with array calls instead of one
+``polygon.contains(Point(...))`` per point.
+
+``prepare_boundaries()`` precompiles the layers once per source change:
+coverage-simplified GeoParquet at each resolution in
+``BOUNDARY_RESOLUTIONS`` (shared edges stay identical, so neighbouring
+polygons neither gap nor overlap), quantized TopoJSON for web maps, and
+the city outline, so maps and the grid clip never re-parse or re-union
+the raw GeoJSON.
+"""
+
+import pandas as pd
+import numpy as np
+import geopandas as gpd
+import shapely
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Sequence, Tuple, Union
+from pathlib import Path
+
+from ._config import CACHE_DIR, RAW_DATA_DIR
+
+# Layer name -> (raw GeoJSON file, id column)
+BOUNDARY_LAYERS = {
+    'WARD': ('Wards.geojson', 'WARD'),
+    'PSA': ('Police_Service_Areas.geojson', 'PSA'),
+    'DISTRICT': ('Police_Districts.geojson', 'DISTRICT'),
+}
+BOUNDARY_CACHE_DIR = CACHE_DIR / 'boundaries'
+# Resolution -> (coverage simplification tolerance in degrees, TopoJSON quantization).
+# 0.0001 degrees is about 10 m; the quantization grid spans the layer's bounding box.
+BOUNDARY_RESOLUTIONS = {
+    'full': (0.0, 1_000_000),
+    'fine': (0.00002, 100_000),
+    'medium': (0.0001, 100_000),
+    'coarse': (0.0005, 10_000),
+}
+CITY_OUTLINE_FILE = 'city_outline.wkb'
+
+_INDEXES: Dict[Tuple[str, str], 'BoundaryIndex'] = {}
+_OUTLINES: Dict[Tuple[str, str], Any] = {}
+
+
+def _is_fresh(cache: Path, source: Path) -> bool:
+    """Whether a derived file exists and is newer than its source."""
+    return cache.exists() and cache.stat().st_mtime_ns >= source.stat().st_mtime_ns
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write bytes via a temporary file so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(data)
+    os.replace(tmp, path)
+
+
+def _boundary_source(layer: str, raw_dir: Union[str, Path]) -> Path:
+    if layer not in BOUNDARY_LAYERS:
+        raise ValueError(f"layer must be one of {', '.join(BOUNDARY_LAYERS)}")
+    return Path(raw_dir) / BOUNDARY_LAYERS[layer][0]
+
+
+def load_boundaries(layer: str, raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                    cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR,
+                    resolution: str = 'full') -> gpd.GeoDataFrame:
+    """
+    Load a boundary layer, parsing the GeoJSON only when the cache is stale.
+
+    Simplified resolutions are derived from the full layer with
+    ``shapely.coverage_simplify``, which simplifies the shared edges once
+    for both neighbours, and cached next to it.
+
+    Args:
+        layer: 'WARD', 'PSA' or 'DISTRICT'
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the GeoParquet cache
+        resolution: Key of ``BOUNDARY_RESOLUTIONS`` ('full', 'fine', 'medium', 'coarse')
+
+    Returns:
+        GeoDataFrame (EPSG:4326) with the id column, NAME and geometry
+    """
+    source = _boundary_source(layer, raw_dir)
+    if resolution not in BOUNDARY_RESOLUTIONS:
+        raise ValueError(f"resolution must be one of {', '.join(BOUNDARY_RESOLUTIONS)}")
+    filename, id_col = BOUNDARY_LAYERS[layer]
+    suffix = '' if resolution == 'full' else f'_{resolution}'
+    cache = Path(cache_dir) / f'{Path(filename).stem}{suffix}.parquet'
+
+    if _is_fresh(cache, source):
+        return gpd.read_parquet(cache)
+
+    if resolution != 'full':
+        gdf = load_boundaries(layer, raw_dir, cache_dir)
+        tolerance = BOUNDARY_RESOLUTIONS[resolution][0]
+        simplified = shapely.coverage_simplify(np.asarray(gdf.geometry.array, dtype=object), tolerance)
+        gdf = gdf.set_geometry(gpd.GeoSeries(simplified, index=gdf.index, crs=gdf.crs))
+        gdf.to_parquet(cache, compression='zstd')
+        return gdf
+
+    gdf = gpd.read_file(source).to_crs('EPSG:4326')
+    gdf = gdf[[id_col, 'NAME', 'geometry']].sort_values(id_col).reset_index(drop=True)
+    cache.parent.mkdir(parents=True, exist_ok=True)
+    gdf.to_parquet(cache, compression='zstd')
+    print(f"✅ Cached {layer} boundaries: {len(gdf)} polygons -> {cache}")
+    return gdf
+
+
+class BoundaryIndex:
+    """
+    Prepared polygons of one boundary layer with an STRtree.
+
+    Points are tested per polygon against a bounding-box prefilter with
+    ``shapely.intersects_xy``, which avoids building a Point object per
+    incident.
+    """
+
+    def __init__(self, gdf: gpd.GeoDataFrame, id_col: str):
+        """
+        Args:
+            gdf: Boundary polygons in EPSG:4326
+            id_col: Column holding the polygon identifier (e.g. WARD)
+        """
+        self.ids = gdf[id_col].to_numpy()
+        self.geometries = np.asarray(gdf.geometry.array, dtype=object)
+        shapely.prepare(self.geometries)
+        self.bounds = shapely.bounds(self.geometries)
+        self.tree = shapely.STRtree(self.geometries)
+
+    def assign(self, lon, lat) -> np.ndarray:
+        """
+        Find the polygon containing each point.
+
+        Args:
+            lon: Longitude(s) in degrees
+            lat: Latitude(s) in degrees
+
+        Returns:
+            Array of polygon positions, -1 for points outside every polygon
+            or with missing coordinates
+        """
+        x = np.asarray(lon, dtype=np.float64)
+        y = np.asarray(lat, dtype=np.float64)
+        result = np.full(len(x), -1, dtype=np.int64)
+        for k, geometry in enumerate(self.geometries):
+            x0, y0, x1, y1 = self.bounds[k]
+            candidates = np.flatnonzero((x >= x0) & (x <= x1) & (y >= y0) & (y <= y1) & (result < 0))
+            if len(candidates):
+                inside = shapely.intersects_xy(geometry, x[candidates], y[candidates])
+                result[candidates[inside]] = k
+        return result
+
+    def lookup(self, lon, lat) -> pd.Series:
+        """
+        Polygon identifier for each point (missing outside the layer).
+
+        Args:
+            lon: Longitude(s) in degrees
+            lat: Latitude(s) in degrees
+
+        Returns:
+            Series of ids with a nullable integer dtype
+        """
+        positions = self.assign(lon, lat)
+        ids = pd.array(self.ids, dtype='Int64')
+        values = ids.take(positions, allow_fill=True)
+        return pd.Series(values)
+
+    def query(self, geometry, predicate: str = 'intersects') -> np.ndarray:
+        """
+        Identifiers of the polygons related to a geometry (e.g. a grid cell).
+
+        Args:
+            geometry: shapely geometry
+            predicate: STRtree predicate, e.g. 'intersects' or 'contains'
+
+        Returns:
+            Array of ids
+        """
+        return self.ids[self.tree.query(geometry, predicate=predicate)]
+
+
+def boundary_index(layer: str, raw_dir: Union[str, Path] = RAW_DATA_DIR) -> BoundaryIndex:
+    """
+    Get the (memoized) ``BoundaryIndex`` for a layer.
+
+    Args:
+        layer: 'WARD', 'PSA' or 'DISTRICT'
+        raw_dir: Directory containing the raw GeoJSON files
+
+    Returns:
+        BoundaryIndex
+    """
+    key = (layer, str(raw_dir))
+    if key not in _INDEXES:
+        _INDEXES[key] = BoundaryIndex(load_boundaries(layer, raw_dir), BOUNDARY_LAYERS[layer][1])
+    return _INDEXES[key]
+
+
+def city_outline(raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                 cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR):
+    """
+    DC city limits as the union of the ward polygons (prepared).
+
+    The union is computed once per change of the ward GeoJSON, stored as WKB
+    in the boundary cache and memoized per process.
+
+    Args:
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the boundary cache
+
+    Returns:
+        shapely geometry
+    """
+    key = (str(raw_dir), str(cache_dir))
+    if key in _OUTLINES:
+        return _OUTLINES[key]
+    cache = Path(cache_dir) / CITY_OUTLINE_FILE
+    if _is_fresh(cache, _boundary_source('WARD', raw_dir)):
+        outline = shapely.from_wkb(cache.read_bytes())
+    else:
+        wards = load_boundaries('WARD', raw_dir, cache_dir)
+        outline = shapely.union_all(np.asarray(wards.geometry.array, dtype=object))
+        _write_atomic(cache, shapely.to_wkb(outline))
+    shapely.prepare(outline)
+    _OUTLINES[key] = outline
+    return outline
+
+
+def clear_boundary_caches() -> None:
+    """Forget the boundary indexes and city outlines memoized in this process (files on disk are kept)."""
+    _INDEXES.clear()
+    _OUTLINES.clear()
+
+
+def points_in_city(lon, lat, raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                   cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR) -> np.ndarray:
+    """
+    Flag points inside the DC city limits.
+
+    Args:
+        lon: Longitude(s) in degrees
+        lat: Latitude(s) in degrees
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the boundary cache
+
+    Returns:
+        Boolean array
+    """
+    return shapely.contains_xy(city_outline(raw_dir, cache_dir), np.asarray(lon, dtype=np.float64),
+                               np.asarray(lat, dtype=np.float64))
+
+
+def assign_boundaries(df: pd.DataFrame, layers: Sequence[str] = ('WARD', 'PSA', 'DISTRICT'),
+                      lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                      suffix: str = '_GEO', raw_dir: Union[str, Path] = RAW_DATA_DIR) -> pd.DataFrame:
+    """
+    Derive ward / PSA / district from coordinates.
+
+    Args:
+        df: DataFrame with coordinate columns
+        layers: Boundary layers to assign
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        suffix: Suffix for the new columns (e.g. WARD_GEO)
+        raw_dir: Directory containing the raw GeoJSON files
+
+    Returns:
+        DataFrame with one new column per layer
+    """
+    df = df.copy()
+    lon, lat = df[lon_col].to_numpy(dtype=np.float64), df[lat_col].to_numpy(dtype=np.float64)
+    for layer in layers:
+        df[f'{layer}{suffix}'] = boundary_index(layer, raw_dir).lookup(lon, lat).to_numpy()
+    return df
+
+
+def validate_boundaries(df: pd.DataFrame, layers: Sequence[str] = ('WARD', 'PSA', 'DISTRICT'),
+                        lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                        raw_dir: Union[str, Path] = RAW_DATA_DIR) -> pd.DataFrame:
+    """
+    Compare recorded WARD / PSA / DISTRICT codes with the coordinates.
+
+    Args:
+        df: Incident DataFrame
+        layers: Boundary layers to check
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        raw_dir: Directory containing the raw GeoJSON files
+
+    Returns:
+        DataFrame with match / mismatch / no-location counts per layer
+    """
+    lon, lat = df[lon_col].to_numpy(dtype=np.float64), df[lat_col].to_numpy(dtype=np.float64)
+    rows = {}
+    for layer in layers:
+        derived = boundary_index(layer, raw_dir).lookup(lon, lat)
+        recorded = pd.to_numeric(pd.Series(np.asarray(df[layer], dtype=object)), errors='coerce')
+        located = derived.notna().to_numpy() & recorded.notna().to_numpy()
+        matches = located & (derived.to_numpy(dtype=np.float64, na_value=np.nan) == recorded.to_numpy(dtype=np.float64))
+        rows[layer] = {'match': int(matches.sum()),
+                       'mismatch': int((located & ~matches).sum()),
+                       'unlocated': int((~located).sum())}
+    summary = pd.DataFrame(rows).T
+    summary['match_rate'] = (summary['match'] / (summary['match'] + summary['mismatch'])).round(4)
+    print("📊 Boundary check (recorded code vs. point-in-polygon):")
+    print(summary)
+    return summary
+
+
+def city_grid_centers(lat_min: float, lat_max: float, lon_min: float, lon_max: float,
+                      grid_size: float, clip: bool = True,
+                      raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                      cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR) -> List[Tuple[float, float]]:
+    """
+    Centers of a regular lat/lon grid, optionally clipped to the city limits.
+
+    Vectorized replacement for the nested ``city_boundary.contains(Point(...))``
+    loop; centers are returned in the same row-major (lat, then lon) order.
+
+    Args:
+        lat_min, lat_max: Latitude extent
+        lon_min, lon_max: Longitude extent
+        grid_size: Cell size in degrees
+        clip: Keep only centers inside DC
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the boundary cache
+
+    Returns:
+        List of (lat, lon) tuples
+    """
+    lat_steps = int((lat_max - lat_min) / grid_size) + 1
+    lon_steps = int((lon_max - lon_min) / grid_size) + 1
+    lat = lat_min + (np.arange(lat_steps) + 0.5) * grid_size
+    lon = lon_min + (np.arange(lon_steps) + 0.5) * grid_size
+    grid_lat, grid_lon = (a.ravel() for a in np.meshgrid(lat, lon, indexing='ij'))
+    if clip:
+        inside = points_in_city(grid_lon, grid_lat, raw_dir, cache_dir)
+        grid_lat, grid_lon = grid_lat[inside], grid_lon[inside]
+    return list(zip(grid_lat.tolist(), grid_lon.tolist()))
+
+
+def _quantized_rings(polygon, x0: float, y0: float, kx: float, ky: float) -> List[List[Tuple[int, int]]]:
+    """Rings of a polygon as closed lists of integer grid points (degenerate rings dropped)."""
+    rings = []
+    for ring in (polygon.exterior, *polygon.interiors):
+        coords = np.asarray(ring.coords)
+        qx = np.rint((coords[:, 0] - x0) / kx).astype(np.int64)
+        qy = np.rint((coords[:, 1] - y0) / ky).astype(np.int64)
+        keep = np.r_[True, (np.diff(qx) != 0) | (np.diff(qy) != 0)]
+        points = list(zip(qx[keep].tolist(), qy[keep].tolist()))
+        if len(points) >= 4:
+            rings.append(points)
+        elif not rings:
+            return []
+    return rings
+
+
+def to_topojson(gdf: gpd.GeoDataFrame, id_col: str, object_name: str,
+                quantization: int = 100_000) -> Dict[str, Any]:
+    """
+    Encode polygons as quantized TopoJSON with shared arcs.
+
+    Coordinates are snapped to a ``quantization`` x ``quantization`` grid
+    over the layer's bounding box and delta-encoded. Rings are cut at
+    junctions (points whose neighbours differ between rings), so an edge
+    shared by two polygons is stored once and referenced by both.
+
+    Args:
+        gdf: Polygon layer in EPSG:4326
+        id_col: Column used as the geometry id
+        object_name: Name of the GeometryCollection under ``objects``
+        quantization: Grid steps per axis
+
+    Returns:
+        TopoJSON Topology as a dictionary
+    """
+    x0, y0, x1, y1 = (float(v) for v in gdf.total_bounds)
+    kx = (x1 - x0) / (quantization - 1) or 1.0
+    ky = (y1 - y0) / (quantization - 1) or 1.0
+
+    shapes = []
+    for geometry in gdf.geometry:
+        polygons = getattr(geometry, 'geoms', [geometry])
+        shapes.append([rings for rings in (_quantized_rings(p, x0, y0, kx, ky) for p in polygons) if rings])
+
+    # A point is a junction when two rings pass through it with different neighbours
+    seen: Dict[Tuple[int, int], Tuple] = {}
+    junctions = set()
+    for polygons in shapes:
+        for rings in polygons:
+            for ring in rings:
+                n = len(ring) - 1
+                for i in range(n):
+                    a, b = ring[i - 1 if i else n - 1], ring[i + 1]
+                    neighbours = (a, b) if a <= b else (b, a)
+                    if seen.setdefault(ring[i], neighbours) != neighbours:
+                        junctions.add(ring[i])
+
+    arcs: List[List[Tuple[int, int]]] = []
+    index: Dict[Tuple, int] = {}
+
+    def arc_id(points: List[Tuple[int, int]]) -> int:
+        key = tuple(points)
+        if key in index:
+            return index[key]
+        reverse = key[::-1]
+        if reverse in index:
+            return ~index[reverse]
+        index[key] = len(arcs)
+        arcs.append(points)
+        return index[key]
+
+    def ring_arcs(ring: List[Tuple[int, int]]) -> List[int]:
+        open_ring = ring[:-1]
+        cuts = [i for i, point in enumerate(open_ring) if point in junctions]
+        if not cuts:
+            # A ring without junctions is one closed arc; start it at its smallest point
+            # so a hole and the island filling it map to the same arc
+            start = open_ring.index(min(open_ring))
+            return [arc_id(open_ring[start:] + open_ring[:start + 1])]
+        rotated = open_ring[cuts[0]:] + open_ring[:cuts[0]] + [open_ring[cuts[0]]]
+        offsets = [i - cuts[0] for i in cuts] + [len(open_ring)]
+        return [arc_id(rotated[start:end + 1]) for start, end in zip(offsets, offsets[1:])]
+
+    geometries = []
+    for (_, row), polygons in zip(gdf.iterrows(), shapes):
+        encoded = [[ring_arcs(ring) for ring in rings] for rings in polygons]
+        properties = {col: (row[col].item() if isinstance(row[col], np.generic) else row[col])
+                      for col in gdf.columns if col != gdf.geometry.name}
+        geometry = ({'type': 'Polygon', 'arcs': encoded[0]} if len(encoded) == 1
+                    else {'type': 'MultiPolygon', 'arcs': encoded})
+        geometries.append({**geometry, 'id': properties[id_col], 'properties': properties})
+
+    deltas = []
+    for points in arcs:
+        values = np.asarray(points, dtype=np.int64)
+        values[1:] = np.diff(values, axis=0)
+        deltas.append(values.tolist())
+    return {
+        'type': 'Topology',
+        'bbox': [x0, y0, x1, y1],
+        'transform': {'scale': [kx, ky], 'translate': [x0, y0]},
+        'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': deltas,
+    }
+
+
+def boundary_topojson(layer: str, resolution: str = 'medium',
+                      raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                      cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR) -> Path:
+    """
+    Path to the precompiled TopoJSON of a layer, building it when stale.
+
+    The layer is stored under ``objects.<layer lowercased>`` (e.g.
+    ``objects.ward``).
+
+    Args:
+        layer: 'WARD', 'PSA' or 'DISTRICT'
+        resolution: Key of ``BOUNDARY_RESOLUTIONS``
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the boundary cache
+
+    Returns:
+        Path to the .topojson file
+    """
+    source = _boundary_source(layer, raw_dir)
+    path = Path(cache_dir) / f'{source.stem}_{resolution}.topojson'
+    if not _is_fresh(path, source):
+        gdf = load_boundaries(layer, raw_dir, cache_dir, resolution)
+        topology = to_topojson(gdf, BOUNDARY_LAYERS[layer][1], layer.lower(),
+                               BOUNDARY_RESOLUTIONS[resolution][1])
+        _write_atomic(path, json.dumps(topology, separators=(',', ':')).encode())
+    return path
+
+
+def prepare_boundaries(layers: Sequence[str] = tuple(BOUNDARY_LAYERS),
+                       resolutions: Sequence[str] = tuple(BOUNDARY_RESOLUTIONS),
+                       raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                       cache_dir: Union[str, Path] = BOUNDARY_CACHE_DIR,
+                       force: bool = False) -> List[Path]:
+    """
+    Precompile the boundary layers: GeoParquet and TopoJSON per resolution,
+    plus the city outline.
+
+    Files already newer than their source GeoJSON are kept unless ``force``.
+
+    Args:
+        layers: Boundary layers to prepare
+        resolutions: Keys of ``BOUNDARY_RESOLUTIONS``
+        raw_dir: Directory containing the raw GeoJSON files
+        cache_dir: Directory for the boundary cache
+        force: Rebuild everything
+
+    Returns:
+        Paths of the TopoJSON files and the city outline
+    """
+    cache_dir = Path(cache_dir)
+    if force:
+        for layer in layers:
+            stem = _boundary_source(layer, raw_dir).stem
+            for resolution in resolutions:
+                suffix = '' if resolution == 'full' else f'_{resolution}'
+                (cache_dir / f'{stem}{suffix}.parquet').unlink(missing_ok=True)
+                (cache_dir / f'{stem}_{resolution}.topojson').unlink(missing_ok=True)
+        (cache_dir / CITY_OUTLINE_FILE).unlink(missing_ok=True)
+        clear_boundary_caches()
+    paths = []
+    for layer in layers:
+        for resolution in resolutions:
+            paths.append(boundary_topojson(layer, resolution, raw_dir, cache_dir))
+    city_outline(raw_dir, cache_dir)
+    paths.append(cache_dir / CITY_OUTLINE_FILE)
+    sizes = ', '.join(f'{p.name} {p.stat().st_size / 1024:,.0f} KB' for p in paths if p.suffix == '.topojson')
+    print(f"✅ Prepared boundaries in {cache_dir}: {sizes}")
+    return paths
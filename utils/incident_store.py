@@ -0,0 +1,703 @@
+"""
+Incident Store
+
+Partitioned Parquet cache of the cleaned DC crime incident files.
+
+The yearly ``Crime_Incidents_in_20*.csv`` downloads are parsed once and
+written as a hive-partitioned Parquet dataset (``YEAR=2025/...``). Each
+source CSV owns its own files inside the partitions, so when a download
+changes only that source is re-parsed and rewritten. Stale sources are
+read concurrently with pyarrow's multithreaded CSV reader, using a fixed
+column projection and the registry types.
+
+The rolling 30-day feed is merged on top by ``upsert_incidents``: records
+are keyed on ``CCN`` and compared by a row-content hash, and only new or
+revised records are written to small ``feed.parquet`` files that take
+precedence over the yearly files when loading.
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from pathlib import Path
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import hashlib
+import json
+import shutil
+
+from ._config import RAW_DATA_DIR, INCIDENT_STORE_DIR
+from .schema import (PANDAS_TYPES, STRING_DTYPE, apply_schema, csv_arrow_types, csv_dtypes,
+                     standard_column_name, to_arrow, to_pandas)
+
+SOURCE_PATTERN = 'Crime_Incidents_in_20*.csv'
+MANIFEST_NAME = '_manifest.json'
+MANIFEST_VERSION = 4
+FEED_FILE_NAME = 'feed.parquet'
+RECENT_FEED_FILE = 'Crime_Incidents_in_the_Last_30_Days.csv'
+
+PARTITION_COLUMNS = ('YEAR', 'OFFENSE')
+# Hive directory value for a missing partition key (read back as null), so
+# incidents whose REPORT_DATE did not parse are kept with a null YEAR
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+KEY_COLUMN = 'CCN'
+HASH_COLUMN = '_ROW_HASH'
+# Identifiers that change between extracts without the record changing
+VOLATILE_COLUMNS = ['OBJECTID', 'OCTO_RECORD_ID']
+# Bytes per pyarrow CSV block; blocks are parsed on separate threads
+CSV_BLOCK_SIZE = 16 << 20
+
+
+def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Standardize DC incident column names in place.
+
+    Strips the UTF-8 BOM, upper-cases names, replaces spaces with
+    underscores and renames ``REPORT_DAT`` to ``REPORT_DATE``.
+
+    Args:
+        df: Raw incident DataFrame
+
+    Returns:
+        The same DataFrame with standardized column names
+    """
+    df.columns = [standard_column_name(col) for col in df.columns]
+    return df
+
+
+def clean_incidents(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply the notebook cleaning steps to a raw incident DataFrame.
+
+    Standardizes columns, drops exact duplicate rows, applies the dtype
+    registry (``schema.INCIDENT_SCHEMA``: categoricals, nullable small
+    ints, float32 coordinates, UTC timestamps) and adds a string ``YEAR``
+    column.
+
+    Args:
+        df: Raw incident DataFrame (as read from a DC open data CSV)
+
+    Returns:
+        Cleaned DataFrame
+    """
+    df = standardize_columns(df).drop_duplicates()
+    df = apply_schema(df.reset_index(drop=True))
+    df['YEAR'] = df['REPORT_DATE'].dt.year.astype('Int64').astype(STRING_DTYPE)
+    return df
+
+
+def read_incident_table(path: Union[str, Path]) -> pa.Table:
+    """
+    Read one DC incident CSV into Arrow with pyarrow's multithreaded parser.
+
+    The header is standardized before parsing (BOM stripped from ``X``,
+    ``REPORT_DAT`` -> ``REPORT_DATE``), and the registry columns are read
+    in registry order with explicit types (``schema.csv_arrow_types``), so
+    nothing is inferred and every file yields the same schema. Columns
+    missing from a file come back as nulls; unknown columns are skipped.
+
+    Args:
+        path: Path to the CSV file
+
+    Returns:
+        pyarrow Table (dates still text; see ``to_pandas``)
+
+    Raises:
+        pyarrow.ArrowInvalid: If a value does not parse as its column type
+    """
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        header = next(csv.reader(handle))
+    types = csv_arrow_types()
+    read_options = pacsv.ReadOptions(column_names=[standard_column_name(col) for col in header],
+                                     skip_rows=1, block_size=CSV_BLOCK_SIZE, use_threads=True)
+    convert_options = pacsv.ConvertOptions(column_types=types, include_columns=list(types),
+                                           include_missing_columns=True,
+                                           strings_can_be_null=True)
+    return pacsv.read_csv(path, read_options=read_options, convert_options=convert_options)
+
+
+def _clean_table(table: pa.Table) -> pd.DataFrame:
+    """Clean a ``read_incident_table`` result, applying the registry dtypes once."""
+    return clean_incidents(table.to_pandas(types_mapper=PANDAS_TYPES.get))
+
+
+def _read_incident_csv_pandas(path: Union[str, Path]) -> pd.DataFrame:
+    """pandas fallback for files with values Arrow's typed parser rejects."""
+    header = pd.read_csv(path, nrows=0).columns
+    return clean_incidents(pd.read_csv(path, dtype=csv_dtypes(header)))
+
+
+def read_incident_csv(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Read and clean one DC incident CSV.
+
+    Parsed by ``read_incident_table`` into Arrow (text and coordinates
+    already in their registry types), then converted once; files with
+    malformed numbers fall back to ``pd.read_csv``.
+
+    Args:
+        path: Path to the CSV file
+
+    Returns:
+        Cleaned DataFrame
+    """
+    try:
+        table = read_incident_table(path)
+    except pa.ArrowInvalid:
+        return _read_incident_csv_pandas(path)
+    return _clean_table(table)
+
+
+def iter_incident_tables(paths: Sequence[Union[str, Path]],
+                         max_workers: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Read several incident CSVs concurrently, yielding them in order.
+
+    Each file is parsed by ``read_incident_table`` on a thread pool (Arrow
+    releases the GIL while parsing). A file Arrow cannot parse is yielded
+    as None so the caller can fall back to ``read_incident_csv``.
+
+    Args:
+        paths: CSV paths
+        max_workers: Files read at once (default: all of them)
+
+    Yields:
+        (path, pyarrow Table or None)
+    """
+    paths = [Path(path) for path in paths]
+    if not paths:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers or len(paths)) as pool:
+        futures = [pool.submit(read_incident_table, path) for path in paths]
+        for i, path in enumerate(paths):
+            try:
+                table = futures[i].result()
+            except pa.ArrowInvalid:
+                table = None
+            # Drop the pool's reference so a consumed table can be freed
+            futures[i] = None
+            yield path, table
+
+
+def read_incident_files(raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                        pattern: str = SOURCE_PATTERN,
+                        max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Read and clean all yearly incident CSVs in one frame, bypassing the store.
+
+    The files are parsed concurrently into Arrow tables with one schema
+    and concatenated as chunks without copying, so the full history is
+    converted to pandas once instead of concatenating per-file frames.
+
+    Args:
+        raw_dir: Directory containing the yearly CSVs
+        pattern: Glob of the files to read
+        max_workers: Files read at once (default: all of them)
+
+    Returns:
+        Cleaned DataFrame
+    """
+    paths = sorted(Path(raw_dir).glob(pattern))
+    if not paths:
+        raise FileNotFoundError(f"No crime incident files matching {pattern} in {raw_dir}")
+    tables, frames = [], []
+    for path, table in iter_incident_tables(paths, max_workers):
+        if table is None:
+            frames.append(_read_incident_csv_pandas(path))
+        else:
+            tables.append(table)
+    if tables:
+        # Chunks keep their own dictionaries until unified; no values are copied
+        table = pa.concat_tables(tables).unify_dictionaries()
+        frames.insert(0, _clean_table(table))
+    if len(frames) == 1:
+        return frames[0]
+    return apply_schema(pd.concat(frames, ignore_index=True))
+
+
+def incident_keys(df: pd.DataFrame) -> pd.Series:
+    """
+    Build the record key used to match incidents across extracts.
+
+    Uses ``CCN`` and falls back to ``OBJECTID`` for rows without one.
+
+    Args:
+        df: Cleaned incident DataFrame
+
+    Returns:
+        Series of string keys aligned with ``df``
+    """
+    keys = df[KEY_COLUMN].astype('string')
+    if 'OBJECTID' in df.columns:
+        fallback = 'OBJECTID:' + df['OBJECTID'].astype('Int64').astype('string')
+        keys = keys.fillna(fallback)
+    return keys
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """
+    Hash the content of each incident row.
+
+    Volatile identifiers, the derived ``YEAR`` and internal columns are
+    excluded, and columns are hashed in name order, so the same record
+    hashes identically whichever extract it came from.
+
+    Args:
+        df: Cleaned incident DataFrame
+
+    Returns:
+        Series of uint64 hashes aligned with ``df``
+    """
+    content = sorted(col for col in df.columns
+                     if col not in VOLATILE_COLUMNS and col != 'YEAR'
+                     and not col.startswith('_'))
+    # Hash numbers as float64 so WARD=6 hashes the same whether or not the
+    # extract it came from had missing values (int64 vs float64 columns)
+    numeric = [col for col in content if pd.api.types.is_numeric_dtype(df[col])]
+    values = df[content].astype({col: 'float64' for col in numeric})
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def _file_signature(path: Path, check: str) -> Dict[str, Any]:
+    """Describe a source file by size and mtime, plus SHA-256 when requested."""
+    stat = path.stat()
+    signature = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if check == 'hash':
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        signature['sha256'] = digest.hexdigest()
+    return signature
+
+
+def _source_changed(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> bool:
+    """Compare two signatures, trusting the content hash when both have one."""
+    if old is None:
+        return True
+    if 'sha256' in old and 'sha256' in new:
+        return old['sha256'] != new['sha256']
+    return old.get('size') != new['size'] or old.get('mtime_ns') != new['mtime_ns']
+
+
+def _partition_dir(store_dir: Path, keys: Sequence[str], values: Sequence[Any]) -> Path:
+    """Build a hive partition directory, URI-encoding values like 'THEFT F/AUTO'."""
+    path = store_dir
+    for key, value in zip(keys, values):
+        value = NULL_PARTITION if pd.isna(value) else quote(str(value), safe='')
+        path = path / f"{key}={value}"
+    return path
+
+
+def _read_manifest(store_dir: Path) -> Dict[str, Any]:
+    manifest_path = store_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+    return {}
+
+
+def _write_manifest(store_dir: Path, manifest: Dict[str, Any]) -> None:
+    manifest_path = store_dir / MANIFEST_NAME
+    tmp_path = manifest_path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(manifest_path)
+
+
+def _write_parquet_atomic(table: pa.Table, file_path: Path) -> None:
+    """Write a Parquet file via a temporary name so readers never see a partial file."""
+    tmp_path = file_path.with_name(f'.{file_path.name}.tmp')
+    pq.write_table(table, tmp_path, compression='zstd')
+    tmp_path.replace(file_path)
+
+
+def write_partitions(df: pd.DataFrame, store_dir: Path, partition_by: Sequence[str],
+                     file_stem: str) -> List[str]:
+    """
+    Write a cleaned frame into the partitioned store.
+
+    Rows with a missing partition value (e.g. no ``YEAR`` because the
+    report date did not parse) go to the ``NULL_PARTITION`` directory.
+
+    Args:
+        df: Cleaned incident DataFrame
+        store_dir: Root directory of the Parquet dataset
+        partition_by: Partition columns, e.g. ['YEAR'] or ['YEAR', 'OFFENSE']
+        file_stem: Name of the Parquet file written inside each partition
+
+    Returns:
+        List of written file paths, relative to ``store_dir``
+    """
+    written = []
+    for values, part in df.groupby(list(partition_by), sort=True, observed=True, dropna=False):
+        values = values if isinstance(values, tuple) else (values,)
+        part_dir = _partition_dir(store_dir, partition_by, values)
+        part_dir.mkdir(parents=True, exist_ok=True)
+        table = to_arrow(part.drop(columns=list(partition_by)))
+        file_path = part_dir / f'{file_stem}.parquet'
+        _write_parquet_atomic(table, file_path)
+        written.append(file_path.relative_to(store_dir).as_posix())
+    return written
+
+
+def build_incident_store(raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                         store_dir: Union[str, Path] = INCIDENT_STORE_DIR,
+                         partition_by: Sequence[str] = ('YEAR',),
+                         check: str = 'stat',
+                         force: bool = False,
+                         max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build or refresh the partitioned Parquet incident store.
+
+    Only source CSVs whose signature changed since the last build are
+    re-parsed (concurrently, see ``iter_incident_tables``); files
+    belonging to removed sources are deleted.
+
+    Args:
+        raw_dir: Directory containing ``Crime_Incidents_in_20*.csv``
+        store_dir: Root directory of the Parquet dataset
+        partition_by: ['YEAR'] or ['YEAR', 'OFFENSE']
+        check: 'stat' (size + mtime) or 'hash' (SHA-256 of the file content)
+        force: Rebuild every partition regardless of signatures
+        max_workers: Source CSVs parsed at once (default: all stale ones)
+
+    Returns:
+        Dictionary with lists of 'rebuilt', 'unchanged' and 'removed'
+        sources, and 'undated': rows across all sources without a parsed
+        report date (stored with a null ``YEAR``)
+    """
+    raw_dir, store_dir = Path(raw_dir), Path(store_dir)
+    partition_by = list(partition_by)
+    if not set(partition_by) <= set(PARTITION_COLUMNS) or partition_by[0] != 'YEAR':
+        raise ValueError("partition_by must be ['YEAR'] or ['YEAR', 'OFFENSE']")
+    if check not in ('stat', 'hash'):
+        raise ValueError("check must be 'stat' or 'hash'")
+
+    sources = sorted(raw_dir.glob(SOURCE_PATTERN))
+    if not sources:
+        raise FileNotFoundError(f"No crime incident files matching {SOURCE_PATTERN} in {raw_dir}")
+
+    manifest = _read_manifest(store_dir)
+    if (force or manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('partition_by') != partition_by):
+        if store_dir.exists():
+            shutil.rmtree(store_dir)
+        manifest = {}
+    store_dir.mkdir(parents=True, exist_ok=True)
+    entries = manifest.get('sources', {})
+
+    summary = {'rebuilt': [], 'unchanged': [], 'removed': []}
+    for name in sorted(set(entries) - {p.name for p in sources}):
+        for rel_path in entries.pop(name)['files']:
+            (store_dir / rel_path).unlink(missing_ok=True)
+        summary['removed'].append(name)
+
+    stale = {}
+    for path in sources:
+        old = entries.get(path.name)
+        signature = _file_signature(path, check)
+        if not _source_changed(old, signature):
+            # Keep the stored hash fresh if only the mtime moved
+            entries[path.name] = {**old, **signature}
+            summary['unchanged'].append(path.name)
+        else:
+            stale[path] = signature
+
+    # Stale sources are parsed concurrently and written one at a time
+    for path, table in iter_incident_tables(list(stale), max_workers):
+        signature = stale[path]
+        old = entries.get(path.name)
+        if old is not None:
+            for rel_path in old['files']:
+                (store_dir / rel_path).unlink(missing_ok=True)
+        if table is None:
+            df = _read_incident_csv_pandas(path)
+        else:
+            df = _clean_table(table)
+            del table
+        df[HASH_COLUMN] = row_hashes(df)
+        files = write_partitions(df, store_dir, partition_by, f'part-{path.stem}')
+        # A fresh yearly download supersedes feed rows it has caught up with
+        hashes = pd.Series(df[HASH_COLUMN].to_numpy(), index=incident_keys(df))
+        manifest['feed'] = _prune_feed(store_dir, manifest.get('feed', {}),
+                                       hashes[~hashes.index.duplicated(keep='last')])
+        entries[path.name] = {**signature, 'files': files, 'rows': len(df),
+                              'undated': int(df['YEAR'].isna().sum())}
+        summary['rebuilt'].append(path.name)
+
+    _write_manifest(store_dir, {'version': MANIFEST_VERSION,
+                                'partition_by': partition_by,
+                                'sources': entries,
+                                'feed': manifest.get('feed', {'files': []})})
+    summary['undated'] = sum(entry.get('undated', 0) for entry in entries.values())
+    if summary['rebuilt'] or summary['removed']:
+        print(f"✅ Incident store refreshed: {len(summary['rebuilt'])} rebuilt, "
+              f"{len(summary['unchanged'])} unchanged, {len(summary['removed'])} removed")
+        if summary['undated']:
+            print(f"⚠️  {summary['undated']:,} incidents without a parsable REPORT_DATE "
+                  f"kept under YEAR={NULL_PARTITION}")
+    return summary
+
+
+def incident_dataset(store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> ds.Dataset:
+    """
+    Open the incident store as a pyarrow Dataset.
+
+    Args:
+        store_dir: Root directory of the Parquet dataset
+
+    Returns:
+        pyarrow Dataset with the partition columns restored
+    """
+    store_dir = Path(store_dir)
+    partition_by = _read_manifest(store_dir).get('partition_by', ['YEAR'])
+    partitioning = ds.partitioning(pa.schema([(col, pa.string()) for col in partition_by]),
+                                   flavor='hive')
+    return ds.dataset(store_dir, format='parquet', partitioning=partitioning,
+                      exclude_invalid_files=True)
+
+
+def load_incidents(years: Optional[Sequence[Union[int, str]]] = None,
+                   offenses: Optional[Sequence[str]] = None,
+                   columns: Optional[List[str]] = None,
+                   require_coordinates: bool = False,
+                   refresh: bool = True,
+                   raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                   store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> pd.DataFrame:
+    """
+    Load cleaned incidents from the Parquet store.
+
+    Filters are pushed down to the dataset scan, so asking for one year of
+    homicides only touches that year's partition.
+
+    Args:
+        years: Years to load (e.g. [2025]); None loads all
+        offenses: OFFENSE values to keep; None keeps all
+        columns: Columns to load; None loads all
+        require_coordinates: Keep only rows with LATITUDE and LONGITUDE
+        refresh: Rebuild stale partitions from ``raw_dir`` before reading
+        raw_dir: Directory containing the yearly source CSVs
+        store_dir: Root directory of the Parquet dataset
+
+    Returns:
+        Cleaned incident DataFrame
+    """
+    if refresh:
+        build_incident_store(raw_dir, store_dir,
+                             partition_by=_read_manifest(Path(store_dir)).get('partition_by', ['YEAR']))
+
+    conditions = []
+    if years is not None:
+        conditions.append(ds.field('YEAR').isin([str(y) for y in years]))
+    if offenses is not None:
+        conditions.append(ds.field('OFFENSE').isin(list(offenses)))
+    if require_coordinates:
+        conditions.append(ds.field('LATITUDE').is_valid() & ds.field('LONGITUDE').is_valid())
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    store_dir = Path(store_dir)
+    feed_files = _read_manifest(store_dir).get('feed', {}).get('files', [])
+    dataset = incident_dataset(store_dir)
+    if not feed_files:
+        df = to_pandas(dataset.to_table(columns=columns, filter=expression))
+        return df.drop(columns=[col for col in df.columns if col.startswith('_')])
+
+    # Feed rows replace yearly rows for the same record, even when the
+    # revision moved the record out of the requested filter
+    read_columns = list(dict.fromkeys(list(columns or dataset.schema.names)
+                                      + [KEY_COLUMN, 'OBJECTID', '__filename']))
+    df = to_pandas(dataset.to_table(columns=read_columns, filter=expression))
+    df = df[~_superseded(df, _feed_keys(store_dir, feed_files))].reset_index(drop=True)
+    if columns is not None:
+        return df[list(columns)]
+    return df.drop(columns=[col for col in df.columns if col.startswith('_')])
+
+
+def _feed_keys(store_dir: Path, feed_files: Sequence[str]) -> set:
+    """Record keys present in the feed partitions."""
+    return set(pd.concat([incident_keys(pq.read_table(store_dir / rel_path,
+                                                      columns=[KEY_COLUMN, 'OBJECTID'],
+                                                      partitioning=None).to_pandas())
+                          for rel_path in feed_files], ignore_index=True))
+
+
+def _superseded(df: pd.DataFrame, feed_keys: set) -> np.ndarray:
+    """Flag yearly rows replaced by a feed row (needs the ``__filename`` column)."""
+    is_feed = df['__filename'].str.endswith('/' + FEED_FILE_NAME).to_numpy(dtype=bool)
+    return incident_keys(df).isin(feed_keys).to_numpy() & ~is_feed
+
+
+def iter_incidents(columns: Optional[List[str]] = None,
+                   batch_size: int = 250_000,
+                   store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> Iterator[pd.DataFrame]:
+    """
+    Stream cleaned incidents from the Parquet store in record batches.
+
+    Like ``load_incidents`` (feed rows replace yearly rows), but only one
+    batch is held in memory at a time. The store is not refreshed.
+
+    Args:
+        columns: Columns to read; None reads all
+        batch_size: Maximum rows per batch
+        store_dir: Root directory of the Parquet dataset
+
+    Yields:
+        Cleaned incident DataFrames of at most ``batch_size`` rows
+    """
+    store_dir = Path(store_dir)
+    feed_files = _read_manifest(store_dir).get('feed', {}).get('files', [])
+    dataset = incident_dataset(store_dir)
+    names = list(columns or [name for name in dataset.schema.names if not name.startswith('_')])
+    feed_keys = _feed_keys(store_dir, feed_files) if feed_files else None
+    read_columns = names if feed_keys is None else list(
+        dict.fromkeys(names + [KEY_COLUMN, 'OBJECTID', '__filename']))
+
+    # Read one batch ahead at most so memory stays at about one batch
+    for batch in dataset.to_batches(columns=read_columns, batch_size=batch_size,
+                                    batch_readahead=1, fragment_readahead=1):
+        if not batch.num_rows:
+            continue
+        df = to_pandas(pa.Table.from_batches([batch]))
+        if feed_keys is not None:
+            df = df.loc[~_superseded(df, feed_keys), names].reset_index(drop=True)
+        yield df
+
+
+def _key_filter(df: pd.DataFrame) -> ds.Expression:
+    """Dataset filter matching the stored rows that share a record key with ``df``."""
+    has_ccn = df[KEY_COLUMN].notna()
+    expression = ds.field(KEY_COLUMN).isin(df.loc[has_ccn, KEY_COLUMN].astype(str).unique().tolist())
+    if not has_ccn.all():
+        object_ids = df.loc[~has_ccn, 'OBJECTID'].dropna().astype('int64').unique().tolist()
+        expression = expression | (ds.field(KEY_COLUMN).is_null()
+                                   & ds.field('OBJECTID').isin(object_ids))
+    return expression
+
+
+def _prune_feed(store_dir: Path, feed: Dict[str, Any], hashes: pd.Series) -> Dict[str, Any]:
+    """
+    Drop feed rows already matched by a rebuilt yearly source.
+
+    ``hashes`` maps record keys to row hashes of the rebuilt source. A feed
+    row is only dropped when the yearly source carries the same revision,
+    so re-reading an older download (or a plain mtime touch) never reverts
+    a newer upserted record.
+    """
+    if hashes.empty:
+        return feed
+    files = []
+    for rel_path in feed.get('files', []):
+        path = store_dir / rel_path
+        if not path.exists():
+            continue
+        rows = to_pandas(pq.read_table(path, partitioning=None))
+        positions = pd.Index(hashes.index).get_indexer(incident_keys(rows))
+        source_hash = hashes.to_numpy()[np.where(positions < 0, 0, positions)]
+        keep = (positions < 0) | (source_hash != rows[HASH_COLUMN].to_numpy())
+        if keep.all():
+            files.append(rel_path)
+        elif keep.any():
+            _write_parquet_atomic(to_arrow(rows[keep]), path)
+            files.append(rel_path)
+        else:
+            path.unlink()
+    return {**feed, 'files': files}
+
+
+def upsert_incidents(source: Union[str, Path, pd.DataFrame] = RAW_DATA_DIR / RECENT_FEED_FILE,
+                     store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> Dict[str, int]:
+    """
+    Merge a new extract (e.g. the rolling 30-day feed) into the incident store.
+
+    Records are matched on ``CCN`` (``OBJECTID`` when missing) and compared
+    by row-content hash. Unchanged records are skipped; new and revised
+    records are written to the ``feed.parquet`` file of their partition and
+    take precedence over older versions when loading. Only the partitions
+    for the years present in the extract are read, so the cost follows the
+    size of the delta rather than the whole history.
+
+    Args:
+        source: Path to an incident CSV, or a DataFrame read with
+            ``read_incident_csv`` (identifier columns must be read as text)
+        store_dir: Root directory of the Parquet dataset (must already exist)
+
+    Returns:
+        Dictionary with counts of 'new', 'changed' and 'unchanged' records
+    """
+    store_dir = Path(store_dir)
+    manifest = _read_manifest(store_dir)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise FileNotFoundError(f"No incident store at {store_dir}; run build_incident_store() first")
+    partition_by = manifest['partition_by']
+
+    if isinstance(source, pd.DataFrame):
+        delta = clean_incidents(source.copy())
+    else:
+        delta = read_incident_csv(source)
+    delta[HASH_COLUMN] = row_hashes(delta)
+    delta_keys = incident_keys(delta)
+    keep = ~delta_keys.duplicated(keep='last').to_numpy()
+    delta, delta_keys = delta[keep].reset_index(drop=True), delta_keys[keep].reset_index(drop=True)
+
+    # Current version of each record in the affected years: feed rows win.
+    # Only rows matching a delta key are materialized.
+    dataset = incident_dataset(store_dir)
+    in_years = ds.field('YEAR').isin(pa.array(sorted(delta['YEAR'].dropna().unique()), pa.string()))
+    if delta['YEAR'].isna().any():
+        in_years = in_years | ds.field('YEAR').is_null()
+    existing = to_pandas(dataset.to_table(columns=[KEY_COLUMN, 'OBJECTID', HASH_COLUMN, '__filename'],
+                                          filter=in_years & _key_filter(delta)))
+    existing['key'] = incident_keys(existing)
+    existing['is_feed'] = existing['__filename'].str.endswith('/' + FEED_FILE_NAME).astype(bool)
+    current = existing.sort_values('is_feed', kind='stable').drop_duplicates('key', keep='last')
+    # Positional lookup keeps the uint64 hashes exact (no float upcast)
+    positions = pd.Index(current['key']).get_indexer(delta_keys)
+    is_new = positions < 0
+    current_hash = current[HASH_COLUMN].to_numpy()[np.where(is_new, 0, positions)]
+    is_changed = ~is_new & (current_hash != delta[HASH_COLUMN].to_numpy())
+    summary = {'new': int(is_new.sum()), 'changed': int(is_changed.sum()),
+               'unchanged': int(len(delta) - is_new.sum() - is_changed.sum())}
+
+    upserts = delta[is_new | is_changed]
+    if len(upserts):
+        upsert_keys = set(delta_keys[is_new | is_changed])
+        # Feed files to rewrite: the target partitions plus any feed file
+        # holding an older revision that moved partitions
+        stale = current[current['is_feed'] & current['key'].isin(upsert_keys)]
+        targets: Dict[Path, List[pd.DataFrame]] = {}
+        for values, part in upserts.groupby(partition_by, sort=True, observed=True, dropna=False):
+            values = values if isinstance(values, tuple) else (values,)
+            path = _partition_dir(store_dir, partition_by, values) / FEED_FILE_NAME
+            targets.setdefault(path, []).append(part.drop(columns=partition_by))
+        for filename in stale['__filename'].unique():
+            targets.setdefault(Path(filename), [])
+
+        feed_files = set(manifest.get('feed', {}).get('files', []))
+        for path, parts in targets.items():
+            frames = []
+            if path.exists():
+                rows = to_pandas(pq.read_table(path, partitioning=None))
+                frames.append(rows[~incident_keys(rows).isin(upsert_keys).to_numpy()])
+            frames.extend(parts)
+            merged = apply_schema(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+            rel_path = path.relative_to(store_dir).as_posix()
+            if len(merged):
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _write_parquet_atomic(to_arrow(merged), path)
+                feed_files.add(rel_path)
+            else:
+                path.unlink(missing_ok=True)
+                feed_files.discard(rel_path)
+        manifest['feed'] = {'files': sorted(feed_files),
+                            'updated': pd.Timestamp.now(tz='UTC').isoformat()}
+        _write_manifest(store_dir, manifest)
+
+    print(f"✅ Upserted incidents: {summary['new']:,} new, {summary['changed']:,} changed, "
+          f"{summary['unchanged']:,} unchanged")
+    return summary
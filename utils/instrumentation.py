@@ -0,0 +1,284 @@
+"""
+Instrumentation
+
+Opt-in timing and memory tracing for the utils functions and pipeline stages.
+
+Set ``INSTRUMENTATION=time`` (wall/CPU time, rows in/out, peak RSS) or
+``INSTRUMENTATION=memory`` (also tracemalloc peaks, slower) before
+importing ``utils``: every public function exported from ``utils`` is then
+wrapped, each call is appended to ``TRACE_FILE`` as one JSON line, and a
+summary table is printed when the process exits. With
+``PROFILE_SLOWEST=1`` pipeline stages are run under cProfile and the dump
+of the slowest stage is kept.
+"""
+
+import atexit
+import cProfile
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from ._config import CACHE_DIR, INSTRUMENTATION, PROFILE_SLOWEST, TRACE_FILE
+
+ENABLED = INSTRUMENTATION not in ('', 'off', '0')
+TRACE_MEMORY = INSTRUMENTATION == 'memory'
+PROFILE_DIR = CACHE_DIR / 'profiles'
+
+# One id per run, inherited by pipeline worker processes through the environment
+RUN_ID = os.environ.get('INSTRUMENTATION_RUN') or f'{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}'
+if ENABLED or PROFILE_SLOWEST:
+    os.environ['INSTRUMENTATION_RUN'] = RUN_ID
+
+RECORDS: List[Dict[str, Any]] = []
+_local = threading.local()
+_lock = threading.Lock()
+
+
+def _rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / 1024**2 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def _rows(value: Any) -> Optional[int]:
+    """Row count of a frame, series or array result."""
+    if hasattr(value, 'shape') and getattr(value, 'shape', None):
+        return int(value.shape[0])
+    return None
+
+
+def _write(record: Dict[str, Any]) -> None:
+    with _lock:
+        RECORDS.append(record)
+        TRACE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(TRACE_FILE, 'a') as handle:
+            handle.write(json.dumps(record, default=str) + '\n')
+
+
+@contextmanager
+def span(name: str, kind: str = 'function', rows_in: Optional[int] = None,
+         profile: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Record one timed block.
+
+    Nested spans record their parent and depth; with ``INSTRUMENTATION=memory``
+    each span also records its own tracemalloc peak above the memory in use
+    when it started.
+
+    Args:
+        name: Function or stage name
+        kind: 'function' or 'stage'
+        rows_in: Input row count, if known
+        profile: Run the block under cProfile and save the dump
+
+    Yields:
+        The record being built (set ``rows_out`` on it when known)
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    record = {'run': RUN_ID, 'pid': os.getpid(), 'name': name, 'kind': kind,
+              'parent': stack[-1]['name'] if stack else None, 'depth': len(stack),
+              'rows_in': rows_in, 'rows_out': None}
+
+    if TRACE_MEMORY:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)
+        tracemalloc.reset_peak()
+        record['_base'] = current
+    record['_peak'] = 0
+    stack.append(record)
+
+    profiler = cProfile.Profile() if profile else None
+    wall, cpu = time.perf_counter(), time.process_time()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield record
+    except BaseException as error:
+        record['error'] = f'{type(error).__name__}: {error}'
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record['wall_s'] = round(time.perf_counter() - wall, 6)
+        record['cpu_s'] = round(time.process_time() - cpu, 6)
+        record['rss_peak_mb'] = _rss_mb()
+        stack.pop()
+        peak = record.pop('_peak')
+        base = record.pop('_base', None)
+        if TRACE_MEMORY:
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1]['_peak'] = max(stack[-1]['_peak'], peak)
+            tracemalloc.reset_peak()
+            record['alloc_peak_mb'] = round((peak - base) / 1024**2, 2)
+        if profiler is not None:
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            record['profile'] = str(PROFILE_DIR / f'{RUN_ID}-{name}.prof')
+            profiler.dump_stats(record['profile'])
+        record['timestamp'] = time.time()
+        _write(record)
+
+
+def traced(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a function so each call is recorded with ``span``.
+
+    Args:
+        func: Function to wrap
+        name: Name in the trace (default: ``module.qualname``)
+
+    Returns:
+        Wrapped function
+    """
+    if getattr(func, '__traced__', False):
+        return func
+    label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        first = next((arg for arg in args if hasattr(arg, 'shape')), None)
+        with span(label, rows_in=_rows(first)) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = _rows(result)
+            return result
+
+    wrapper.__traced__ = True
+    return wrapper
+
+
+def _trace_class(cls: type) -> None:
+    """Wrap the public methods and classmethods defined on a class."""
+    for attr, value in list(vars(cls).items()):
+        if attr.startswith('_'):
+            continue
+        if isinstance(value, classmethod):
+            setattr(cls, attr, classmethod(traced(value.__func__)))
+        elif isinstance(value, staticmethod):
+            setattr(cls, attr, staticmethod(traced(value.__func__)))
+        elif inspect.isfunction(value):
+            setattr(cls, attr, traced(value))
+
+
+def instrument_exports(namespace: Dict[str, Any], names: List[str]) -> None:
+    """
+    Wrap the exported functions (and class methods) of the utils package.
+
+    The wrapper replaces the name both in ``namespace`` and in the module
+    that defines it, so ``from utils.incident_store import load_incidents``
+    after ``import utils`` is traced as well.
+
+    Args:
+        namespace: ``globals()`` of ``utils/__init__.py``
+        names: ``__all__``
+    """
+    for name in names:
+        value = namespace.get(name)
+        if inspect.isclass(value):
+            _trace_class(value)
+        elif inspect.isfunction(value) and value.__module__ != __name__:
+            wrapped = traced(value)
+            namespace[name] = wrapped
+            module = sys.modules.get(value.__module__)
+            if module is not None and getattr(module, name, None) is value:
+                setattr(module, name, wrapped)
+
+
+def load_trace(path: Union[str, Path] = TRACE_FILE, run: Optional[str] = RUN_ID) -> List[Dict[str, Any]]:
+    """
+    Read trace records from the JSON lines file.
+
+    Args:
+        path: Trace file
+        run: Only records of this run (None for all runs)
+
+    Returns:
+        List of records
+    """
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path) as handle:
+        records = [json.loads(line) for line in handle if line.strip()]
+    return [r for r in records if run is None or r.get('run') == run]
+
+
+def trace_summary(records: Optional[List[Dict[str, Any]]] = None):
+    """
+    Summarize trace records by name.
+
+    Args:
+        records: Records to summarize (default: this run's records in
+            the trace file, including pipeline worker processes)
+
+    Returns:
+        pandas DataFrame with calls, wall/CPU time, rows and memory per
+        name, slowest first
+    """
+    import pandas as pd
+
+    records = load_trace() if records is None else records
+    if not records:
+        return pd.DataFrame()
+    df = pd.DataFrame(records)
+    aggregations = {'calls': ('wall_s', 'size'), 'wall_s': ('wall_s', 'sum'),
+                    'max_wall_s': ('wall_s', 'max'), 'cpu_s': ('cpu_s', 'sum'),
+                    'rows_in': ('rows_in', 'max'), 'rows_out': ('rows_out', 'max'),
+                    'rss_peak_mb': ('rss_peak_mb', 'max')}
+    if 'alloc_peak_mb' in df.columns:
+        aggregations['alloc_peak_mb'] = ('alloc_peak_mb', 'max')
+    summary = df.groupby(['kind', 'name']).agg(**aggregations)
+    return summary.sort_values('wall_s', ascending=False).round(3)
+
+
+def print_trace_summary(records: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Print ``trace_summary`` as a table."""
+    summary = trace_summary(records)
+    if summary.empty:
+        return
+    print("📊 Instrumentation summary (slowest first):")
+    print(summary.to_string())
+    print(f"   Trace: {TRACE_FILE}")
+
+
+def keep_slowest_profile(records: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Keep only the cProfile dump of the slowest profiled stage.
+
+    Args:
+        records: Stage records with a 'profile' entry
+
+    Returns:
+        Path of the kept dump, or None
+    """
+    profiled = [r for r in records if r.get('profile') and Path(r['profile']).exists()]
+    if not profiled:
+        return None
+    slowest = max(profiled, key=lambda r: r['wall_s'])
+    for record in profiled:
+        if record is not slowest:
+            Path(record['profile']).unlink(missing_ok=True)
+    print(f"✅ cProfile dump of the slowest stage ({slowest['name']}, {slowest['wall_s']:.1f}s): "
+          f"{slowest['profile']}")
+    return slowest['profile']
+
+
+if ENABLED:
+    atexit.register(print_trace_summary)
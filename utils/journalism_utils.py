@@ -6,72 +6,364 @@ Specialized functions for fast-paced journalism workflows.
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from typing import List, Dict, Any, Optional, Union
+import pyarrow as pa
+from typing import Callable, List, Dict, Any, Optional, Sequence, Union
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
 import json
-import sys
 import os
+import tempfile
 
-# Try to import config for proper path resolution
-try:
-    # Add parent directory to path to import config
-    current_dir = Path(__file__).parent
-    project_root = current_dir.parent
-    if str(project_root) not in sys.path:
-        sys.path.append(str(project_root))
-    import config
-    PROCESSED_DATA_DIR = config.PROCESSED_DATA_DIR
-    PROJECT_ROOT = config.PROJECT_ROOT
-except ImportError:
-    # Fallback if config not available (shouldn't happen in normal use)
-    PROJECT_ROOT = Path.cwd()
-    PROCESSED_DATA_DIR = PROJECT_ROOT / "data" / "processed"
+from ._config import PROCESSED_DATA_DIR
+from ._plotting import pyplot
+from .dataset_profile import DatasetProfile, profile_dataset
+from .sketches import SketchSet
+
+
+# Export format -> file extension
+EXPORT_FORMATS = {
+    'csv': '.csv',
+    'csv.gz': '.csv.gz',
+    'json': '.json',
+    'json.gz': '.json.gz',
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'html': '.html',
+    'excel': '.xlsx',
+    # Directory of column-oriented JSON shards plus manifest.json
+    'shards': '_shards',
+}
+EXPORT_MANIFEST = '_export_hashes.json'
+# Fixed gzip header timestamp so unchanged data gives byte-identical files
+_GZIP = {'method': 'gzip', 'mtime': 0}
+SHARD_ROWS = 2000
+SHARD_KEY_COLUMNS = ('REPORT_DATE', 'WARD', 'OFFENSE')
+SHARD_MANIFEST = 'manifest.json'
+# Text columns are dictionary-encoded when they have at most this share of distinct
+# values and at most DICTIONARY_MAX_VALUES of them (dictionaries live in the manifest)
+DICTIONARY_MAX_RATIO = 0.5
+DICTIONARY_MAX_VALUES = 1000
+
+
+def _write_frame(df: pd.DataFrame, path: Path, format_type: str, index: bool = False,
+                 date_format: str = 'epoch') -> None:
+    """Write ``df`` to ``path`` in ``format_type`` (the path's suffix is ignored)."""
+    if format_type in ('csv', 'csv.gz'):
+        df.to_csv(path, index=index, compression=_GZIP if format_type == 'csv.gz' else None)
+    elif format_type in ('json', 'json.gz'):
+        records = df.reset_index() if index else df
+        records.to_json(path, orient='records', indent=2, date_format=date_format,
+                        compression=_GZIP if format_type == 'json.gz' else None)
+    elif format_type == 'parquet':
+        df.to_parquet(path, index=index, compression='zstd')
+    elif format_type == 'feather':
+        # Feather stores no index; keep it as columns when asked to
+        df.reset_index(drop=not index).to_feather(path, compression='zstd')
+    elif format_type == 'html':
+        df.to_html(path, index=index, table_id="data-table",
+                   classes="table table-striped")
+    elif format_type == 'excel':
+        df.to_excel(path, index=index, engine='openpyxl')
+    else:
+        raise ValueError(f"format_type must be one of {', '.join(EXPORT_FORMATS)}")
+
+
+def _write_atomic(df: pd.DataFrame, filepath: Path, format_type: str, index: bool = False,
+                  date_format: str = 'epoch') -> None:
+    """
+    Write to a temporary file next to ``filepath`` and rename it into place,
+    so readers never see a half-written export.
+    """
+    if format_type == 'shards':
+        # Shard files are renamed into place one by one, with the manifest last
+        export_json_shards(df, filepath, index=index)
+        return
+    fd, tmp = tempfile.mkstemp(dir=filepath.parent, prefix=f'.{filepath.name}.', suffix='.tmp')
+    os.close(fd)
+    try:
+        _write_frame(df, Path(tmp), format_type, index=index, date_format=date_format)
+        os.replace(tmp, filepath)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def frame_hash(df: pd.DataFrame, index: bool = False) -> str:
+    """
+    Content hash of a DataFrame (values, column names and dtypes).
+
+    Args:
+        df: pandas DataFrame
+        index: Include the index in the hash
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    if index:
+        digest.update(json.dumps([str(name) for name in df.index.names]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=index).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _shard_columns(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Column specs for the shard manifest, each with its encoded ``values``
+    array and ``missing`` mask (not written to the manifest).
+    """
+    columns = []
+    for name, series in df.items():
+        spec: Dict[str, Any] = {'name': str(name)}
+        missing = series.isna().to_numpy()
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, dictionary = series.cat.codes.to_numpy(), series.cat.categories
+        elif pd.api.types.is_string_dtype(series) or series.dtype == object:
+            codes, dictionary = pd.factorize(series, sort=True)
+            if len(dictionary) > min(DICTIONARY_MAX_RATIO * len(series), DICTIONARY_MAX_VALUES):
+                codes = None
+        else:
+            codes = None
+
+        if codes is not None:
+            spec.update(type='dictionary', dictionary=dictionary.tolist())
+            values = codes.astype(np.int32)
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            spec.update(type='datetime', unit='ms')
+            values = series.dt.as_unit('ms').array.asi8
+        elif pd.api.types.is_bool_dtype(series):
+            spec.update(type='boolean')
+            values = series.to_numpy(dtype=bool, na_value=False)
+        elif pd.api.types.is_integer_dtype(series):
+            spec.update(type='number')
+            values = series.to_numpy(dtype=np.int64, na_value=0)
+        elif pd.api.types.is_float_dtype(series):
+            spec.update(type='number')
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            if series.dtype == np.float32:
+                # Shortest float32 repr, so 38.90412 is not written as 38.904121398925781
+                values = (pa.array(series.to_numpy(), from_pandas=True).cast(pa.string())
+                          .cast(pa.float64()).to_numpy(zero_copy_only=False))
+        else:
+            spec.update(type='string')
+            values = series.astype(object).to_numpy()
+        columns.append({**spec, 'values': values, 'missing': missing})
+    return columns
+
+
+def _shard_stats(column: Dict[str, Any], start: int, end: int) -> Optional[Dict[str, Any]]:
+    """Min / max (and dictionary codes present) of a key column within one shard."""
+    present = column['values'][start:end][~column['missing'][start:end]]
+    if not len(present):
+        return None
+    if column['type'] == 'dictionary':
+        codes = np.unique(present)
+        values = [column['dictionary'][code] for code in codes]
+        return {'min': min(values), 'max': max(values), 'codes': codes.tolist()}
+    return {'min': present.min().item(), 'max': present.max().item()}
+
+
+def export_json_shards(df: pd.DataFrame, directory: Union[str, Path],
+                       shard_rows: int = SHARD_ROWS,
+                       key_columns: Sequence[str] = SHARD_KEY_COLUMNS,
+                       sort_by: Optional[Sequence[str]] = None,
+                       index: bool = False) -> str:
+    """
+    Export a table as column-oriented JSON shards of ``shard_rows`` rows.
+
+    Each shard holds one array per column; categorical and repetitive text
+    columns are written as integer codes into a dictionary stored once in
+    ``manifest.json``, datetimes as epoch milliseconds and missing values
+    as null. The manifest lists the shards with their row offset and the
+    min / max (plus dictionary codes) of ``key_columns``, so a front end
+    can fetch only the pages and filters it needs.
+
+    Shards are serialized one at a time and named by content hash
+    (``part-00000.<hash>.json``): unchanged shards are not rewritten and
+    stay cacheable. The manifest is replaced last and shards it no longer
+    references are then removed.
+
+    Args:
+        df: pandas DataFrame to export
+        directory: Output directory
+        shard_rows: Rows per shard
+        key_columns: Columns summarized per shard (those present in ``df``)
+        sort_by: Sort rows first (e.g. ['REPORT_DATE']) for tight shard ranges
+        index: Write the index as columns
+
+    Returns:
+        Path to the manifest
+    """
+    if shard_rows < 1:
+        raise ValueError("shard_rows must be at least 1")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    df = df.reset_index() if index else df
+    if sort_by:
+        df = df.sort_values(list(sort_by), kind='stable')
+    columns = _shard_columns(df)
+    keys = [column for column in columns if column['name'] in key_columns]
+
+    shards = []
+    for number, start in enumerate(range(0, max(len(df), 1), shard_rows)):
+        end = min(start + shard_rows, len(df))
+        payload = {}
+        for column in columns:
+            values = column['values'][start:end].tolist()
+            for i in np.flatnonzero(column['missing'][start:end]):
+                values[i] = None
+            payload[column['name']] = values
+        data = json.dumps({'offset': start, 'rows': end - start, 'columns': payload},
+                          separators=(',', ':'), ensure_ascii=False).encode()
+        del payload
+        name = f'part-{number:05d}.{hashlib.blake2b(data, digest_size=6).hexdigest()}.json'
+        path = directory / name
+        if not path.exists():
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix='.tmp')
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(data)
+            os.replace(tmp, path)
+        shards.append({'file': name, 'offset': start, 'rows': end - start, 'bytes': len(data),
+                       'stats': {column['name']: _shard_stats(column, start, end) for column in keys}})
+
+    manifest = {
+        'rows': len(df),
+        'shard_rows': shard_rows,
+        'columns': [{k: v for k, v in column.items() if k not in ('values', 'missing')}
+                    for column in columns],
+        'shards': shards,
+    }
+    manifest_path = directory / SHARD_MANIFEST
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f'.{SHARD_MANIFEST}.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as handle:
+        json.dump(manifest, handle, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp, manifest_path)
+
+    current = {shard['file'] for shard in shards}
+    for path in directory.glob('part-*.json'):
+        if path.name not in current:
+            path.unlink()
+    return str(manifest_path)
 
 
 def quick_export_for_web(df: pd.DataFrame, filename: str, 
-                        format_type: str = 'csv') -> str:
+                        format_type: str = 'csv',
+                        date_format: str = 'epoch') -> str:
     """
     Quickly export data for web publishing or sharing.
     
     Args:
         df: pandas DataFrame to export
         filename: Output filename (without extension)
-        format_type: 'csv', 'json', 'html' or 'excel'
+        format_type: 'csv', 'json', 'html', 'excel', 'parquet', 'feather',
+            'csv.gz', 'json.gz' or 'shards' (a ``<filename>_shards/``
+            directory, see ``export_json_shards``)
+        date_format: Datetimes in JSON output: 'epoch' (milliseconds) or 'iso'
         
     Returns:
-        Path to the exported file
+        Path to the exported file (the shard directory for 'shards')
     """
+    if format_type not in EXPORT_FORMATS:
+        raise ValueError(f"format_type must be one of {', '.join(EXPORT_FORMATS)}")
     data_dir = PROCESSED_DATA_DIR
     data_dir.mkdir(parents=True, exist_ok=True)
     
-    if format_type == 'csv':
-        filepath = data_dir / f"{filename}.csv"
-        df.to_csv(filepath, index=False)
-    elif format_type == 'json':
-        filepath = data_dir / f"{filename}.json"
-        df.to_json(filepath, orient='records', indent=2)
-    elif format_type == 'html':
-        filepath = data_dir / f"{filename}.html"
-        df.to_html(filepath, index=False, table_id="data-table", 
-                  classes="table table-striped")
-    elif format_type == 'excel':
-        filepath = data_dir / f"{filename}.xlsx"
-        df.to_excel(filepath, index=False)
-    else:
-        raise ValueError("format_type must be 'csv', 'json', 'html', or 'excel'")
+    filepath = data_dir / f"{filename}{EXPORT_FORMATS[format_type]}"
+    _write_atomic(df, filepath, format_type, date_format=date_format)
     
     print(f"✅ Data exported to: {filepath}")
     return str(filepath)
 
 
+def batch_export_for_web(frames: Dict[str, Union[pd.DataFrame, Callable[[], pd.DataFrame]]],
+                         formats: Union[str, List[str]] = 'csv',
+                         output_dir: Union[str, Path, None] = None,
+                         index: bool = False,
+                         skip_unchanged: bool = True,
+                         max_workers: Optional[int] = None,
+                         date_format: str = 'epoch') -> Dict[str, Dict[str, str]]:
+    """
+    Export many DataFrames in several formats at once.
+
+    Files are written concurrently on a thread pool, each to a temporary
+    file that is renamed into place. A content hash per output is kept in
+    ``_export_hashes.json`` in the output directory, and outputs whose data
+    has not changed since the last export are left untouched.
+
+    Args:
+        frames: Output name -> DataFrame, or a zero-argument callable that
+            builds it (evaluated on the pool, only once per name)
+        formats: Format or list of formats (see ``EXPORT_FORMATS``)
+        output_dir: Target directory (default: data/processed)
+        index: Write the index (for pivoted tables)
+        skip_unchanged: Skip outputs whose content hash is unchanged
+        max_workers: Thread pool size (default: ThreadPoolExecutor's)
+        date_format: Datetimes in JSON output: 'epoch' (milliseconds) or 'iso'
+
+    Returns:
+        Dictionary of name -> {format: path}
+    """
+    formats = [formats] if isinstance(formats, str) else list(formats)
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown format(s) {', '.join(unknown)}; use {', '.join(EXPORT_FORMATS)}")
+    data_dir = Path(output_dir) if output_dir is not None else PROCESSED_DATA_DIR
+    data_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest_path = data_dir / EXPORT_MANIFEST
+    previous = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    hashes = dict(previous)
+
+    def resolve(item):
+        name, frame = item
+        df = frame() if callable(frame) else frame
+        return name, df, frame_hash(df, index=index)
+
+    results = {name: {} for name in frames}
+    written, skipped = 0, 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        resolved = list(pool.map(resolve, frames.items()))
+        futures = {}
+        for name, df, digest in resolved:
+            for fmt in formats:
+                filepath = data_dir / f"{name}{EXPORT_FORMATS[fmt]}"
+                results[name][fmt] = str(filepath)
+                key = filepath.name
+                # ISO JSON differs from the epoch default for the same data
+                output_digest = f'{digest}:iso' if date_format == 'iso' and fmt.startswith('json') else digest
+                if skip_unchanged and previous.get(key) == output_digest and filepath.exists():
+                    skipped += 1
+                    continue
+                futures[pool.submit(_write_atomic, df, filepath, fmt, index,
+                                    date_format)] = (key, output_digest)
+        for future in as_completed(futures):
+            future.result()
+            key, digest = futures[future]
+            hashes[key] = digest
+            written += 1
+
+    if hashes != previous:
+        fd, tmp = tempfile.mkstemp(dir=data_dir, prefix=f'.{EXPORT_MANIFEST}.', suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(hashes, handle, indent=2, sort_keys=True)
+        os.replace(tmp, manifest_path)
+
+    print(f"✅ Exported {written} file(s) to {data_dir} ({skipped} unchanged, skipped)")
+    return results
+
+
 def create_story_charts(df: pd.DataFrame, column: str, 
                        chart_type: str = 'auto', 
                        title: Optional[str] = None,
-                       save_filename: Optional[str] = None) -> None:
+                       save_filename: Optional[str] = None,
+                       show: bool = True) -> None:
     """
     Generate publication-ready charts quickly for journalism.
+
+    To render many charts at once, use ``render_charts`` with
+    ``ChartSpec(name, df, column=...)``.
     
     Args:
         df: pandas DataFrame
@@ -79,116 +371,113 @@ def create_story_charts(df: pd.DataFrame, column: str,
         chart_type: 'auto', 'bar', 'line', 'histogram', 'pie'
         title: Chart title (auto-generated if None)
         save_filename: Save chart as PNG (optional)
+        show: Display the chart; otherwise it is only saved and closed
     """
+    from .charts import draw_story_chart
+
+    plt = pyplot()
     plt.style.use('seaborn-v0_8')  # Clean, professional style
     fig, ax = plt.subplots(figsize=(10, 6))
-    
-    if title is None:
-        title = f"Analysis of {column.replace('_', ' ').title()}"
-    
-    # Auto-detect chart type based on data
-    if chart_type == 'auto':
-        if df[column].dtype in ['object', 'category']:
-            chart_type = 'bar'
-        elif pd.api.types.is_numeric_dtype(df[column]):
-            if df[column].nunique() < 20:
-                chart_type = 'bar'
-            else:
-                chart_type = 'histogram'
-    
-    # Create appropriate chart
-    if chart_type == 'bar':
-        value_counts = df[column].value_counts().head(10)
-        bars = ax.bar(range(len(value_counts)), value_counts.values.tolist())
-        ax.set_xticks(range(len(value_counts)))
-        ax.set_xticklabels(value_counts.index, rotation=45, ha='right')
-        ax.set_ylabel('Count')
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{int(height)}', ha='center', va='bottom')
-    
-    elif chart_type == 'line':
-        if df.index.dtype == 'datetime64[ns]' or 'date' in column.lower():
-            df.plot(y=column, ax=ax, linewidth=2)
-        else:
-            ax.plot(df.index, df[column], linewidth=2)
-        ax.set_ylabel(column.replace('_', ' ').title())
-    
-    elif chart_type == 'histogram':
-        ax.hist(df[column].dropna(), bins=30, alpha=0.7, edgecolor='black')
-        ax.set_xlabel(column.replace('_', ' ').title())
-        ax.set_ylabel('Frequency')
-    
-    elif chart_type == 'pie':
-        value_counts = df[column].value_counts().head(8)
-        ax.pie(value_counts.values.tolist(), labels=value_counts.index.tolist(), autopct='%1.1f%%')
-    
-    ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+    draw_story_chart(ax, df, column, chart_type, title)
     plt.tight_layout()
     
     if save_filename:
         # Save charts in the current working directory (typically notebooks/)
         charts_dir = Path.cwd()
         chart_path = charts_dir / f"{save_filename}.png"
-        plt.savefig(chart_path, dpi=300, bbox_inches='tight')
+        fig.savefig(chart_path, dpi=300, bbox_inches='tight')
         print(f"📊 Chart saved as: {chart_path}")
     
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
-def data_fact_check(df: pd.DataFrame, column: Optional[str] = None) -> Dict[str, Any]:
+def data_fact_check(df: Union[pd.DataFrame, str, Path, SketchSet], column: Optional[str] = None,
+                    profile: Optional[DatasetProfile] = None,
+                    chunk_size: int = 250_000) -> Dict[str, Any]:
     """
     Quick data validation and fact-checking for journalism.
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, a CSV / Parquet path, incident store
+            directory or pyarrow Dataset to profile in chunks (see
+            ``chunked.profile_source``), or a ``SketchSet`` (e.g. from
+            ``load_sketches``) to answer from without reading rows
         column: Specific column to check (if None, checks entire DataFrame)
+        profile: Profile from ``profile_dataset(df)`` to reuse (computed
+            if None)
+        chunk_size: Rows per chunk when streaming
         
     Returns:
         Dictionary with validation results
+
+    Raises:
+        KeyError: If ``df`` is a ``SketchSet`` without a sketch for ``column``
     """
+    streamed = not isinstance(df, pd.DataFrame)
+    if isinstance(df, SketchSet):
+        profile = df.profile()
+        if column and column not in profile.dtypes.index:
+            raise KeyError(f"'{column}' is not in the sketch profile ({', '.join(profile.dtypes.index)})")
+        n_columns = profile.n_columns
+    elif streamed:
+        from .chunked import profile_source, source_columns
+        all_columns = source_columns(df)
+        n_columns = len(all_columns)
+        if column:
+            reuse = profile is not None and column in profile.dtypes.index
+        else:
+            reuse = profile is not None and profile.n_columns == n_columns
+        if not reuse:
+            profile = profile_source(df, [column] if column else None, chunk_size)
+    else:
+        n_columns = len(df.columns)
     results = {
         'timestamp': pd.Timestamp.now(),
-        'total_rows': len(df),
-        'total_columns': len(df.columns)
+        'total_rows': profile.n_rows if streamed else len(df),
+        'total_columns': n_columns
     }
     
     if column:
         # Single column analysis
-        col_data = df[column]
+        if profile is None or column not in profile.dtypes.index:
+            profile = profile_dataset(df, columns=[column])
+        col_stats = profile.columns.loc[column]
         results[f'{column}_stats'] = {
-            'missing_values': col_data.isnull().sum(),
-            'missing_percentage': (col_data.isnull().sum() / len(col_data)) * 100,
-            'unique_values': col_data.nunique(),
-            'data_type': str(col_data.dtype)
+            'missing_values': int(col_stats['missing']),
+            'missing_percentage': float(col_stats['missing_pct']),
+            'unique_values': int(col_stats['unique']) if pd.notna(col_stats['unique']) else None,
+            'data_type': col_stats['dtype']
         }
         
-        if pd.api.types.is_numeric_dtype(col_data):
+        if column in profile.numeric_columns and pd.notna(col_stats['min']):
             results[f'{column}_stats'].update({
-                'min': col_data.min(),
-                'max': col_data.max(),
-                'mean': col_data.mean(),
-                'median': col_data.median(),
-                'zeros': (col_data == 0).sum(),
-                'negatives': (col_data < 0).sum() if col_data.min() < 0 else 0
+                'min': col_stats['min'],
+                'max': col_stats['max'],
+                'mean': col_stats['mean'],
+                'median': col_stats['median'],
+                'zeros': int(col_stats['zeros']),
+                'negatives': int(col_stats['negatives'])
             })
     else:
         # Overall DataFrame analysis
+        if profile is None or profile.n_columns != n_columns:
+            profile = profile_dataset(df)
+        schema = profile.schema()
         results['missing_data'] = {
-            'columns_with_missing': df.columns[df.isnull().any()].tolist(),
-            'total_missing_values': df.isnull().sum().sum(),
-            'missing_percentage': (df.isnull().sum().sum() / (len(df) * len(df.columns))) * 100
+            'columns_with_missing': profile.columns.index[profile.columns['missing'] > 0].tolist(),
+            'total_missing_values': profile.total_missing,
+            'missing_percentage': (profile.total_missing / (profile.n_rows * n_columns)) * 100
         }
         
         results['data_quality'] = {
-            'duplicate_rows': df.duplicated().sum(),
-            'empty_rows': df.isnull().all(axis=1).sum(),
-            'numeric_columns': len(df.select_dtypes(include=[np.number]).columns),
-            'text_columns': len(df.select_dtypes(include=['object']).columns),
-            'date_columns': len(df.select_dtypes(include=['datetime']).columns)
+            'duplicate_rows': profile.duplicate_rows,
+            'empty_rows': profile.empty_rows,
+            'numeric_columns': len(schema.select_dtypes(include=[np.number]).columns),
+            'text_columns': len(schema.select_dtypes(include=['object']).columns),
+            'date_columns': len(schema.select_dtypes(include=['datetime']).columns)
         }
     
     # Print summary
@@ -198,39 +487,63 @@ def data_fact_check(df: pd.DataFrame, column: Optional[str] = None) -> Dict[str,
         stats = results[f'{column}_stats']
         print(f"Column: {column}")
         print(f"Missing values: {stats['missing_values']} ({stats['missing_percentage']:.1f}%)")
-        print(f"Unique values: {stats['unique_values']}")
+        unique = stats['unique_values']
+        print(f"Unique values: {unique if unique is not None else 'not counted (too many)'}")
         if 'min' in stats:
             print(f"Range: {stats['min']} to {stats['max']}")
             print(f"Mean: {stats['mean']:.2f}, Median: {stats['median']:.2f}")
     else:
         print(f"Total records: {results['total_rows']:,}")
         print(f"Missing data: {results['missing_data']['total_missing_values']:,} values ({results['missing_data']['missing_percentage']:.1f}%)")
-        print(f"Duplicate rows: {results['data_quality']['duplicate_rows']:,}")
+        duplicates = results['data_quality']['duplicate_rows']
+        print(f"Duplicate rows: {f'{duplicates:,}' if duplicates is not None else 'not tracked'}")
         if results['missing_data']['columns_with_missing']:
             print(f"Columns with missing data: {', '.join(results['missing_data']['columns_with_missing'])}")
     
     return results
 
 
-def quick_summary_table(df: pd.DataFrame, group_by: str, 
+def quick_summary_table(df: Union[pd.DataFrame, str, Path], group_by: str, 
                        aggregate_cols: List[str], 
-                       agg_func: str = 'sum') -> pd.DataFrame:
+                       agg_func: str = 'sum',
+                       backend: str = 'pandas',
+                       chunk_size: int = 250_000) -> pd.DataFrame:
     """
     Create quick summary tables for journalism (like "totals by state").
     
     Args:
-        df: pandas DataFrame
+        df: pandas DataFrame, or a CSV / Parquet path, incident store
+            directory or pyarrow Dataset (streamed in chunks with the
+            pandas backend, see ``chunked.chunked_summary_table``; scanned
+            lazily with the polars backend), or with the sqlite backend a
+            SQLite store path or connection (None for ``SQLITE_PATH``)
         group_by: Column to group by
         aggregate_cols: Columns to aggregate
         agg_func: 'sum', 'mean', 'count', 'max', 'min'
+        backend: 'pandas', 'polars' (lazy, multi-threaded; see
+            ``polars_backend.polars_summary_table``) or 'sqlite' (one
+            GROUP BY in the database; see ``sqlite_store.sqlite_summary_table``)
+        chunk_size: Rows per chunk when streaming with the pandas backend
         
     Returns:
         Summarized DataFrame
     """
-    summary = df.groupby(group_by)[aggregate_cols].agg(agg_func)
-    
-    # Sort by first aggregate column (descending)
-    summary = summary.sort_values(summary.columns[0], ascending=False)
+    if backend == 'polars':
+        from .polars_backend import polars_summary_table
+        summary = polars_summary_table(df, group_by, aggregate_cols, agg_func)
+    elif backend == 'sqlite':
+        from .sqlite_store import sqlite_summary_table
+        summary = sqlite_summary_table(group_by, aggregate_cols, agg_func, source=df)
+    elif backend == 'pandas' and not isinstance(df, pd.DataFrame):
+        from .chunked import chunked_summary_table
+        summary = chunked_summary_table(df, group_by, aggregate_cols, agg_func, chunk_size)
+    elif backend == 'pandas':
+        summary = df.groupby(group_by)[aggregate_cols].agg(agg_func)
+        
+        # Sort by first aggregate column (descending)
+        summary = summary.sort_values(summary.columns[0], ascending=False)
+    else:
+        raise ValueError("backend must be 'pandas', 'polars' or 'sqlite'")
     
     print(f"📊 Summary: {agg_func.title()} of {', '.join(aggregate_cols)} by {group_by}")
     print("-" * 60)
@@ -239,34 +552,48 @@ def quick_summary_table(df: pd.DataFrame, group_by: str,
     return summary
 
 
-def compare_periods(df: pd.DataFrame, date_col: str, value_col: str,
-                   period1: str, period2: str) -> Dict[str, Any]:
+def compare_periods(df: Any, date_col: str, value_col: str,
+                   period1: str, period2: str,
+                   backend: str = 'pandas') -> Dict[str, Any]:
     """
     Compare data between two time periods (useful for before/after analysis).
     
+    For many windows or per-group breakdowns use
+    ``temporal_utils.compare_windows`` instead.
+    
     Args:
-        df: pandas DataFrame with date column
+        df: pandas DataFrame with date column, or with the sqlite backend
+            a SQLite store path or connection (None for ``SQLITE_PATH``)
         date_col: Name of date column
         value_col: Name of value column to compare
         period1: Start date (YYYY-MM-DD format)
         period2: End date (YYYY-MM-DD format)
+        backend: 'pandas' or 'sqlite' (totals computed in the database;
+            see ``sqlite_store.sqlite_period_totals``)
         
     Returns:
         Comparison statistics
     """
-    df[date_col] = pd.to_datetime(df[date_col])
-    
-    period1_data = df[df[date_col] < period2][value_col]
-    period2_data = df[df[date_col] >= period2][value_col]
-    
-    comparison = {
-        'period1_total': period1_data.sum(),
-        'period2_total': period2_data.sum(),
-        'period1_mean': period1_data.mean(),
-        'period2_mean': period2_data.mean(),
-        'period1_count': len(period1_data),
-        'period2_count': len(period2_data)
-    }
+    if backend == 'sqlite':
+        from .sqlite_store import sqlite_period_totals
+        comparison = sqlite_period_totals(date_col, value_col, period2, source=df)
+    elif backend == 'pandas':
+        # Parse locally so the caller's DataFrame is left untouched
+        dates = pd.to_datetime(df[date_col])
+        
+        period1_data = df.loc[(dates < period2).to_numpy(), value_col]
+        period2_data = df.loc[(dates >= period2).to_numpy(), value_col]
+        
+        comparison = {
+            'period1_total': period1_data.sum(),
+            'period2_total': period2_data.sum(),
+            'period1_mean': period1_data.mean(),
+            'period2_mean': period2_data.mean(),
+            'period1_count': len(period1_data),
+            'period2_count': len(period2_data)
+        }
+    else:
+        raise ValueError("backend must be 'pandas' or 'sqlite'")
     
     # Calculate changes
     comparison['total_change'] = comparison['period2_total'] - comparison['period1_total']
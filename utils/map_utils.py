@@ -0,0 +1,381 @@
+"""
+Map Utilities
+
+Compact folium maps of incident points.
+
+Each map layer is emitted as one block of point data instead of one
+``folium.CircleMarker`` per incident: a GeoJSON FeatureCollection styled
+and popped up client-side, a FastMarkerCluster, or a weighted heatmap of
+incidents binned to a grid. Coordinates are rounded, and in 'auto' mode
+the richest rendering that fits the per-map size budget is used, with the
+heatmap grid coarsened until it fits.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import folium
+from folium import plugins
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from pathlib import Path
+
+DEFAULT_TILES = 'CartoDB positron'
+DC_CENTER = (38.9072, -77.0369)
+# Five decimals is about 1 m; DC incidents are geocoded to block level
+DEFAULT_PRECISION = 5
+DEFAULT_SIZE_BUDGET_KB = 400
+# Leaflet/folium page boilerplate, excluding layer data
+MAP_OVERHEAD_BYTES = 15_000
+# Rows rendered to estimate a layer's size in 'auto' mode
+SIZE_SAMPLE_ROWS = 1000
+POPUP_FIELDS = ('OFFENSE', 'REPORT_DATE', 'WARD')
+# Coarsest heatmap grid 'auto' mode falls back to, in degrees (about 1 km)
+MAX_HEATMAP_CELL = 0.01
+MAP_MODES = ('auto', 'geojson', 'points', 'cluster', 'heatmap')
+
+Colors = Union[str, Dict[str, str]]
+
+
+def _popup_values(series: pd.Series) -> List:
+    """Format a column for popups: short dates, whole-number codes, None for missing."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        values = series.dt.strftime('%Y-%m-%d %H:%M')
+    elif isinstance(series.dtype, pd.CategoricalDtype):
+        values = series.astype(object)
+    elif pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        values = series.astype('Int64')
+    else:
+        values = series
+    return [None if pd.isna(v) else (int(v) if isinstance(v, (np.integer,)) else v)
+            for v in values.astype(object)]
+
+
+def _valid_points(df: pd.DataFrame, lat_col: str, lon_col: str) -> pd.DataFrame:
+    """Rows with both coordinates."""
+    return df[df[lat_col].notna() & df[lon_col].notna()]
+
+
+def points_to_geojson(df: pd.DataFrame, properties: Sequence[str] = (),
+                      lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                      precision: int = DEFAULT_PRECISION,
+                      extra: Optional[Dict[str, Sequence]] = None) -> Dict:
+    """
+    Convert incident points to a GeoJSON FeatureCollection.
+
+    Built column-wise from NumPy arrays rather than row by row.
+
+    Args:
+        df: DataFrame with coordinate columns
+        properties: Columns to copy into each feature's properties
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        precision: Decimal places kept in the coordinates
+        extra: Additional property name -> values aligned with ``df``
+
+    Returns:
+        GeoJSON FeatureCollection dictionary
+    """
+    lat = np.round(df[lat_col].to_numpy(dtype=np.float64), precision).tolist()
+    lon = np.round(df[lon_col].to_numpy(dtype=np.float64), precision).tolist()
+    columns = {col: _popup_values(df[col]) for col in properties}
+    columns.update({name: list(values) for name, values in (extra or {}).items()})
+    names = list(columns)
+    rows = zip(*columns.values()) if names else ((),) * len(lat)
+    features = [{'type': 'Feature',
+                 'geometry': {'type': 'Point', 'coordinates': [x, y]},
+                 'properties': dict(zip(names, values))}
+                for x, y, values in zip(lon, lat, rows)]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _color_lookup(df: pd.DataFrame, colors: Colors,
+                  color_by: Optional[str]) -> Tuple[Dict[str, str], Optional[np.ndarray]]:
+    """Map each row to an index into a small palette (None when single-colored)."""
+    if isinstance(colors, str) or color_by is None:
+        color = colors if isinstance(colors, str) else next(iter(colors.values()))
+        return {'0': color}, None
+    palette = list(colors.items())
+    codes = pd.Categorical(df[color_by].astype(object), categories=[k for k, _ in palette]).codes
+    return {str(i): color for i, (_, color) in enumerate(palette)}, codes
+
+
+def _geojson_layer(df: pd.DataFrame, name: str, colors: Colors, color_by: Optional[str],
+                   popup_fields: Sequence[str], lat_col: str, lon_col: str,
+                   precision: int, radius: float, fill_opacity: float) -> Tuple[folium.GeoJson, int]:
+    """One GeoJSON layer, colored client-side from a palette index property."""
+    palette, codes = _color_lookup(df, colors, color_by)
+    extra = {'_c': codes.tolist()} if codes is not None else None
+    data = points_to_geojson(df, popup_fields, lat_col, lon_col, precision, extra)
+    first = next(iter(palette.values()))
+    marker = folium.CircleMarker(radius=radius, weight=1, color=first, fill=True,
+                                 fill_color=first, fill_opacity=fill_opacity)
+    on_each_feature = None
+    if codes is not None:
+        on_each_feature = folium.JsCode(
+            "function (feature, layer) {"
+            f" var palette = {json.dumps(palette)};"
+            " var color = palette[feature.properties._c];"
+            " if (color) { layer.setStyle({color: color, fillColor: color}); }"
+            " }")
+    popup = folium.GeoJsonPopup(fields=list(popup_fields), labels=True) if popup_fields else None
+    layer = folium.GeoJson(data, name=name, marker=marker, popup=popup,
+                           on_each_feature=on_each_feature)
+    return layer, len(json.dumps(data))
+
+
+def _cluster_layer(df: pd.DataFrame, name: str, colors: Colors, color_by: Optional[str],
+                   lat_col: str, lon_col: str, precision: int, radius: float,
+                   fill_opacity: float) -> Tuple[plugins.FastMarkerCluster, int]:
+    """FastMarkerCluster of small circle markers, colored from a palette index per row."""
+    palette, codes = _color_lookup(df, colors, color_by)
+    coords = np.round(df[[lat_col, lon_col]].to_numpy(dtype=np.float64), precision)
+    data = coords.tolist() if codes is None else [
+        [lat, lon, int(code)] for (lat, lon), code in zip(coords.tolist(), codes)]
+    first = next(iter(palette.values()))
+    callback = ("function (row) {"
+                f" var palette = {json.dumps(palette)};"
+                f" var color = palette[row[2]] || '{first}';"
+                " return L.circleMarker(new L.LatLng(row[0], row[1]),"
+                f" {{radius: {radius}, weight: 1, color: color, fillColor: color,"
+                f" fillOpacity: {fill_opacity}}});"
+                " }")
+    return plugins.FastMarkerCluster(data, callback=callback, name=name), len(json.dumps(data))
+
+
+def _heatmap_layer(df: pd.DataFrame, name: str, lat_col: str, lon_col: str,
+                   precision: int, cell: Optional[float] = None) -> Tuple[plugins.HeatMap, int]:
+    """
+    Heatmap weighted by the number of incidents per grid cell of ``cell``
+    degrees (default: the rounding step of ``precision``).
+    """
+    cell = cell or 10.0 ** -precision
+    coords = pd.DataFrame({col: np.round(np.round(df[src].to_numpy(dtype=np.float64) / cell) * cell,
+                                         precision)
+                           for col, src in (('lat', lat_col), ('lon', lon_col))})
+    weights = coords.groupby(['lat', 'lon'], sort=False).size().reset_index(name='n')
+    data = weights[['lat', 'lon', 'n']].to_numpy().tolist()
+    return plugins.HeatMap(data, name=name, radius=12, blur=15, min_opacity=0.3), len(json.dumps(data))
+
+
+def _fitted_heatmap(df: pd.DataFrame, name: str, lat_col: str, lon_col: str,
+                    precision: int, budget: float) -> plugins.HeatMap:
+    """
+    Heatmap on the finest grid that fits ``budget`` bytes, doubling the
+    cell from the ``precision`` step up to ``MAX_HEATMAP_CELL``.
+
+    Raises:
+        ValueError: If even the coarsest grid is over the budget
+    """
+    cell = 10.0 ** -precision
+    while True:
+        layer, size = _heatmap_layer(df, name, lat_col, lon_col, precision, cell)
+        if size <= budget:
+            return layer
+        if cell >= MAX_HEATMAP_CELL:
+            raise ValueError(f"{len(df):,} incidents do not fit the map size budget even as a "
+                             f"{MAX_HEATMAP_CELL}-degree heatmap ({size / 1024:,.0f} KB of data); "
+                             "raise size_budget_kb or pass an explicit mode")
+        cell = min(cell * 2, MAX_HEATMAP_CELL)
+
+
+def add_incident_layer(m: folium.Map, df: pd.DataFrame, name: str,
+                       colors: Colors = '#820415', color_by: Optional[str] = None,
+                       mode: str = 'auto', popup_fields: Sequence[str] = POPUP_FIELDS,
+                       lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                       precision: int = DEFAULT_PRECISION,
+                       size_budget_kb: Optional[float] = DEFAULT_SIZE_BUDGET_KB,
+                       radius: float = 3, fill_opacity: float = 0.7) -> str:
+    """
+    Add incident points to a map as a single compact layer.
+
+    Modes:
+        'geojson': GeoJSON points with client-side color and popups
+        'points': GeoJSON points without popup properties
+        'cluster': FastMarkerCluster, colored like the points
+        'heatmap': Heatmap of incidents per rounded location
+        'auto': The first of the above whose data fits ``size_budget_kb``;
+            the heatmap fallback is binned to a coarser grid (up to
+            ``MAX_HEATMAP_CELL`` degrees) until it fits
+
+    Args:
+        m: folium Map
+        df: Incidents with coordinate columns
+        name: Layer name
+        colors: One color, or a mapping of ``color_by`` value -> color
+        color_by: Column whose values select the color (e.g. 'OFFENSE')
+        mode: Rendering mode (see above)
+        popup_fields: Columns shown in popups (geojson mode)
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        precision: Decimal places kept in the coordinates
+        size_budget_kb: Budget for this layer's data in 'auto' mode
+        radius: Point radius in pixels
+        fill_opacity: Point fill opacity
+
+    Returns:
+        The mode that was used
+
+    Raises:
+        ValueError: In 'auto' mode, if no rendering fits ``size_budget_kb``
+    """
+    if mode not in MAP_MODES:
+        raise ValueError(f"mode must be one of {', '.join(MAP_MODES)}")
+    df = _valid_points(df, lat_col, lon_col)
+    popup_fields = [col for col in popup_fields if col in df.columns]
+    budget = None if size_budget_kb is None else size_budget_kb * 1024 - MAP_OVERHEAD_BYTES
+
+    def build(candidate: str, points: pd.DataFrame) -> Tuple[folium.map.Layer, int]:
+        if candidate == 'geojson':
+            return _geojson_layer(points, name, colors, color_by, popup_fields,
+                                  lat_col, lon_col, precision, radius, fill_opacity)
+        if candidate == 'points':
+            return _geojson_layer(points, name, colors, color_by, [],
+                                  lat_col, lon_col, precision, radius, fill_opacity)
+        if candidate == 'cluster':
+            return _cluster_layer(points, name, colors, color_by, lat_col, lon_col,
+                                  precision, radius, fill_opacity)
+        return _heatmap_layer(points, name, lat_col, lon_col, precision)
+
+    layer = None
+    if mode == 'auto':
+        for candidate in ('geojson', 'points', 'cluster'):
+            # Per-point layers grow linearly, so a sample gives the size
+            sample = df.iloc[:SIZE_SAMPLE_ROWS]
+            estimate = build(candidate, sample)[1] * len(df) / max(len(sample), 1)
+            if budget is None or estimate <= budget:
+                mode = candidate
+                break
+        else:
+            mode = 'heatmap'
+            layer = _fitted_heatmap(df, name, lat_col, lon_col, precision, budget)
+    if layer is None:
+        layer, _ = build(mode, df)
+    layer.add_to(m)
+    return mode
+
+
+def create_incident_map(df: pd.DataFrame, name: str = 'Incidents',
+                        colors: Colors = '#820415', color_by: Optional[str] = None,
+                        mode: str = 'auto', title: Optional[str] = None,
+                        center: Optional[Tuple[float, float]] = None, zoom_start: int = 12,
+                        tiles: str = DEFAULT_TILES, **layer_kwargs) -> folium.Map:
+    """
+    Create a map of incidents rendered as one compact layer.
+
+    Args:
+        df: Incidents with LATITUDE/LONGITUDE columns
+        name: Layer name (used in popups and the layer control)
+        colors: One color, or a mapping of ``color_by`` value -> color
+        color_by: Column whose values select the color (e.g. 'OFFENSE')
+        mode: 'auto', 'geojson', 'points', 'cluster' or 'heatmap'
+        title: Optional title shown above the map
+        center: (lat, lon) map center; defaults to the mean incident location
+        zoom_start: Initial zoom level
+        tiles: Tile layer name
+        **layer_kwargs: Passed through to ``add_incident_layer``
+
+    Returns:
+        folium Map
+    """
+    lat_col = layer_kwargs.get('lat_col', 'LATITUDE')
+    lon_col = layer_kwargs.get('lon_col', 'LONGITUDE')
+    if center is None:
+        points = _valid_points(df, lat_col, lon_col)
+        center = ((points[lat_col].mean(), points[lon_col].mean()) if len(points) else DC_CENTER)
+    m = folium.Map(location=list(center), zoom_start=zoom_start, tiles=tiles)
+    if title:
+        m.get_root().html.add_child(folium.Element(
+            f'<h3 align="center" style="font-size:20px"><b>{title}</b></h3>'))
+    used = add_incident_layer(m, df, name, colors=colors, color_by=color_by, mode=mode, **layer_kwargs)
+    print(f"📍 {name}: {len(df):,} incidents rendered as {used}")
+    return m
+
+
+def add_boundary_layer(m: folium.Map, layer: str = 'WARD', resolution: str = 'medium',
+                       name: Optional[str] = None, color: str = '#444444', weight: float = 1.5,
+                       tooltip: bool = True, raw_dir: Optional[Union[str, Path]] = None) -> folium.Map:
+    """
+    Add ward / PSA / district outlines from the precompiled TopoJSON.
+
+    The layer is read from the boundary cache (see
+    ``geography.prepare_boundaries``) instead of parsing and embedding the
+    raw GeoJSON; 'medium' keeps about 10 m of detail at a few dozen KB.
+
+    Args:
+        m: folium Map
+        layer: 'WARD', 'PSA' or 'DISTRICT'
+        resolution: 'full', 'fine', 'medium' or 'coarse'
+        name: Layer name; defaults to e.g. 'Ward boundaries'
+        color: Outline color
+        weight: Outline width in pixels
+        tooltip: Show the polygon NAME on hover
+        raw_dir: Directory containing the raw GeoJSON files
+
+    Returns:
+        The same map
+    """
+    from .geography import RAW_DATA_DIR, boundary_topojson
+
+    path = boundary_topojson(layer, resolution, raw_dir or RAW_DATA_DIR)
+    with open(path) as handle:
+        topology = json.load(handle)
+    style = {'color': color, 'weight': weight, 'fill': False}
+    folium.TopoJson(topology, f'objects.{layer.lower()}',
+                    name=name or f'{layer.title()} boundaries',
+                    style_function=lambda feature: style,
+                    tooltip=folium.GeoJsonTooltip(fields=['NAME'], labels=False) if tooltip else None,
+                    ).add_to(m)
+    return m
+
+
+def add_reference_points(m: folium.Map, df: pd.DataFrame, popup_fields: Sequence[str],
+                         name: str = 'Locations', color: str = '#fd8724', radius: float = 10,
+                         lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE') -> folium.Map:
+    """
+    Add a small set of highlighted locations (e.g. federal deployments).
+
+    Args:
+        m: folium Map
+        df: Locations with coordinate columns
+        popup_fields: Columns shown in popups
+        name: Layer name
+        color: Marker color
+        radius: Marker radius in pixels
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+
+    Returns:
+        The same map
+    """
+    df = _valid_points(df, lat_col, lon_col)
+    popup_fields = [col for col in popup_fields if col in df.columns]
+    marker = folium.CircleMarker(radius=radius, weight=2, color=color, fill=True,
+                                 fill_color=color, fill_opacity=0.3, opacity=1)
+    popup = folium.GeoJsonPopup(fields=popup_fields) if popup_fields else None
+    folium.GeoJson(points_to_geojson(df, popup_fields, lat_col, lon_col),
+                   name=name, marker=marker, popup=popup).add_to(m)
+    return m
+
+
+def save_map(m: folium.Map, path: Union[str, Path],
+             size_budget_kb: Optional[float] = DEFAULT_SIZE_BUDGET_KB) -> str:
+    """
+    Save a map to HTML and check it against the size budget.
+
+    Args:
+        m: folium Map
+        path: Output HTML path
+        size_budget_kb: Warn when the file is larger than this (None to skip)
+
+    Returns:
+        Path to the saved file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    m.save(str(path))
+    size_kb = path.stat().st_size / 1024
+    if size_budget_kb is not None and size_kb > size_budget_kb:
+        print(f"⚠️  Map saved to: {path} ({size_kb:,.0f} KB, over the {size_budget_kb:,.0f} KB budget)")
+    else:
+        print(f"✅ Map saved to: {path} ({size_kb:,.0f} KB)")
+    return str(path)
@@ -0,0 +1,543 @@
+"""
+Pipeline
+
+Cached, dependency-aware runner for the analysis outputs.
+
+The ingest -> aggregate -> export -> map steps of the incident and grid
+notebooks are declared as stages with their input files, output files and
+upstream stages. A stage is re-run only when the content hash of its
+inputs (including upstream outputs) or of its code changed since its last
+successful run; stages whose dependencies are done run in parallel.
+
+Usage:
+    python -m utils.pipeline run            # everything that is stale
+    python -m utils.pipeline run maps       # one stage (and what it needs)
+    python -m utils.pipeline status
+"""
+
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import textwrap
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from ._config import CACHE_DIR, INCIDENT_STORE_DIR, PROCESSED_DATA_DIR, PROJECT_ROOT, RAW_DATA_DIR
+from .instrumentation import ENABLED as INSTRUMENTED, PROFILE_SLOWEST, keep_slowest_profile, load_trace, span
+
+STATE_FILE = 'pipeline_state.json'
+UTILS_DIR = Path(__file__).parent
+
+# Incident subsets exported as CSV: name -> (column, value)
+INCIDENT_EXPORTS = {
+    'all_homicides': ('OFFENSE', 'HOMICIDE'),
+    'all_assaults': ('OFFENSE', 'ASSAULT W/DANGEROUS WEAPON'),
+    'all_burglaries': ('OFFENSE', 'BURGLARY'),
+    'all_robberies': ('OFFENSE', 'ROBBERY'),
+    'all_car_thefts': ('OFFENSE', 'MOTOR VEHICLE THEFT'),
+    'all_gun_crimes': ('METHOD', 'GUN'),
+}
+# Latest-year subsets with coordinates: name -> (column, value, map title, color, map file)
+MAP_LAYERS = {
+    'homicide_data': ('OFFENSE', 'HOMICIDE', 'Homicides', '#820415', 'homicide_map.html'),
+    'assault_data': ('OFFENSE', 'ASSAULT W/DANGEROUS WEAPON', 'Assault with Dangerous Weapon',
+                     '#4a3717', 'assault_map.html'),
+    'robbery_data': ('OFFENSE', 'ROBBERY', 'Robberies', '#014c12', 'robbery_map.html'),
+    'burglary_data': ('OFFENSE', 'BURGLARY', 'Burglaries', '#1a3f42', 'burglary_map.html'),
+    'car_theft_data': ('OFFENSE', 'MOTOR VEHICLE THEFT', 'Motor Vehicle Theft', '#003270',
+                       'car_theft_map.html'),
+    'gun_crimes_data': ('METHOD', 'GUN', 'Gun Crimes', '#2d1b47', 'gun_crimes_map.html'),
+}
+OFFENSE_COLORS = {
+    'BURGLARY': '#1a3f42',
+    'MOTOR VEHICLE THEFT': '#003270',
+    'HOMICIDE': '#820415',
+    'ASSAULT W/DANGEROUS WEAPON': '#4a3717',
+    'ROBBERY': '#014c12',
+}
+FEDERAL_LOCATIONS_FILE = 'DC geolocations - FOR MAP.csv'
+# Start (month, day) of the federal deployment window table
+DEPLOYMENT_START = (8, 11)
+GRID_CELL_SIZE = 0.001  # degrees, ~0.07 mile
+GRID_RADIUS_MILES = 0.5
+
+
+def default_paths() -> Dict[str, Path]:
+    """Directories the stages read from and write to."""
+    return {
+        'raw': RAW_DATA_DIR,
+        'processed': PROCESSED_DATA_DIR,
+        'store': INCIDENT_STORE_DIR,
+        'docs': PROJECT_ROOT / 'docs',
+        'cache': CACHE_DIR,
+    }
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    Inputs and outputs are ``(root, glob)`` pairs, where ``root`` names a
+    directory in the paths mapping (``'raw'``, ``'processed'``, ``'store'``,
+    ``'docs'``, ``'cache'``). A stage implicitly depends on the outputs of its ``deps``.
+    """
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Path]], Any],
+                 inputs: Sequence[Tuple[str, str]] = (),
+                 outputs: Sequence[Tuple[str, str]] = (),
+                 deps: Sequence[str] = ()):
+        """
+        Args:
+            name: Stage name used on the command line
+            func: Module-level function taking the paths mapping
+            inputs: Input file patterns
+            outputs: Output file patterns
+            deps: Upstream stage names
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+
+    def code_modules(self) -> List[str]:
+        """
+        utils modules the stage depends on: the module defining ``func``
+        and every utils module imported by ``func``, the module-level
+        helpers it calls, or (transitively) by those modules.
+        """
+        own = Path(inspect.getsourcefile(self.func)).stem
+        sources = [inspect.getsource(func) for func in _helper_closure(self.func)]
+        pending = set().union(*(_utils_imports(source) for source in sources))
+        pending |= _utils_imports(inspect.getsource(inspect.getmodule(self.func)), top_level=True)
+        modules = {own}
+        while pending - modules:
+            module = (pending - modules).pop()
+            modules.add(module)
+            pending |= _utils_imports((UTILS_DIR / f'{module}.py').read_text())
+        return sorted(modules)
+
+    def code_hash(self) -> str:
+        """Hash of the source of every module in ``code_modules``."""
+        digest = hashlib.sha256()
+        for module in self.code_modules():
+            digest.update(f'{module}\n'.encode())
+            digest.update((UTILS_DIR / f'{module}.py').read_bytes())
+        return digest.hexdigest()
+
+
+def _helper_closure(func: Callable) -> List[Callable]:
+    """``func`` and the functions of its own module it calls, transitively."""
+    found = {func.__name__: func}
+    pending = [func]
+    while pending:
+        tree = ast.parse(textwrap.dedent(inspect.getsource(pending.pop())))
+        for node in ast.walk(tree):
+            helper = func.__globals__.get(node.id) if isinstance(node, ast.Name) else None
+            if (inspect.isfunction(helper) and helper.__module__ == func.__module__
+                    and helper.__name__ not in found):
+                found[helper.__name__] = helper
+                pending.append(helper)
+    return list(found.values())
+
+
+def _utils_imports(source: str, top_level: bool = False) -> set:
+    """Names of the utils modules imported relatively in ``source`` (anywhere, or only at module level)."""
+    tree = ast.parse(textwrap.dedent(source))
+    modules = set()
+    for node in (tree.body if top_level else ast.walk(tree)):
+        if isinstance(node, ast.ImportFrom) and node.level == 1:
+            if node.module:
+                modules.add(node.module.split('.')[0])
+            else:
+                modules.update(alias.name for alias in node.names)
+    return {module for module in modules if (UTILS_DIR / f'{module}.py').exists()}
+
+
+def _glob(paths: Dict[str, Path], patterns: Iterable[Tuple[str, str]]) -> List[Tuple[str, Path]]:
+    """Resolve ``(root, glob)`` patterns to sorted ``(label, path)`` pairs."""
+    files = []
+    for root, pattern in patterns:
+        base = Path(paths[root])
+        for path in sorted(base.glob(pattern)):
+            if path.is_file() and not path.name.startswith('.'):
+                files.append((f'{root}:{path.relative_to(base).as_posix()}', path))
+    return files
+
+
+def _file_hash(path: Path, fingerprints: Dict[str, Any]) -> str:
+    """Content hash of a file, reusing the stored hash while size and mtime match."""
+    stat = path.stat()
+    key = str(path.resolve())
+    cached = fingerprints.get(key)
+    if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    fingerprints[key] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def _outputs_exist(stage: Stage, paths: Dict[str, Path]) -> bool:
+    """Whether every output pattern of a stage matches at least one file."""
+    return all(_glob(paths, [pattern]) for pattern in stage.outputs)
+
+
+def _load_state(paths: Dict[str, Path]) -> Dict[str, Any]:
+    state_path = Path(paths['cache']) / STATE_FILE
+    if state_path.exists():
+        return json.loads(state_path.read_text())
+    return {'stages': {}, 'files': {}}
+
+
+def _save_state(paths: Dict[str, Path], state: Dict[str, Any]) -> None:
+    state_path = Path(paths['cache']) / STATE_FILE
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=state_path.parent, prefix=f'.{STATE_FILE}.', suffix='.tmp')
+    with os.fdopen(fd, 'w') as handle:
+        json.dump(state, handle, indent=1, sort_keys=True)
+    os.replace(tmp, state_path)
+
+
+# --------------------------------------------------------------------------
+# Stage functions
+# --------------------------------------------------------------------------
+
+def _latest_year(incidents: pd.DataFrame) -> str:
+    return str(incidents['YEAR'].dropna().astype(str).max())
+
+
+def _load_federal_locations(raw_dir: Path) -> pd.DataFrame:
+    """Federal deployment locations, cleaned as in the notebooks."""
+    feds = pd.read_csv(raw_dir / FEDERAL_LOCATIONS_FILE)
+    feds.columns = feds.columns.str.upper().str.replace(' ', '_')
+    feds = feds.dropna(axis=1, how='all').drop(columns=['NAME_LABELS_'])
+    feds = feds.rename(columns={feds.columns[-1]: 'LOCATION_NAME'})
+    feds['LATITUDE'] = pd.to_numeric(feds['LAT'], errors='coerce')
+    feds['LONGITUDE'] = pd.to_numeric(feds['LONG'], errors='coerce')
+    return feds
+
+
+def _map_subsets(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
+    """Latest-year incidents with coordinates, split as in ``MAP_LAYERS``."""
+    from .incident_store import load_incidents
+
+    incidents = load_incidents(refresh=False, store_dir=paths['store'], require_coordinates=True)
+    latest = incidents[incidents['YEAR'] == _latest_year(incidents)]
+    return {name: latest[latest[col] == value]
+            for name, (col, value, *_) in MAP_LAYERS.items()}
+
+
+def run_store(paths: Dict[str, Path]) -> None:
+    """Ingest: refresh the Parquet store from the yearly CSVs and the 30-day feed."""
+    from .incident_store import RECENT_FEED_FILE, build_incident_store, upsert_incidents
+
+    build_incident_store(paths['raw'], paths['store'])
+    feed = Path(paths['raw']) / RECENT_FEED_FILE
+    if feed.exists():
+        upsert_incidents(feed, store_dir=paths['store'])
+
+
+def run_cube(paths: Dict[str, Path]) -> None:
+    """Aggregate: materialize the crime count cube."""
+    from .crime_cube import build_crime_cube
+
+    build_crime_cube(path=Path(paths['processed']) / 'crime_cube.parquet', refresh=False,
+                     store_dir=paths['store'])
+
+
+def run_tables(paths: Dict[str, Path]) -> None:
+    """Aggregate: offense and ward summary tables."""
+    from .crime_cube import CrimeCube
+    from .incident_store import load_incidents
+    from .journalism_utils import batch_export_for_web
+    from .temporal_utils import same_window_mask
+
+    cube = CrimeCube.load(Path(paths['processed']) / 'crime_cube.parquet')
+    incidents = load_incidents(columns=['OFFENSE', 'YEAR', 'REPORT_DATE'], refresh=False,
+                               store_dir=paths['store'])
+    latest = _latest_year(incidents)
+    dates = incidents.loc[incidents['YEAR'] == latest, 'REPORT_DATE']
+
+    def window_table(start, first_year):
+        in_window = same_window_mask(incidents['REPORT_DATE'], start, (dates.max().month, dates.max().day))
+        years = [str(year) for year in range(first_year, int(latest) + 1)]
+        rows = incidents[in_window & incidents['YEAR'].isin(years)]
+        return rows.groupby(['OFFENSE', 'YEAR'], observed=True).size().unstack(fill_value=0)
+
+    tables = {
+        'crime_offense_yearly': cube.rollup(['OFFENSE', 'YEAR'], unstack='YEAR'),
+        'crime_offense_ytd': window_table((dates.min().month, dates.min().day), int(latest) - 6),
+        'crime_offense_since_aug11': window_table(DEPLOYMENT_START, int(latest) - 2),
+        'crime_by_ward_year_offense_comprehensive': cube.rollup(['WARD', 'YEAR', 'OFFENSE']).to_frame('COUNT'),
+        'homicides_by_ward_year_with_totals': cube.where(OFFENSE='HOMICIDE').rollup(
+            ['WARD', 'YEAR'], unstack='YEAR',
+            column_total='TOTAL_ALL_YEARS', row_total='TOTAL_ALL_WARDS'),
+    }
+    batch_export_for_web(tables, output_dir=paths['processed'], index=True)
+
+
+def run_exports(paths: Dict[str, Path]) -> None:
+    """Export: per-offense incident CSVs, plus JSON shards of the full tables."""
+    from .incident_store import load_incidents
+    from .journalism_utils import batch_export_for_web
+
+    incidents = load_incidents(refresh=False, store_dir=paths['store'])
+    frames = {name: incidents[incidents[col] == value]
+              for name, (col, value) in INCIDENT_EXPORTS.items()}
+    batch_export_for_web(frames, formats=['csv', 'shards'], output_dir=paths['processed'])
+    batch_export_for_web(_map_subsets(paths), output_dir=paths['processed'])
+
+
+def run_maps(paths: Dict[str, Path]) -> None:
+    """Map: per-offense maps and the combined maps."""
+    from .map_utils import add_reference_points, create_incident_map, save_map
+
+    docs = Path(paths['docs'])
+    subsets = _map_subsets(paths)
+    for name, (_, _, title, color, filename) in MAP_LAYERS.items():
+        if len(subsets[name]):
+            save_map(create_incident_map(subsets[name], title, colors=color), docs / filename)
+
+    combined = pd.concat([subsets[name] for name in
+                          ('burglary_data', 'car_theft_data', 'homicide_data', 'assault_data', 'robbery_data')])
+    m = create_incident_map(combined, 'All crimes', colors=OFFENSE_COLORS, color_by='OFFENSE',
+                            fill_opacity=0.5)
+    save_map(m, docs / 'combined_crime_map.html')
+
+    feds = _load_federal_locations(Path(paths['raw'])).dropna(subset=['LATITUDE', 'LONGITUDE'])
+    m = create_incident_map(combined, 'All crimes', colors=OFFENSE_COLORS, color_by='OFFENSE',
+                            fill_opacity=0.4)
+    add_reference_points(m, feds, ['LOCATION_NAME', 'AGENCY_'], name='Federal locations')
+    save_map(m, docs / 'combined_crime_map_with_federal_locations.html')
+
+
+def run_boundaries(paths: Dict[str, Path]) -> None:
+    """Prepare: simplified boundary layers, web TopoJSON and the city outline."""
+    from .geography import prepare_boundaries
+
+    prepare_boundaries(raw_dir=paths['raw'], cache_dir=Path(paths['cache']) / 'boundaries')
+
+
+def run_grid(paths: Dict[str, Path]) -> None:
+    """Aggregate + map: half-mile crime density surface and federal site percentiles."""
+    from .incident_store import load_incidents
+    from .journalism_utils import batch_export_for_web
+    from .map_utils import create_incident_map, save_map
+    from .spatial_utils import count_within_radius, density_surface
+
+    incidents = load_incidents(columns=['YEAR', 'LATITUDE', 'LONGITUDE'], refresh=False,
+                               store_dir=paths['store'], require_coordinates=True)
+    latest = incidents[incidents['YEAR'] == _latest_year(incidents)]
+    surface = density_surface(latest, GRID_RADIUS_MILES, cell_size=GRID_CELL_SIZE,
+                              raw_dir=paths['raw'], cache_dir=Path(paths['cache']) / 'boundaries')
+    column = surface.columns[0]
+    cells = surface.to_frame()
+    grid_df = pd.DataFrame({
+        'Latitude': cells['LATITUDE'].round(6),
+        'Longitude': cells['LONGITUDE'].round(6),
+        'Crime_Count_0.5Mile': cells[column],
+        'Percentile_Rank': surface.percentile(cells[column], column),
+    })
+
+    # Federal sites are ranked with exact counts against the in-city cells
+    feds = _load_federal_locations(Path(paths['raw'])).dropna(subset=['LATITUDE', 'LONGITUDE'])
+    ranks = surface.rank_sites(feds, counts=count_within_radius(latest, feds, GRID_RADIUS_MILES))
+    fed_df = feds[['LOCATION_NAME', 'AGENCIES', 'LATITUDE', 'LONGITUDE']].join(ranks)
+    batch_export_for_web({'dc_grid_crime_counts': grid_df, 'federal_location_crime_ranks': fed_df},
+                         output_dir=paths['processed'])
+
+    low_crime_points = grid_df[grid_df['Crime_Count_0.5Mile'] < 1]
+    m = create_incident_map(low_crime_points, 'Low-crime grid points', colors='blue',
+                            lat_col='Latitude', lon_col='Longitude',
+                            popup_fields=['Crime_Count_0.5Mile'], radius=4)
+    save_map(m, Path(paths['docs']) / 'dc_grid_cells_low_crime_map.html')
+
+
+STAGES = [
+    Stage('store', run_store,
+          inputs=[('raw', 'Crime_Incidents_in_*.csv')],
+          outputs=[('store', '_manifest.json'), ('store', '**/*.parquet')]),
+    Stage('cube', run_cube,
+          outputs=[('processed', 'crime_cube.parquet')],
+          deps=['store']),
+    Stage('tables', run_tables,
+          outputs=[('processed', f'{name}.csv') for name in
+                   ('crime_offense_yearly', 'crime_offense_ytd', 'crime_offense_since_aug11',
+                    'crime_by_ward_year_offense_comprehensive', 'homicides_by_ward_year_with_totals')],
+          deps=['store', 'cube']),
+    Stage('exports', run_exports,
+          outputs=[('processed', f'{name}.csv') for name in [*INCIDENT_EXPORTS, *MAP_LAYERS]]
+          + [('processed', f'{name}_shards/*.json') for name in INCIDENT_EXPORTS],
+          deps=['store']),
+    Stage('maps', run_maps,
+          inputs=[('raw', FEDERAL_LOCATIONS_FILE)],
+          outputs=[('docs', filename) for *_, filename in MAP_LAYERS.values()]
+          + [('docs', 'combined_crime_map.html'),
+             ('docs', 'combined_crime_map_with_federal_locations.html')],
+          deps=['store']),
+    Stage('boundaries', run_boundaries,
+          inputs=[('raw', filename) for filename in
+                  ('Wards.geojson', 'Police_Service_Areas.geojson', 'Police_Districts.geojson')],
+          outputs=[('cache', 'boundaries/*.topojson'), ('cache', 'boundaries/city_outline.wkb')]),
+    Stage('grid', run_grid,
+          inputs=[('raw', FEDERAL_LOCATIONS_FILE)],
+          outputs=[('processed', 'dc_grid_crime_counts.csv'),
+                   ('processed', 'federal_location_crime_ranks.csv'),
+                   ('docs', 'dc_grid_cells_low_crime_map.html')],
+          deps=['store', 'boundaries']),
+]
+
+
+# --------------------------------------------------------------------------
+# Runner
+# --------------------------------------------------------------------------
+
+def _select(names: Optional[Sequence[str]]) -> List[Stage]:
+    """Requested stages plus everything they depend on, in declaration order."""
+    by_name = {stage.name: stage for stage in STAGES}
+    if not names:
+        return list(STAGES)
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {', '.join(unknown)}; choose from {', '.join(by_name)}")
+    wanted = set()
+    todo = list(names)
+    while todo:
+        name = todo.pop()
+        if name not in wanted:
+            wanted.add(name)
+            todo.extend(by_name[name].deps)
+    return [stage for stage in STAGES if stage.name in wanted]
+
+
+def _run_stage(stage: Stage, paths: Dict[str, Path]) -> None:
+    """Run one stage, traced (and profiled) when instrumentation is on."""
+    if not (INSTRUMENTED or PROFILE_SLOWEST):
+        stage.func(paths)
+        return
+    with span(stage.name, kind='stage', profile=PROFILE_SLOWEST):
+        stage.func(paths)
+
+
+def _stage_key(stage: Stage, paths: Dict[str, Path], state: Dict[str, Any]) -> str:
+    """Hash of the stage code, its inputs and its upstream outputs."""
+    by_name = {s.name: s for s in STAGES}
+    patterns = stage.inputs + [pattern for dep in stage.deps for pattern in by_name[dep].outputs]
+    digest = hashlib.sha256(stage.code_hash().encode())
+    for label, path in _glob(paths, patterns):
+        digest.update(f'{label}={_file_hash(path, state["files"])}\n'.encode())
+    return digest.hexdigest()
+
+
+def run_pipeline(stages: Optional[Sequence[str]] = None, force: bool = False,
+                 jobs: Optional[int] = None, dry_run: bool = False,
+                 paths: Optional[Dict[str, Path]] = None) -> Dict[str, str]:
+    """
+    Run the stale stages of the pipeline.
+
+    A stage is skipped when its key (code + input hashes) matches the last
+    successful run and its outputs exist. Stages whose dependencies are
+    finished run in parallel worker processes.
+
+    Args:
+        stages: Stage names to run (with their dependencies); None runs all
+        force: Re-run the selected stages even when cached
+        jobs: Worker processes (1 runs stages in this process)
+        dry_run: Only report which stages are stale
+        paths: Overrides for the directories in ``default_paths()``
+
+    Returns:
+        Dictionary of stage name -> 'ran', 'cached' or 'stale' (dry run)
+    """
+    paths = {**default_paths(), **(paths or {})}
+    selected = _select(stages)
+    state = _load_state(paths)
+    status: Dict[str, str] = {}
+    waiting = {stage.name: stage for stage in selected}
+    selected_names = set(waiting)
+    pool = None if dry_run or jobs == 1 else ProcessPoolExecutor(max_workers=jobs)
+    running = {}
+
+    try:
+        while waiting or running:
+            ready = [stage for stage in waiting.values()
+                     if all(dep in status or dep not in selected_names for dep in stage.deps)]
+            for stage in ready:
+                del waiting[stage.name]
+                if dry_run and any(status.get(dep) == 'stale' for dep in stage.deps):
+                    status[stage.name] = 'stale'
+                    continue
+                key = _stage_key(stage, paths, state)
+                cached = state['stages'].get(stage.name, {}).get('key') == key
+                if cached and not force and _outputs_exist(stage, paths):
+                    status[stage.name] = 'cached'
+                    print(f"✅ {stage.name}: up to date")
+                elif dry_run:
+                    status[stage.name] = 'stale'
+                    print(f"⚠️  {stage.name}: stale")
+                elif pool is None:
+                    print(f"📊 {stage.name}: running")
+                    _run_stage(stage, paths)
+                    state['stages'][stage.name] = {'key': key}
+                    _save_state(paths, state)
+                    status[stage.name] = 'ran'
+                else:
+                    print(f"📊 {stage.name}: running")
+                    running[pool.submit(_run_stage, stage, paths)] = (stage, key)
+            if not running:
+                if waiting and not ready:
+                    raise RuntimeError(f"Unresolvable stage dependencies: {', '.join(waiting)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key = running.pop(future)
+                future.result()
+                state['stages'][stage.name] = {'key': key}
+                _save_state(paths, state)
+                status[stage.name] = 'ran'
+                print(f"✅ {stage.name}: done")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        _save_state(paths, state)
+    if PROFILE_SLOWEST:
+        keep_slowest_profile([r for r in load_trace() if r['kind'] == 'stage'])
+    return status
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m utils.pipeline',
+                                     description='Run the DC crime analysis pipeline.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='run stale stages')
+    run.add_argument('stages', nargs='*', help=f"stages to run ({', '.join(s.name for s in STAGES)})")
+    run.add_argument('--force', action='store_true', help='re-run even when cached')
+    run.add_argument('--jobs', type=int, default=None, help='worker processes (1 = no parallelism)')
+    status = commands.add_parser('status', help='list stale stages without running them')
+    status.add_argument('stages', nargs='*')
+    for command in (run, status):
+        for root in ('raw', 'processed', 'store', 'docs', 'cache'):
+            command.add_argument(f'--{root}-dir', type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    paths = {root: getattr(args, f'{root}_dir') for root in ('raw', 'processed', 'store', 'docs', 'cache')}
+    paths = {root: path for root, path in paths.items() if path is not None}
+    if args.command == 'run':
+        run_pipeline(args.stages, force=args.force, jobs=args.jobs, paths=paths)
+    else:
+        run_pipeline(args.stages, dry_run=True, paths=paths)
+
+
+if __name__ == '__main__':
+    main()
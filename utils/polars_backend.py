@@ -0,0 +1,196 @@
+"""
+Polars Backend
+
+Opt-in lazy execution for the aggregation layer.
+
+Aggregations are built as a Polars ``LazyFrame`` plan over the Parquet
+incident store, an incident CSV or an in-memory frame, so filters and
+column projections are pushed down to the scan and the group-by runs
+multi-threaded. Results come back as pandas for the existing charts.
+"""
+
+import pandas as pd
+import polars as pl
+import pyarrow.dataset as ds
+from typing import Any, Dict, List, Optional, Sequence, Union
+from pathlib import Path
+
+from ._config import INCIDENT_STORE_DIR
+from .incident_store import (MANIFEST_NAME, KEY_COLUMN, _read_manifest,
+                             build_incident_store)
+from .schema import standard_column_name
+
+Source = Union[pd.DataFrame, pl.DataFrame, pl.LazyFrame, ds.Dataset, str, Path, None]
+
+AGG_EXPRESSIONS = {
+    'sum': lambda col: pl.col(col).sum(),
+    'mean': lambda col: pl.col(col).mean(),
+    'count': lambda col: pl.col(col).count(),
+    'max': lambda col: pl.col(col).max(),
+    'min': lambda col: pl.col(col).min(),
+}
+
+
+def _key_expr() -> pl.Expr:
+    """Polars version of ``incident_store.incident_keys``."""
+    return pl.coalesce(pl.col(KEY_COLUMN).cast(pl.String),
+                       pl.lit('OBJECTID:') + pl.col('OBJECTID').cast(pl.Int64).cast(pl.String))
+
+
+def _scan_store(store_dir: Path) -> pl.LazyFrame:
+    """Scan the incident store, letting feed rows replace yearly rows."""
+    manifest = _read_manifest(store_dir)
+    hive_schema = {col: pl.String for col in manifest.get('partition_by', ['YEAR'])}
+    source_files = [str(store_dir / rel_path)
+                    for entry in manifest.get('sources', {}).values()
+                    for rel_path in entry['files']]
+    feed_files = [str(store_dir / rel_path)
+                  for rel_path in manifest.get('feed', {}).get('files', [])]
+    if not source_files:
+        raise FileNotFoundError(f"No incident store at {store_dir}; run build_incident_store() first")
+
+    scan = pl.scan_parquet(source_files, hive_partitioning=True, hive_schema=hive_schema)
+    if not feed_files:
+        return scan
+    feed = pl.scan_parquet(feed_files, hive_partitioning=True, hive_schema=hive_schema)
+    feed_keys = feed.select(_key_expr().alias('_KEY'))
+    current = (scan.with_columns(_key_expr().alias('_KEY'))
+               .join(feed_keys, on='_KEY', how='anti')
+               .drop('_KEY'))
+    return pl.concat([current, feed], how='diagonal_relaxed')
+
+
+def _standardize_names(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Apply the incident column standardization lazily."""
+    return lf.rename({name: standard_column_name(name) for name in lf.collect_schema().names()})
+
+
+def scan_incidents(source: Source = None, refresh: bool = True) -> pl.LazyFrame:
+    """
+    Build a lazy scan over incident data.
+
+    Args:
+        source: None or a Parquet store directory (the incident store),
+            a CSV or Parquet file path, a pyarrow Dataset, or a
+            pandas/Polars frame
+        refresh: Rebuild stale store partitions before scanning the default store
+
+    Returns:
+        Polars LazyFrame
+    """
+    if isinstance(source, pl.LazyFrame):
+        return source
+    if isinstance(source, pl.DataFrame):
+        return source.lazy()
+    if isinstance(source, pd.DataFrame):
+        return pl.from_pandas(source).lazy()
+    if isinstance(source, ds.Dataset):
+        return pl.scan_pyarrow_dataset(source)
+
+    path = Path(INCIDENT_STORE_DIR if source is None else source)
+    if source is None and refresh:
+        build_incident_store(store_dir=path,
+                             partition_by=_read_manifest(path).get('partition_by', ['YEAR']))
+    if path.is_dir() and (path / MANIFEST_NAME).exists():
+        return _scan_store(path)
+    if path.is_dir() or path.suffix == '.parquet':
+        pattern = str(path / '**' / '*.parquet') if path.is_dir() else str(path)
+        return pl.scan_parquet(pattern, hive_partitioning=path.is_dir())
+
+    lf = _standardize_names(pl.scan_csv(path, infer_schema_length=10000,
+                                        schema_overrides={'CCN': pl.String}))
+    names = lf.collect_schema().names()
+    if 'REPORT_DATE' in names and 'YEAR' not in names:
+        lf = lf.with_columns(
+            pl.col('REPORT_DATE').str.to_datetime('%Y/%m/%d %H:%M:%S%#z', strict=False))
+        lf = lf.with_columns(pl.col('REPORT_DATE').dt.year().cast(pl.String).alias('YEAR'))
+    return lf
+
+
+def _filter_expr(where: Optional[Dict[str, Any]]) -> Optional[pl.Expr]:
+    """Turn {'OFFENSE': 'HOMICIDE', 'YEAR': ['2024', '2025']} into a predicate."""
+    if not where:
+        return None
+    predicate = None
+    for col, value in where.items():
+        if isinstance(value, (list, tuple, set)):
+            condition = pl.col(col).is_in(list(value))
+        else:
+            condition = pl.col(col) == value
+        predicate = condition if predicate is None else predicate & condition
+    return predicate
+
+
+def polars_summary_table(source: Source, group_by: Union[str, List[str]],
+                         aggregate_cols: List[str], agg_func: str = 'sum',
+                         where: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+    """
+    Lazy Polars equivalent of ``quick_summary_table``'s aggregation.
+
+    Args:
+        source: Data source accepted by ``scan_incidents``
+        group_by: Column(s) to group by
+        aggregate_cols: Columns to aggregate
+        agg_func: 'sum', 'mean', 'count', 'max', 'min'
+        where: Optional equality / membership filters pushed to the scan
+
+    Returns:
+        pandas DataFrame indexed by ``group_by``, sorted by the first
+        aggregate column (descending). Index labels keep their stored
+        type (e.g. int8 WARD, str OFFENSE) rather than the categorical
+        index of the pandas groupby.
+    """
+    if agg_func not in AGG_EXPRESSIONS:
+        raise ValueError(f"agg_func must be one of {', '.join(AGG_EXPRESSIONS)}")
+    keys = [group_by] if isinstance(group_by, str) else list(group_by)
+    lf = scan_incidents(source)
+    predicate = _filter_expr(where)
+    if predicate is not None:
+        lf = lf.filter(predicate)
+    # pandas groupby drops missing keys
+    lf = lf.drop_nulls(keys)
+    result = (lf.select(keys + list(aggregate_cols))
+              .group_by(keys)
+              .agg([AGG_EXPRESSIONS[agg_func](col) for col in aggregate_cols])
+              .sort(aggregate_cols[0], descending=True, nulls_last=True)
+              .collect())
+    summary = result.to_pandas().set_index(keys if len(keys) > 1 else keys[0])
+    if agg_func == 'count':
+        summary = summary.astype('int64')
+    return summary
+
+
+def incident_counts(source: Source = None, by: Sequence[str] = ('OFFENSE', 'YEAR'),
+                    where: Optional[Dict[str, Any]] = None,
+                    unstack: Optional[str] = None) -> pd.DataFrame:
+    """
+    Count incidents by one or more columns with a lazy Polars plan.
+
+    Replaces the notebook's ``groupby([...]).size()`` aggregations; only
+    the ``by`` and filter columns are read from disk.
+
+    Args:
+        source: Data source accepted by ``scan_incidents``
+        by: Columns to group by
+        where: Optional equality / membership filters pushed to the scan
+        unstack: Optional column in ``by`` to pivot into columns
+            (like ``.unstack(fill_value=0)``)
+
+    Returns:
+        pandas DataFrame with a COUNT column, or a pivoted count table
+    """
+    by = list(by)
+    lf = scan_incidents(source)
+    predicate = _filter_expr(where)
+    if predicate is not None:
+        lf = lf.filter(predicate)
+    counts = (lf.drop_nulls(by).group_by(by).agg(pl.len().alias('COUNT'))
+              .sort(by, nulls_last=True)
+              .collect()
+              .to_pandas())
+    counts['COUNT'] = counts['COUNT'].astype('int64')
+    if unstack is None:
+        return counts
+    index = [col for col in by if col != unstack]
+    return counts.pivot_table(index=index, columns=unstack, values='COUNT',
+                              fill_value=0, aggfunc='sum')
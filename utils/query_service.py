@@ -0,0 +1,493 @@
+"""
+Query Service
+
+Local read-only JSON API over the processed aggregate tables.
+
+The summary CSVs that the pipeline writes to ``data/processed/`` (ward x
+year x offense counts, offense-by-year tables, homicides by ward) are
+loaded into long (dimension..., COUNT) tables with a row index per
+dimension value, so embeds can ask for just the slice they show instead
+of downloading whole files:
+
+    GET /tables                                       table list and dimension values
+    GET /tables/crime_by_ward_year_offense_comprehensive?ward=1,2&offense=HOMICIDE
+    GET /tables/crime_offense_yearly?since=2021&group_by=year
+
+Responses are compact JSON, kept in an LRU cache of encoded bodies with
+a weak ETag (``If-None-Match`` gives ``304``) and gzipped when the client
+accepts it. The source files are polled and reloaded when they change;
+the exports are written by atomic rename, so a reload never sees a
+partial file. The server is stdlib asyncio and does not import pandas.
+
+Usage:
+    python -m utils.query_service --port 8765
+"""
+
+import argparse
+import asyncio
+import csv
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from ._config import PROCESSED_DATA_DIR
+
+# Table name (file stem in data/processed) -> row dimension of the wide
+# year-column layout, or None for long tables with a COUNT column
+AGGREGATE_TABLES = {
+    'crime_by_ward_year_offense_comprehensive': None,
+    'crime_offense_yearly': 'OFFENSE',
+    'crime_offense_ytd': 'OFFENSE',
+    'crime_offense_since_aug11': 'OFFENSE',
+    'homicides_by_ward_year_with_totals': 'WARD',
+}
+VALUE_COLUMN = 'COUNT'
+# Dimensions with integer values; everything else is matched as text
+INTEGER_DIMENSIONS = ('WARD', 'YEAR', 'PSA', 'DISTRICT')
+# Totals rows/columns are dropped; clients get them with group_by
+TOTAL_PREFIX = 'TOTAL'
+# Bodies smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 512
+
+_JSON_SEPARATORS = (',', ':')
+_STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+                405: 'Method Not Allowed'}
+
+
+def _parse_value(dimension: str, text: str) -> Union[int, str]:
+    """Parse a CSV cell or query value of ``dimension`` (WARD '1.0' -> 1)."""
+    text = text.strip()
+    if dimension in INTEGER_DIMENSIONS:
+        number = float(text)
+        if not number.is_integer():
+            raise ValueError(f"{dimension} must be a whole number, got {text!r}")
+        return int(number)
+    return text.upper()
+
+
+def _parse_count(text: str) -> Union[int, float]:
+    number = float(text) if text.strip() else 0.0
+    return int(number) if number.is_integer() else number
+
+
+def _window_year(text: str) -> int:
+    """Year of a ``since``/``until`` bound given as YYYY or an ISO date."""
+    text = text.strip()
+    if len(text) < 4 or not text[:4].isdigit() or (len(text) > 4 and text[4] != '-'):
+        raise ValueError(f"date bounds must be YYYY or YYYY-MM-DD, got {text!r}")
+    return int(text[:4])
+
+
+class AggregateTable:
+    """
+    One processed aggregate as a long table with per-dimension row indexes.
+
+    Rows are stored column-wise; ``index[dimension][value]`` holds the row
+    numbers with that value, so a filter is a union per dimension and an
+    intersection across dimensions, smallest first.
+    """
+
+    def __init__(self, name: str, dimensions: List[str], columns: Dict[str, list],
+                 counts: list, signature: Tuple[int, int]):
+        """
+        Args:
+            name: Table name (file stem)
+            dimensions: Dimension column names, e.g. ['WARD', 'YEAR', 'OFFENSE']
+            columns: Dimension name -> values per row
+            counts: COUNT per row
+            signature: (size, mtime_ns) of the source file
+        """
+        self.name = name
+        self.dimensions = dimensions
+        self.columns = columns
+        self.counts = counts
+        self.signature = signature
+        self.index: Dict[str, Dict[Any, frozenset]] = {}
+        for dimension in dimensions:
+            rows: Dict[Any, List[int]] = {}
+            for row, value in enumerate(columns[dimension]):
+                rows.setdefault(value, []).append(row)
+            self.index[dimension] = {value: frozenset(ids) for value, ids in rows.items()}
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path], row_dimension: Optional[str] = None) -> 'AggregateTable':
+        """
+        Load an exported aggregate CSV.
+
+        Args:
+            path: CSV written by ``batch_export_for_web``
+            row_dimension: For wide tables (one column per year), the name
+                of the row dimension; None for long tables with COUNT
+
+        Returns:
+            AggregateTable
+        """
+        path = Path(path)
+        stat = path.stat()
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            header, *records = list(csv.reader(handle))
+        header = [col.strip().upper() for col in header]
+
+        if row_dimension is None:
+            if VALUE_COLUMN not in header:
+                raise ValueError(f"{path.name} has no {VALUE_COLUMN} column")
+            dimensions = [col for col in header if col != VALUE_COLUMN]
+            positions = [header.index(col) for col in dimensions]
+            value_position = header.index(VALUE_COLUMN)
+            columns = {dimension: [] for dimension in dimensions}
+            counts = []
+            for record in records:
+                if any(record[i].strip().upper().startswith(TOTAL_PREFIX) for i in positions):
+                    continue
+                for dimension, i in zip(dimensions, positions):
+                    columns[dimension].append(_parse_value(dimension, record[i]))
+                counts.append(_parse_count(record[value_position]))
+        else:
+            dimensions = [row_dimension, 'YEAR']
+            years = [(i, int(col)) for i, col in enumerate(header) if col.isdigit()]
+            columns = {row_dimension: [], 'YEAR': []}
+            counts = []
+            for record in records:
+                label = record[0].strip()
+                if not label or label.upper().startswith(TOTAL_PREFIX):
+                    continue
+                value = _parse_value(row_dimension, label)
+                for i, year in years:
+                    columns[row_dimension].append(value)
+                    columns['YEAR'].append(year)
+                    counts.append(_parse_count(record[i]))
+        return cls(path.stem, dimensions, columns, counts, (stat.st_size, stat.st_mtime_ns))
+
+    def describe(self) -> Dict[str, Any]:
+        """Dimensions and their values, for building embed controls."""
+        return {'rows': len(self.counts),
+                'dimensions': {dimension: sorted(self.index[dimension])
+                               for dimension in self.dimensions}}
+
+    def query(self, filters: Dict[str, Sequence[Any]],
+              years: Tuple[Optional[int], Optional[int]] = (None, None),
+              group_by: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """
+        Filter and optionally roll up the table.
+
+        Args:
+            filters: Dimension -> accepted values
+            years: Inclusive (first, last) YEAR window; None for open ends
+            group_by: Dimensions to keep, summing COUNT over the others;
+                None returns the matching rows as stored
+
+        Returns:
+            Dictionary with 'columns' and 'rows' (lists of values)
+        """
+        selections = []
+        for dimension, values in filters.items():
+            index = self.index[dimension]
+            selections.append(frozenset().union(*(index.get(value, frozenset()) for value in values)))
+        first, last = years
+        if (first is not None or last is not None) and 'YEAR' in self.index:
+            selections.append(frozenset().union(*(
+                ids for year, ids in self.index['YEAR'].items()
+                if (first is None or year >= first) and (last is None or year <= last))))
+
+        if selections:
+            selections.sort(key=len)
+            matched = selections[0].intersection(*selections[1:])
+            row_ids = sorted(matched)
+        else:
+            row_ids = range(len(self.counts))
+
+        keep = list(self.dimensions if group_by is None else group_by)
+        key_columns = [self.columns[dimension] for dimension in keep]
+        if group_by is None:
+            rows = [[column[row] for column in key_columns] + [self.counts[row]] for row in row_ids]
+        else:
+            totals: Dict[tuple, Union[int, float]] = {}
+            for row in row_ids:
+                key = tuple(column[row] for column in key_columns)
+                totals[key] = totals.get(key, 0) + self.counts[row]
+            rows = [[*key, total] for key, total in sorted(totals.items())]
+        return {'columns': keep + [VALUE_COLUMN], 'rows': rows}
+
+
+class _Response:
+    """Encoded response body with its ETag and lazily gzipped copy."""
+
+    __slots__ = ('status', 'body', 'etag', '_gzipped')
+
+    def __init__(self, status: int, payload: Any):
+        self.status = status
+        self.body = json.dumps(payload, separators=_JSON_SEPARATORS).encode()
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=8).hexdigest()}"'
+        self._gzipped = None
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if header.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith('W/') else candidate) == opaque:
+            return True
+    return False
+
+
+class QueryService:
+    """
+    Indexed aggregates plus the request handling of the query API.
+
+    ``handle`` is synchronous and socket-free; ``serve`` wraps it in an
+    asyncio HTTP/1.1 server with keep-alive and a reload poller.
+    """
+
+    def __init__(self, data_dir: Union[str, Path] = PROCESSED_DATA_DIR,
+                 tables: Optional[Dict[str, Optional[str]]] = None,
+                 cache_size: int = 1024,
+                 reload_interval: float = 2.0):
+        """
+        Args:
+            data_dir: Directory holding the aggregate CSVs
+            tables: Table name -> row dimension (see ``AGGREGATE_TABLES``)
+            cache_size: Number of encoded responses kept in the LRU cache
+            reload_interval: Seconds between source file checks (0 disables)
+        """
+        self.data_dir = Path(data_dir)
+        self.layouts = dict(AGGREGATE_TABLES if tables is None else tables)
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.tables: Dict[str, AggregateTable] = {}
+        self._cache: 'OrderedDict[str, _Response]' = OrderedDict()
+        self.reload()
+
+    def reload(self) -> List[str]:
+        """
+        Load tables whose source file is new or changed since the last load.
+
+        A file that fails to parse keeps its previous version. The response
+        cache is cleared when anything changed.
+
+        Returns:
+            Names of the tables (re)loaded or dropped
+        """
+        changed = []
+        for name, row_dimension in self.layouts.items():
+            path = self.data_dir / f'{name}.csv'
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                if self.tables.pop(name, None) is not None:
+                    changed.append(name)
+                continue
+            current = self.tables.get(name)
+            if current is not None and current.signature == (stat.st_size, stat.st_mtime_ns):
+                continue
+            try:
+                self.tables[name] = AggregateTable.from_csv(path, row_dimension)
+            except (ValueError, IndexError, OSError) as exc:
+                print(f"⚠️  Could not load {path.name}: {exc}")
+                continue
+            changed.append(name)
+        if changed:
+            self._cache.clear()
+        return changed
+
+    def _index_payload(self) -> Dict[str, Any]:
+        return {'tables': {name: table.describe() for name, table in sorted(self.tables.items())}}
+
+    def _query_payload(self, table: AggregateTable, query: str) -> Dict[str, Any]:
+        dimensions = {dimension.lower(): dimension for dimension in table.dimensions}
+        filters: Dict[str, List[Any]] = {}
+        years: List[Optional[int]] = [None, None]
+        group_by = None
+        for key, value in parse_qsl(query, keep_blank_values=True):
+            key = key.lower()
+            if key in ('since', 'until'):
+                years[key == 'until'] = _window_year(value)
+            elif key == 'group_by':
+                group_by = []
+                for name in filter(None, (part.strip().lower() for part in value.split(','))):
+                    if name not in dimensions:
+                        raise ValueError(f"cannot group {table.name} by {name!r}")
+                    group_by.append(dimensions[name])
+            elif key in dimensions:
+                dimension = dimensions[key]
+                filters.setdefault(dimension, []).extend(
+                    _parse_value(dimension, part) for part in value.split(',') if part.strip())
+            else:
+                raise ValueError(f"unknown parameter {key!r}; {table.name} filters on "
+                                 f"{', '.join(dimensions)}, since, until and group_by")
+        if (years[0] is not None or years[1] is not None) and 'YEAR' not in table.index:
+            raise ValueError(f"{table.name} has no YEAR dimension for since/until")
+        return {'table': table.name, **table.query(filters, tuple(years), group_by)}
+
+    def _resolve(self, target: str) -> _Response:
+        """Build (or fetch from the LRU cache) the response for a request target."""
+        cached = self._cache.get(target)
+        if cached is not None:
+            self._cache.move_to_end(target)
+            return cached
+
+        parts = urlsplit(target)
+        path = unquote(parts.path).rstrip('/') or '/'
+        if path in ('/', '/tables'):
+            response = _Response(200, self._index_payload())
+        elif path.startswith('/tables/') and path[len('/tables/'):] in self.tables:
+            try:
+                response = _Response(200, self._query_payload(self.tables[path[len('/tables/'):]],
+                                                              parts.query))
+            except ValueError as exc:
+                return _Response(400, {'error': str(exc)})
+        else:
+            return _Response(404, {'error': f"no table at {path}"})
+
+        self._cache[target] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return response
+
+    def handle(self, method: str, target: str,
+               headers: Dict[str, str]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """
+        Answer one request.
+
+        Args:
+            method: HTTP method
+            target: Request target (path and query string)
+            headers: Request headers with lower-case names
+
+        Returns:
+            (status, response headers, body)
+        """
+        if method not in ('GET', 'HEAD'):
+            body = json.dumps({'error': f"{method} not allowed"}, separators=_JSON_SEPARATORS).encode()
+            return 405, [('Allow', 'GET, HEAD'), ('Content-Type', 'application/json')], body
+
+        response = self._resolve(target)
+        out = [('Content-Type', 'application/json'),
+               ('Access-Control-Allow-Origin', '*')]
+        if response.status != 200:
+            return response.status, out, response.body
+
+        out += [('ETag', response.etag), ('Cache-Control', 'no-cache'), ('Vary', 'Accept-Encoding')]
+        if _etag_matches(headers.get('if-none-match', ''), response.etag):
+            return 304, out[1:], b''
+        body = response.body
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in headers.get('accept-encoding', ''):
+            body = response.gzipped()
+            out.append(('Content-Encoding', 'gzip'))
+        return 200, out, body
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one connection, with keep-alive and pipelining."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                request_line, *lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = request_line.split(' ')
+                except ValueError:
+                    writer.write(b'HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n')
+                    break
+                headers = {}
+                for line in lines:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0) or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                status, out, body = self.handle(method, target, headers)
+                head_lines = [f'HTTP/1.1 {status} {_STATUS_TEXT[status]}',
+                              f'Date: {formatdate(usegmt=True)}',
+                              f'Content-Length: {len(body)}',
+                              'Connection: keep-alive' if keep_alive else 'Connection: close']
+                head_lines += [f'{name}: {value}' for name, value in out]
+                writer.write(('\r\n'.join(head_lines) + '\r\n\r\n').encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _poll_sources(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            changed = self.reload()
+            if changed:
+                print(f"🔄 Reloaded {', '.join(changed)}")
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """
+        Run the HTTP server until cancelled.
+
+        Args:
+            host: Interface to bind (localhost by default)
+            port: TCP port
+        """
+        server = await asyncio.start_server(self._client, host, port)
+        poller = asyncio.create_task(self._poll_sources()) if self.reload_interval > 0 else None
+        print(f"✅ Serving {len(self.tables)} table(s) from {self.data_dir} at http://{host}:{port}/tables")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if poller is not None:
+                poller.cancel()
+
+
+def serve_aggregates(host: str = '127.0.0.1', port: int = 8765,
+                     data_dir: Union[str, Path] = PROCESSED_DATA_DIR,
+                     cache_size: int = 1024, reload_interval: float = 2.0) -> None:
+    """
+    Serve the processed aggregates as a read-only JSON API (blocking).
+
+    Args:
+        host: Interface to bind
+        port: TCP port
+        data_dir: Directory holding the aggregate CSVs
+        cache_size: Number of encoded responses kept in the LRU cache
+        reload_interval: Seconds between source file checks (0 disables)
+    """
+    service = QueryService(data_dir, cache_size=cache_size, reload_interval=reload_interval)
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog='python -m utils.query_service',
+                                     description='Serve the processed aggregates as a JSON API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data-dir', type=Path, default=PROCESSED_DATA_DIR)
+    parser.add_argument('--cache-size', type=int, default=1024)
+    parser.add_argument('--reload-interval', type=float, default=2.0,
+                        help='seconds between source file checks (0 disables)')
+    args = parser.parse_args(argv)
+    serve_aggregates(args.host, args.port, args.data_dir, args.cache_size, args.reload_interval)
+
+
+if __name__ == '__main__':
+    main()
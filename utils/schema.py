@@ -0,0 +1,259 @@
+"""
+Incident Schema
+
+Dtype registry for the DC crime incident columns.
+
+The registry is applied when incidents are read (CSV or Parquet), so
+repeated labels become categoricals, small codes nullable small ints,
+coordinates float32 and dates parsed timestamps (by the fixed-format
+parser in ``dates``) before the frame ever holds the float64/object
+versions.
+"""
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Any, Dict, Iterable
+
+from .dates import parse_timestamps
+
+DATE_COLUMNS = ['REPORT_DATE', 'START_DATE', 'END_DATE']
+
+# Storage dtype of every known column (after standardize_columns)
+INCIDENT_SCHEMA: Dict[str, str] = {
+    'X': 'float32',
+    'Y': 'float32',
+    'CCN': 'string',
+    'REPORT_DATE': 'datetime64[ns, UTC]',
+    'SHIFT': 'string',
+    'METHOD': 'string',
+    'OFFENSE': 'string',
+    'BLOCK': 'string',
+    'XBLOCK': 'float32',
+    'YBLOCK': 'float32',
+    'WARD': 'Int8',
+    'ANC': 'string',
+    'DISTRICT': 'Int8',
+    'PSA': 'Int16',
+    'NEIGHBORHOOD_CLUSTER': 'string',
+    'BLOCK_GROUP': 'string',
+    # Text, not numbers: census tracts have leading zeros
+    'CENSUS_TRACT': 'string',
+    'VOTING_PRECINCT': 'string',
+    'LATITUDE': 'float32',
+    'LONGITUDE': 'float32',
+    'BID': 'string',
+    'START_DATE': 'datetime64[ns, UTC]',
+    'END_DATE': 'datetime64[ns, UTC]',
+    'OBJECTID': 'Int64',
+    'OCTO_RECORD_ID': 'string',
+    'YEAR': 'string',
+}
+
+# Low-cardinality columns held as categoricals in memory (stored as plain
+# values in Parquet, which dictionary-encodes them on disk anyway)
+CATEGORICAL_COLUMNS = ['OFFENSE', 'METHOD', 'SHIFT', 'WARD', 'ANC', 'DISTRICT', 'PSA',
+                       'NEIGHBORHOOD_CLUSTER', 'BID', 'VOTING_PRECINCT']
+
+ARROW_TYPES = {
+    'float32': pa.float32(),
+    'string': pa.string(),
+    'Int8': pa.int8(),
+    'Int16': pa.int16(),
+    'Int32': pa.int32(),
+    'Int64': pa.int64(),
+    'datetime64[ns, UTC]': pa.timestamp('ns', tz='UTC'),
+}
+
+# Arrow-backed strings: one contiguous buffer instead of a Python object per value
+STRING_DTYPE = pd.StringDtype('pyarrow')
+
+PANDAS_TYPES = {
+    pa.int8(): pd.Int8Dtype(),
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+    pa.string(): STRING_DTYPE,
+}
+
+
+def standard_column_name(col: str) -> str:
+    """Standardized form of one raw incident column name (see ``incident_store.standardize_columns``)."""
+    col = col.replace('\ufeff', '').strip().upper().replace(' ', '_')
+    return 'REPORT_DATE' if col == 'REPORT_DAT' else col
+
+
+def csv_dtypes(raw_columns: Iterable[str]) -> Dict[str, Any]:
+    """
+    Build the ``pd.read_csv`` dtype mapping for a raw incident header.
+
+    Text columns are read straight into categoricals or strings and
+    coordinates into float32; numeric codes are coerced afterwards by
+    ``apply_schema`` so malformed values become missing rather than errors.
+    Date columns are read as Arrow strings, which ``apply_schema`` hands to
+    the fixed-format parser without converting them again.
+
+    Args:
+        raw_columns: Column names as they appear in the CSV header
+
+    Returns:
+        Dictionary of raw column name -> dtype
+    """
+    dtypes = {}
+    for raw in raw_columns:
+        col = standard_column_name(raw)
+        dtype = INCIDENT_SCHEMA.get(col)
+        if dtype == 'string':
+            dtypes[raw] = 'category' if col in CATEGORICAL_COLUMNS else STRING_DTYPE
+        elif dtype == 'float32':
+            dtypes[raw] = 'float32'
+        elif col in DATE_COLUMNS:
+            dtypes[raw] = STRING_DTYPE
+    return dtypes
+
+
+def csv_arrow_types() -> Dict[str, pa.DataType]:
+    """
+    Build the pyarrow CSV column types for the incident columns.
+
+    The Arrow counterpart of ``csv_dtypes``, keyed on standardized names:
+    categorical labels are read dictionary-encoded, other text and the
+    date columns as strings, coordinates as float32 and numeric codes as
+    float64 (``apply_schema`` turns them into nullable ints, so
+    non-integral codes become missing as on the pandas path).
+
+    Returns:
+        Dictionary of column name -> Arrow type, in registry order
+    """
+    types = {}
+    for col, dtype in INCIDENT_SCHEMA.items():
+        if col == 'YEAR':
+            continue  # derived, not in the CSVs
+        if col in DATE_COLUMNS:
+            types[col] = pa.string()
+        elif dtype == 'string':
+            types[col] = (pa.dictionary(pa.int32(), pa.string()) if col in CATEGORICAL_COLUMNS
+                          else pa.string())
+        elif dtype == 'float32':
+            types[col] = pa.float32()
+        else:
+            types[col] = pa.float64()
+    return types
+
+
+def _convert(series: pd.Series, dtype: str) -> pd.Series:
+    """Convert one column to its registry dtype (no-op when it already matches)."""
+    if series.dtype == (STRING_DTYPE if dtype == 'string' else dtype):
+        return series
+    if dtype.startswith('datetime'):
+        return parse_timestamps(series)
+    if dtype == 'string':
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.cat.rename_categories(series.cat.categories.astype(str))
+        return series.astype(STRING_DTYPE)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype(series.cat.categories.dtype)
+    numeric = pd.to_numeric(series, errors='coerce')
+    if dtype.startswith('Int'):
+        # Non-integral codes cannot be represented; treat them as missing
+        numeric = numeric.where(numeric % 1 == 0)
+    return numeric.astype(dtype)
+
+
+def _categories_for(values: pd.Index, dtype: str) -> pd.Index:
+    """Sorted categories with a plain dtype: object for text, numpy ints for codes."""
+    values = values.dropna()
+    if dtype == 'string':
+        return pd.Index(values.astype(str), dtype=object).sort_values()
+    return pd.Index(values.to_numpy(dtype=dtype.lower())).sort_values()
+
+
+def _as_category(series: pd.Series, dtype: str) -> pd.Series:
+    """Encode a column (already of its registry dtype) as a sorted categorical."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        used = series.cat.remove_unused_categories()
+        return used.cat.set_categories(_categories_for(used.cat.categories, dtype))
+    return series.astype(pd.CategoricalDtype(_categories_for(pd.Index(series.unique()), dtype)))
+
+
+def _is_encoded(series: pd.Series, dtype: str) -> bool:
+    """Whether a column is already a categorical over values of ``dtype``."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return False
+    categories = series.cat.categories
+    if dtype == 'string':
+        return categories.dtype == object or isinstance(categories.dtype, pd.StringDtype)
+    return pd.api.types.is_integer_dtype(categories.dtype)
+
+
+def apply_schema(df: pd.DataFrame, categorical: bool = True) -> pd.DataFrame:
+    """
+    Convert known incident columns to their registry dtypes in place.
+
+    Columns are replaced one at a time on the given frame, so no full copy
+    is made. Unknown columns are left alone.
+
+    Args:
+        df: Incident DataFrame with standardized column names
+        categorical: Encode ``CATEGORICAL_COLUMNS`` as categoricals
+
+    Returns:
+        The same DataFrame
+    """
+    for col, dtype in INCIDENT_SCHEMA.items():
+        if col not in df.columns:
+            continue
+        if categorical and col in CATEGORICAL_COLUMNS:
+            series = df[col] if _is_encoded(df[col], dtype) else _convert(df[col], dtype)
+            df[col] = _as_category(series, dtype)
+        else:
+            df[col] = _convert(df[col], dtype)
+    return df
+
+
+def to_arrow(df: pd.DataFrame) -> pa.Table:
+    """
+    Convert an incident frame to an Arrow table with the storage types.
+
+    Categoricals are written as their plain values so every Parquet file
+    in the store shares one schema whatever categories it happened to see.
+
+    Args:
+        df: Incident DataFrame
+
+    Returns:
+        pyarrow Table
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in table.schema:
+        if field.name in INCIDENT_SCHEMA:
+            fields.append(pa.field(field.name, ARROW_TYPES[INCIDENT_SCHEMA[field.name]]))
+        elif pa.types.is_dictionary(field.type):
+            fields.append(pa.field(field.name, field.type.value_type))
+        else:
+            fields.append(field)
+    return table.cast(pa.schema(fields)).replace_schema_metadata(None)
+
+
+def to_pandas(table: pa.Table, categorical: bool = True) -> pd.DataFrame:
+    """
+    Convert an Arrow table of incidents to pandas with the registry dtypes.
+
+    Categorical columns are dictionary-encoded in Arrow before conversion,
+    so their strings are never materialized as Python objects.
+
+    Args:
+        table: pyarrow Table (e.g. a scan of the incident store)
+        categorical: Encode ``CATEGORICAL_COLUMNS`` as categoricals
+
+    Returns:
+        pandas DataFrame
+    """
+    if categorical:
+        for i, name in enumerate(table.column_names):
+            if name in CATEGORICAL_COLUMNS and not pa.types.is_dictionary(table.schema.field(i).type):
+                table = table.set_column(i, name, pc.dictionary_encode(table.column(i)))
+    df = table.to_pandas(types_mapper=PANDAS_TYPES.get)
+    return apply_schema(df, categorical=categorical)
+
@@ -0,0 +1,548 @@
+"""
+Spatial Utilities
+
+Vectorized radius counting and raster density surfaces for crime-density
+analysis.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+
+EARTH_RADIUS_MILES = 3959.0
+METERS_PER_MILE = 1609.344
+MILES_PER_DEGREE_LAT = np.pi * EARTH_RADIUS_MILES / 180.0
+
+# DC open data XBLOCK/YBLOCK are Maryland State Plane (NAD83) in meters
+DC_STATE_PLANE_CRS = 'EPSG:26985'
+
+Radii = Union[float, Sequence[float]]
+
+# Haversine bucketing pads the cell by 1%; the cos(mean latitude) projection
+# it uses stays within that padding over about 0.7 degrees of latitude at DC
+BUCKET_PADDING = 1.01
+
+# Default raster cell sizes: ~0.07 mile in degrees, 100 m in state-plane meters
+DEFAULT_CELL_SIZE = {'haversine': 0.001, 'planar': 100.0}
+KERNELS = ('disk', 'gaussian')
+
+
+def haversine_distance(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    Calculate great-circle distance in miles between points.
+
+    Inputs broadcast like NumPy arrays, so one call can compare a single
+    location against every incident, or paired arrays element-wise.
+
+    Args:
+        lat1, lon1: Latitude/longitude of the first point(s) in degrees
+        lat2, lon2: Latitude/longitude of the second point(s) in degrees
+
+    Returns:
+        Distance(s) in miles
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64))
+                              for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def lonlat_to_state_plane(lon, lat) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Project longitude/latitude to the XBLOCK/YBLOCK state-plane system.
+
+    Args:
+        lon: Longitude(s) in degrees
+        lat: Latitude(s) in degrees
+
+    Returns:
+        Tuple of (x, y) arrays in meters
+    """
+    from pyproj import Transformer
+
+    transformer = Transformer.from_crs('EPSG:4326', DC_STATE_PLANE_CRS, always_xy=True)
+    x, y = transformer.transform(np.asarray(lon, dtype=np.float64),
+                                 np.asarray(lat, dtype=np.float64))
+    return np.asarray(x), np.asarray(y)
+
+
+def _as_radii(radii: Radii) -> List[float]:
+    """Normalize a scalar or sequence of radii to a sorted list of floats."""
+    if np.isscalar(radii):
+        return [float(radii)]
+    return sorted(float(r) for r in radii)
+
+
+def _bucket_candidates(qx: np.ndarray, qy: np.ndarray,
+                       px: np.ndarray, py: np.ndarray,
+                       cell_size: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find candidate (query, point) pairs using a uniform grid index.
+
+    Points are bucketed into square cells of ``cell_size``; each query only
+    looks at its own cell and the eight neighbours, so every point within
+    ``cell_size`` of a query is guaranteed to be returned.
+
+    Returns:
+        Tuple of (query_indices, point_indices) arrays
+    """
+    x0, y0 = px.min(), py.min()
+    pcx = np.floor((px - x0) / cell_size).astype(np.int64)
+    pcy = np.floor((py - y0) / cell_size).astype(np.int64)
+    n_rows = int(pcy.max()) + 3  # padding keeps neighbour keys unique
+
+    keys = (pcx + 1) * n_rows + (pcy + 1)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    qcx = np.floor((qx - x0) / cell_size).astype(np.int64)
+    qcy = np.floor((qy - y0) / cell_size).astype(np.int64)
+
+    query_parts, point_parts = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            cx, cy = qcx + dx, qcy + dy
+            inside = (cy >= -1) & (cy <= n_rows - 2)
+            qkeys = np.where(inside, (cx + 1) * n_rows + (cy + 1), -1)
+            start = np.searchsorted(sorted_keys, qkeys, side='left')
+            stop = np.searchsorted(sorted_keys, qkeys, side='right')
+            counts = stop - start
+            if counts.sum() == 0:
+                continue
+            q_idx = np.repeat(np.arange(len(qx)), counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            query_parts.append(q_idx)
+            point_parts.append(order[np.repeat(start, counts) + offsets])
+
+    if not query_parts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(query_parts), np.concatenate(point_parts)
+
+
+def _count_by_radius(q_idx: np.ndarray, distances: np.ndarray,
+                     radii: List[float], n_queries: int) -> np.ndarray:
+    """Count pairs within each radius; returns an (n_queries, n_radii) array."""
+    counts = np.zeros((n_queries, len(radii)), dtype=np.int64)
+    for j, radius in enumerate(radii):
+        within = distances <= radius
+        counts[:, j] = np.bincount(q_idx[within], minlength=n_queries)
+    return counts
+
+
+def _query_points(points, lat_col: str, lon_col: str) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Latitudes, longitudes and index of a points frame or (lat, lon) list."""
+    if isinstance(points, pd.DataFrame):
+        return (points[lat_col].to_numpy(dtype=np.float64),
+                points[lon_col].to_numpy(dtype=np.float64), points.index)
+    coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1], pd.RangeIndex(len(coords))
+
+
+def count_within_radius(incidents: pd.DataFrame,
+                        points: Union[pd.DataFrame, Sequence[Tuple[float, float]]],
+                        radii: Radii = 0.5,
+                        method: str = 'haversine',
+                        lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                        x_col: str = 'XBLOCK', y_col: str = 'YBLOCK',
+                        chunk_size: int = 2000) -> pd.DataFrame:
+    """
+    Count incidents within one or more radii of many query points at once.
+
+    Replaces per-location ``iterrows()`` loops: incidents are bucketed into a
+    grid index once, and distances are only computed for nearby candidates.
+
+    Args:
+        incidents: DataFrame of incidents with coordinate columns
+        points: DataFrame with ``lat_col``/``lon_col`` columns, or a list of
+            (lat, lon) tuples such as ``fed_coords`` or ``valid_grid_centers``
+        radii: Radius in miles, or a list of radii to count in one pass
+        method: 'haversine' (great-circle on lat/lon) or 'planar'
+            (Euclidean on the XBLOCK/YBLOCK state-plane meters)
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        x_col: State-plane X column name (planar method)
+        y_col: State-plane Y column name (planar method)
+        chunk_size: Number of query points processed per batch
+
+    Returns:
+        DataFrame with one row per query point and one count column per
+        radius, named like ``within_0.5mi``
+
+    Raises:
+        ValueError: With the haversine method, when the incidents and points
+            span too much latitude for the city-scale bucketing projection
+            (more than about 0.7 degrees around DC's latitude)
+    """
+    radii = _as_radii(radii)
+    q_lat, q_lon, index = _query_points(points, lat_col, lon_col)
+    columns = [f'within_{r:g}mi' for r in radii]
+
+    if method == 'haversine':
+        valid = incidents[lat_col].notna() & incidents[lon_col].notna()
+        p_lat = incidents.loc[valid, lat_col].to_numpy(dtype=np.float64)
+        p_lon = incidents.loc[valid, lon_col].to_numpy(dtype=np.float64)
+        # Local equirectangular projection (miles) for bucketing only. East-west
+        # distances are scaled by cos(mean latitude), which overstates them where
+        # cos(latitude) is smaller; the padded cell absorbs that only while the
+        # ratio stays below BUCKET_PADDING, i.e. over a city-sized latitude span.
+        lat0 = np.radians(np.nanmean(p_lat)) if len(p_lat) else 0.0
+        lats = np.abs(np.concatenate([p_lat, q_lat[~np.isnan(q_lat)]]))
+        if len(lats) and np.cos(lat0) > BUCKET_PADDING * np.cos(np.radians(lats.max())):
+            raise ValueError("method='haversine' buckets with a city-scale projection; the points "
+                             f"span latitudes up to {lats.max():.2f}, too far from the mean "
+                             f"{np.degrees(lat0):.2f}. Split the points or use method='planar'.")
+        px, py = p_lon * MILES_PER_DEGREE_LAT * np.cos(lat0), p_lat * MILES_PER_DEGREE_LAT
+        qx, qy = q_lon * MILES_PER_DEGREE_LAT * np.cos(lat0), q_lat * MILES_PER_DEGREE_LAT
+        cell_size = radii[-1] * BUCKET_PADDING
+    elif method == 'planar':
+        valid = incidents[x_col].notna() & incidents[y_col].notna()
+        px = incidents.loc[valid, x_col].to_numpy(dtype=np.float64)
+        py = incidents.loc[valid, y_col].to_numpy(dtype=np.float64)
+        qx, qy = lonlat_to_state_plane(q_lon, q_lat)
+        cell_size = radii[-1] * METERS_PER_MILE
+    else:
+        raise ValueError("method must be 'haversine' or 'planar'")
+
+    counts = np.zeros((len(q_lat), len(radii)), dtype=np.int64)
+    if len(px) and len(q_lat):
+        for start in range(0, len(q_lat), chunk_size):
+            stop = min(start + chunk_size, len(q_lat))
+            q_idx, p_idx = _bucket_candidates(qx[start:stop], qy[start:stop], px, py, cell_size)
+            if method == 'haversine':
+                distances = haversine_distance(q_lat[start:stop][q_idx], q_lon[start:stop][q_idx],
+                                               p_lat[p_idx], p_lon[p_idx])
+            else:
+                distances = np.hypot(qx[start:stop][q_idx] - px[p_idx],
+                                     qy[start:stop][q_idx] - py[p_idx]) / METERS_PER_MILE
+            counts[start:stop] = _count_by_radius(q_idx, distances, radii, stop - start)
+
+    return pd.DataFrame(counts, index=index, columns=columns)
+
+
+def count_within_radius_by_group(incidents: pd.DataFrame,
+                                 points: Union[pd.DataFrame, Sequence[Tuple[float, float]]],
+                                 groups: dict,
+                                 radius: float = 0.5,
+                                 method: str = 'haversine',
+                                 **kwargs) -> pd.DataFrame:
+    """
+    Count incidents near each point for several incident subsets.
+
+    Args:
+        incidents: DataFrame of incidents
+        points: Query points, as accepted by ``count_within_radius``
+        groups: Mapping of column name -> boolean mask over ``incidents``
+            (e.g. ``{'violent': is_violent, 'gun': is_gun}``)
+        radius: Radius in miles
+        method: 'haversine' or 'planar'
+        **kwargs: Passed through to ``count_within_radius``
+
+    Returns:
+        DataFrame with one row per query point and one column per group
+    """
+    results = {}
+    for name, mask in groups.items():
+        counts = count_within_radius(incidents[mask], points, radii=radius,
+                                     method=method, **kwargs)
+        results[name] = counts.iloc[:, 0]
+    return pd.DataFrame(results)
+
+
+
+def _kernel(radius: float, kernel: str, cell_x: float, cell_y: float,
+            half_x: int, half_y: int) -> np.ndarray:
+    """
+    Convolution kernel on a (2 * half_y + 1, 2 * half_x + 1) cell window.
+
+    Cells are ``cell_x`` by ``cell_y`` miles. The disk kernel is 1 where
+    the cell center lies within ``radius`` of the window center; the
+    gaussian kernel uses ``radius`` as its bandwidth and is cut at three
+    bandwidths.
+    """
+    dx = np.arange(-half_x, half_x + 1) * cell_x
+    dy = np.arange(-half_y, half_y + 1) * cell_y
+    distance = np.hypot(dx[None, :], dy[:, None])
+    if kernel == 'disk':
+        return (distance <= radius).astype(np.float64)
+    weights = np.exp(-0.5 * (distance / radius) ** 2)
+    return np.where(distance <= 3 * radius, weights, 0.0)
+
+
+def _convolve(grids: np.ndarray, kernels: List[np.ndarray]) -> np.ndarray:
+    """
+    Convolve a stack of grids with same-sized kernels via FFT.
+
+    The grids are transformed once and multiplied by each kernel's
+    transform, so extra radii cost one multiply and inverse transform.
+
+    Args:
+        grids: (n_groups, ny, nx) array
+        kernels: Kernels of odd shape (ky, kx), centered
+
+    Returns:
+        (n_groups, n_kernels, ny, nx) array aligned with ``grids``
+    """
+    _, ny, nx = grids.shape
+    ky, kx = kernels[0].shape
+    shape = (ny + ky - 1, nx + kx - 1)
+    spectrum = np.fft.rfft2(grids, s=shape)
+    out = np.empty((grids.shape[0], len(kernels), ny, nx))
+    for j, kernel in enumerate(kernels):
+        full = np.fft.irfft2(spectrum * np.fft.rfft2(kernel, s=shape), s=shape)
+        out[:, j] = full[:, ky // 2:ky // 2 + ny, kx // 2:kx // 2 + nx]
+    return out
+
+
+class DensitySurface:
+    """
+    Incident counts within one or more radii of every cell of a grid.
+
+    Built by ``density_surface``. Counts are held as a
+    (groups, radii, rows, columns) array; ``columns`` names each
+    (group, radius) pair like ``count_within_radius`` does
+    (``within_0.5mi``, or ``violent_within_0.5mi`` with groups). The cells
+    inside the city form the reference distribution for percentiles,
+    which is sorted once so ranking any number of sites is a
+    ``searchsorted``.
+    """
+
+    def __init__(self, counts: np.ndarray, groups: List[Optional[str]], radii: List[float],
+                 x0: float, y0: float, cell_size: float, method: str, inside: np.ndarray):
+        self.counts = counts
+        self.groups = groups
+        self.radii = radii
+        self.x0, self.y0 = x0, y0
+        self.cell_size = cell_size
+        self.method = method
+        self.inside = inside
+        self.columns = [f'{group}_within_{r:g}mi' if group else f'within_{r:g}mi'
+                        for group in groups for r in radii]
+        flat = counts.reshape(len(self.columns), -1)[:, inside.ravel()]
+        self._sorted = {col: np.sort(values) for col, values in zip(self.columns, flat)}
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Grid shape as (rows, columns)."""
+        return self.counts.shape[-2:]
+
+    def grid(self, column: Optional[str] = None) -> np.ndarray:
+        """
+        2-D count grid of one column (rows run south to north).
+
+        Args:
+            column: Column name (the first column if None)
+
+        Returns:
+            (rows, columns) array
+        """
+        i = self.columns.index(column or self.columns[0])
+        return self.counts.reshape(len(self.columns), *self.shape)[i]
+
+    def _cell_centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell-center coordinates (lon/lat degrees or state-plane meters)."""
+        ny, nx = self.shape
+        x = self.x0 + (np.arange(nx) + 0.5) * self.cell_size
+        y = self.y0 + (np.arange(ny) + 0.5) * self.cell_size
+        return np.meshgrid(x, y)
+
+    def to_frame(self, inside_only: bool = True) -> pd.DataFrame:
+        """
+        One row per cell with its center and counts (for hotspot maps).
+
+        Args:
+            inside_only: Keep only the cells inside the city
+
+        Returns:
+            DataFrame with ``LATITUDE``/``LONGITUDE`` (or ``X``/``Y`` for
+            the planar method) and one column per (group, radius)
+        """
+        x, y = self._cell_centers()
+        keep = self.inside.ravel() if inside_only else slice(None)
+        names = ('LONGITUDE', 'LATITUDE') if self.method == 'haversine' else ('X', 'Y')
+        data = {names[1]: y.ravel()[keep], names[0]: x.ravel()[keep]}
+        flat = self.counts.reshape(len(self.columns), -1)
+        for col, values in zip(self.columns, flat):
+            data[col] = values[keep]
+        return pd.DataFrame(data)
+
+    def percentile(self, values, column: Optional[str] = None) -> np.ndarray:
+        """
+        Percentile rank of counts among the cells inside the city.
+
+        Same definition as the notebook's
+        ``sum(x <= count for x in grid_counts) / len(grid_counts) * 100``.
+
+        Args:
+            values: Count(s) to rank, e.g. exact ``count_within_radius``
+                results for a set of sites
+            column: Column whose distribution to rank against (the first
+                column if None)
+
+        Returns:
+            Array of percentiles (0-100)
+        """
+        reference = self._sorted[column or self.columns[0]]
+        if not len(reference):
+            return np.full(np.shape(values), np.nan)
+        return np.searchsorted(reference, np.asarray(values), side='right') / len(reference) * 100
+
+    def at(self, points: Union[pd.DataFrame, Sequence[Tuple[float, float]]],
+           lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE') -> pd.DataFrame:
+        """
+        Counts of the cells containing each point (0 outside the grid).
+
+        Args:
+            points: DataFrame with ``lat_col``/``lon_col`` columns, or a
+                list of (lat, lon) tuples
+            lat_col: Latitude column name
+            lon_col: Longitude column name
+
+        Returns:
+            DataFrame with one row per point and one column per (group, radius)
+        """
+        q_lat, q_lon, index = _query_points(points, lat_col, lon_col)
+        qx, qy = (q_lon, q_lat) if self.method == 'haversine' else lonlat_to_state_plane(q_lon, q_lat)
+        ny, nx = self.shape
+        cx = np.floor((qx - self.x0) / self.cell_size).astype(np.int64)
+        cy = np.floor((qy - self.y0) / self.cell_size).astype(np.int64)
+        on_grid = (cx >= 0) & (cx < nx) & (cy >= 0) & (cy < ny)
+        flat = self.counts.reshape(len(self.columns), -1)
+        cells = np.where(on_grid, cy * nx + cx, 0)
+        values = np.where(on_grid[None, :], flat[:, cells], 0)
+        return pd.DataFrame(values.T, index=index, columns=self.columns)
+
+    def rank_sites(self, points: Union[pd.DataFrame, Sequence[Tuple[float, float]]],
+                   counts: Optional[pd.DataFrame] = None, **kwargs) -> pd.DataFrame:
+        """
+        Counts and percentile ranks of a set of sites in every column.
+
+        Args:
+            points: Sites, as accepted by ``at``
+            counts: Exact counts per site with the same columns (e.g.
+                from ``count_within_radius``); read from the surface if None
+            **kwargs: Passed through to ``at``
+
+        Returns:
+            DataFrame with each count column followed by its ``_pct`` rank
+        """
+        if counts is None:
+            counts = self.at(points, **kwargs)
+        ranked = {}
+        for col in counts.columns:
+            ranked[col] = counts[col].to_numpy()
+            ranked[f'{col}_pct'] = self.percentile(ranked[col], col)
+        return pd.DataFrame(ranked, index=counts.index)
+
+
+def density_surface(incidents: pd.DataFrame,
+                    radii: Radii = 0.5,
+                    groups: Optional[dict] = None,
+                    cell_size: Optional[float] = None,
+                    method: str = 'haversine',
+                    kernel: str = 'disk',
+                    clip: bool = True,
+                    lat_col: str = 'LATITUDE', lon_col: str = 'LONGITUDE',
+                    x_col: str = 'XBLOCK', y_col: str = 'YBLOCK',
+                    raw_dir=None, cache_dir=None) -> DensitySurface:
+    """
+    Count incidents within each radius of every cell of a city-wide grid.
+
+    Incidents are binned onto the grid once per group, and the counts
+    for every cell come from one FFT convolution of the binned grid with
+    a disk per radius, instead of a radius search per grid center. A
+    cell's count is the number of incidents in the cells whose centers lie
+    within the radius, so positions are exact to about half a cell; pass
+    exact ``count_within_radius`` results to ``rank_sites`` where that
+    matters. With the haversine method, cell sizes in miles use the mean
+    incident latitude, which is accurate over a city but not a region.
+
+    Args:
+        incidents: DataFrame of incidents with coordinate columns
+        radii: Radius in miles, or a list of radii
+        groups: Mapping of name -> boolean mask over ``incidents`` (e.g.
+            ``{'violent': is_violent, 'gun': is_gun}``); all incidents if None
+        cell_size: Cell size in degrees (haversine) or meters (planar);
+            0.001 degrees / 100 m if None
+        method: 'haversine' (grid on latitude/longitude, distances in
+            local miles) or 'planar' (grid on XBLOCK/YBLOCK state-plane meters)
+        kernel: 'disk' (counts within the radius) or 'gaussian'
+            (smoothed density with the radius as bandwidth)
+        clip: Restrict the percentile reference (and ``to_frame``) to
+            cells inside DC
+        lat_col: Latitude column name
+        lon_col: Longitude column name
+        x_col: State-plane X column name (planar method)
+        y_col: State-plane Y column name (planar method)
+        raw_dir: Directory containing the ward GeoJSON used for clipping
+        cache_dir: Boundary cache holding the precompiled city outline
+
+    Returns:
+        DensitySurface
+    """
+    radii = _as_radii(radii)
+    if kernel not in KERNELS:
+        raise ValueError(f"kernel must be one of {KERNELS}")
+    if method == 'haversine':
+        x_name, y_name = lon_col, lat_col
+    elif method == 'planar':
+        x_name, y_name = x_col, y_col
+    else:
+        raise ValueError("method must be 'haversine' or 'planar'")
+    cell_size = float(cell_size or DEFAULT_CELL_SIZE[method])
+
+    valid = (incidents[x_name].notna() & incidents[y_name].notna()).to_numpy()
+    px = incidents[x_name].to_numpy(dtype=np.float64)
+    py = incidents[y_name].to_numpy(dtype=np.float64)
+
+    # Cell size in miles along each axis
+    if method == 'haversine':
+        lat0 = np.radians(np.mean(py[valid])) if valid.any() else 0.0
+        scale = (cell_size * MILES_PER_DEGREE_LAT * np.cos(lat0), cell_size * MILES_PER_DEGREE_LAT)
+    else:
+        scale = (cell_size / METERS_PER_MILE, cell_size / METERS_PER_MILE)
+
+    # Pad the extent by the kernel reach so sites near the edge still see
+    # every incident within the radius
+    reach = radii[-1] * (3 if kernel == 'gaussian' else 1)
+    half_x, half_y = (int(np.ceil(reach / s)) for s in scale)
+    if valid.any():
+        x0 = px[valid].min() - (half_x + 1) * cell_size
+        y0 = py[valid].min() - (half_y + 1) * cell_size
+        nx = int((px[valid].max() - x0) / cell_size) + half_x + 2
+        ny = int((py[valid].max() - y0) / cell_size) + half_y + 2
+    else:
+        x0 = y0 = 0.0
+        nx = ny = 1
+
+    cells = np.zeros(len(incidents), dtype=np.int64)
+    cells[valid] = (((py[valid] - y0) / cell_size).astype(np.int64) * nx
+                    + ((px[valid] - x0) / cell_size).astype(np.int64))
+
+    masks = {None: np.ones(len(incidents), dtype=bool)} if groups is None else groups
+    grids = np.empty((len(masks), ny, nx))
+    for i, mask in enumerate(masks.values()):
+        keep = valid & np.asarray(mask, dtype=bool)
+        grids[i] = np.bincount(cells[keep], minlength=ny * nx).reshape(ny, nx)
+
+    kernels = [_kernel(r, kernel, scale[0], scale[1], half_x, half_y) for r in radii]
+    counts = _convolve(grids, kernels)
+    counts = np.rint(counts).astype(np.int32) if kernel == 'disk' else counts.astype(np.float32)
+
+    inside = np.ones((ny, nx), dtype=bool)
+    if clip:
+        from .geography import BOUNDARY_CACHE_DIR, RAW_DATA_DIR, points_in_city
+
+        gx = x0 + (np.arange(nx) + 0.5) * cell_size
+        gy = y0 + (np.arange(ny) + 0.5) * cell_size
+        lon, lat = (a.ravel() for a in np.meshgrid(gx, gy))
+        if method == 'planar':
+            from pyproj import Transformer
+
+            transformer = Transformer.from_crs(DC_STATE_PLANE_CRS, 'EPSG:4326', always_xy=True)
+            lon, lat = transformer.transform(lon, lat)
+        inside = points_in_city(lon, lat, raw_dir or RAW_DATA_DIR,
+                                cache_dir or BOUNDARY_CACHE_DIR).reshape(ny, nx)
+
+    return DensitySurface(counts, list(masks), radii, x0, y0, cell_size, method, inside)
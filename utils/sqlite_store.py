@@ -0,0 +1,395 @@
+"""
+SQLite Store
+
+Optional local SQLite copy of the cleaned incidents with indexes for the
+common filters, so summaries and extracts can be answered in SQL without
+loading the whole table and without a database server.
+
+The incidents are streamed from the Parquet store (or a frame) and
+bulk-loaded in batched transactions with journaling off, then indexed:
+
+- ``(OFFENSE, YEAR)`` for per-offense extracts and offense/year tables
+- ``(WARD, REPORT_DATE)`` for ward breakdowns over a date window
+- an R*Tree on ``LATITUDE``/``LONGITUDE`` for bounding-box queries
+
+Timestamps are stored as UTC ``YYYY-MM-DD HH:MM:SS`` text, which sorts
+and compares chronologically. The build is skipped when the Parquet
+store has not changed since the last one.
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from pathlib import Path
+import hashlib
+import os
+import sqlite3
+import tempfile
+
+from ._config import INCIDENT_STORE_DIR, RAW_DATA_DIR, SQLITE_PATH
+from .schema import INCIDENT_SCHEMA, apply_schema, to_arrow
+
+TABLE = 'incidents'
+RTREE_TABLE = 'incidents_rtree'
+META_TABLE = 'store_meta'
+SQL_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Registry dtype -> SQLite column type
+SQL_TYPES = {
+    'float32': 'REAL',
+    'string': 'TEXT',
+    'Int8': 'INTEGER',
+    'Int16': 'INTEGER',
+    'Int32': 'INTEGER',
+    'Int64': 'INTEGER',
+    'datetime64[ns, UTC]': 'TEXT',
+}
+INDEXES = {
+    'ix_incidents_offense_year': ('OFFENSE', 'YEAR'),
+    'ix_incidents_ward_report_date': ('WARD', 'REPORT_DATE'),
+}
+SQL_AGGREGATES = {'sum': 'SUM', 'mean': 'AVG', 'count': 'COUNT', 'max': 'MAX', 'min': 'MIN'}
+
+Connection = Union[str, Path, sqlite3.Connection, None]
+BBox = Tuple[float, float, float, float]
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_timestamp(value: Any) -> str:
+    """Stored text form of a date bound ('2025-01-01' is midnight UTC)."""
+    stamp = pd.Timestamp(value)
+    stamp = stamp.tz_localize('UTC') if stamp.tzinfo is None else stamp.tz_convert('UTC')
+    return stamp.strftime(SQL_TIMESTAMP_FORMAT)
+
+
+def _batch_rows(df: pd.DataFrame, columns: List[str]) -> Iterable[tuple]:
+    """Rows of ``df`` as tuples of Python values (None for missing)."""
+    table = to_arrow(df[columns])
+    values = []
+    for column in table.columns:
+        if pa.types.is_timestamp(column.type):
+            # Whole UTC seconds as naive timestamps cast to 'YYYY-MM-DD HH:MM:SS'
+            # (much faster than pc.strftime)
+            seconds = column.cast(pa.timestamp('s', tz='UTC'), safe=False).cast(pa.int64())
+            column = seconds.cast(pa.timestamp('s')).cast(pa.string())
+        values.append(column.to_pylist())
+    return zip(*values)
+
+
+def _store_signature(store_dir: Path) -> str:
+    """Hash of the Parquet store manifest (changes with every refresh or upsert)."""
+    from .incident_store import MANIFEST_NAME
+
+    manifest = store_dir / MANIFEST_NAME
+    if not manifest.exists():
+        raise FileNotFoundError(f"No incident store at {store_dir}; run build_incident_store() first")
+    return hashlib.sha256(manifest.read_bytes()).hexdigest()
+
+
+def _stored_signature(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    try:
+        with _connect(path) as conn:
+            row = conn.execute(f"SELECT value FROM {META_TABLE} WHERE key = 'source'").fetchone()
+    except sqlite3.DatabaseError:
+        return None
+    return row[0] if row else None
+
+
+def build_sqlite_store(source: Union[pd.DataFrame, Iterable[pd.DataFrame], None] = None,
+                       path: Union[str, Path] = SQLITE_PATH,
+                       batch_size: int = 100_000,
+                       refresh: bool = True,
+                       force: bool = False,
+                       raw_dir: Union[str, Path] = RAW_DATA_DIR,
+                       store_dir: Union[str, Path] = INCIDENT_STORE_DIR) -> Dict[str, Any]:
+    """
+    Bulk-load cleaned incidents into an indexed SQLite database.
+
+    The database is written to a temporary file (journal off, one
+    transaction per batch, indexes built after the load) and renamed
+    into place, so readers never see a partial build.
+
+    Args:
+        source: None to stream the Parquet store (feed rows replace yearly
+            rows, as in ``load_incidents``), a cleaned DataFrame, or an
+            iterable of cleaned DataFrames
+        path: SQLite file to write
+        batch_size: Rows per insert transaction
+        refresh: Rebuild stale store partitions from ``raw_dir`` first
+            (only when reading the store)
+        force: Rebuild even if the store is unchanged since the last build
+        raw_dir: Directory containing the yearly source CSVs
+        store_dir: Root directory of the Parquet dataset
+
+    Returns:
+        Dictionary with 'rows', 'rtree' (whether the R*Tree was built)
+        and 'skipped'
+    """
+    from .incident_store import _read_manifest, build_incident_store, iter_incidents
+
+    path, store_dir = Path(path), Path(store_dir)
+    signature = None
+    if source is None:
+        if refresh:
+            build_incident_store(raw_dir, store_dir,
+                                 partition_by=_read_manifest(store_dir).get('partition_by', ['YEAR']))
+        signature = _store_signature(store_dir)
+        if not force and _stored_signature(path) == signature:
+            return {'rows': None, 'rtree': None, 'skipped': True}
+        batches = iter_incidents(batch_size=batch_size, store_dir=store_dir)
+    elif isinstance(source, pd.DataFrame):
+        batches = (source.iloc[start:start + batch_size]
+                   for start in range(0, len(source), batch_size))
+    else:
+        batches = iter(source)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    os.close(fd)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -262144')  # 256 MB page cache for the index builds
+
+        columns = None
+        rows = 0
+        for batch in batches:
+            if columns is None:
+                columns = [col for col in INCIDENT_SCHEMA if col in batch.columns]
+                definitions = ', '.join(f'{_quote(col)} {SQL_TYPES[INCIDENT_SCHEMA[col]]}'
+                                        for col in columns)
+                conn.execute(f'CREATE TABLE {TABLE} (id INTEGER PRIMARY KEY, {definitions})')
+                insert = (f'INSERT INTO {TABLE} ({", ".join(map(_quote, columns))}) '
+                          f'VALUES ({", ".join("?" * len(columns))})')
+            if not len(batch):
+                continue
+            with conn:
+                conn.executemany(insert, _batch_rows(batch, columns))
+            rows += len(batch)
+        if columns is None:
+            raise ValueError("No incidents to load")
+
+        with conn:
+            for name, index_columns in INDEXES.items():
+                if set(index_columns) <= set(columns):
+                    conn.execute(f'CREATE INDEX {name} ON {TABLE} ({", ".join(map(_quote, index_columns))})')
+            rtree = _build_rtree(conn) if {'LATITUDE', 'LONGITUDE'} <= set(columns) else False
+            conn.execute(f'CREATE TABLE {META_TABLE} (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute(f'INSERT INTO {META_TABLE} VALUES (?, ?)', ('source', signature))
+            conn.execute(f'INSERT INTO {META_TABLE} VALUES (?, ?)',
+                         ('built', pd.Timestamp.now(tz='UTC').isoformat()))
+        conn.execute('ANALYZE')
+        conn.close()
+        os.replace(tmp, path)
+    except BaseException:
+        conn.close()
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    print(f"✅ SQLite store built: {rows:,} incidents -> {path}"
+          + ('' if rtree else ' (no R*Tree: this SQLite build lacks the rtree module)'))
+    return {'rows': rows, 'rtree': rtree, 'skipped': False}
+
+
+def _build_rtree(conn: sqlite3.Connection) -> bool:
+    """Index incident coordinates in an R*Tree; False if SQLite lacks the module."""
+    try:
+        conn.execute(f'CREATE VIRTUAL TABLE {RTREE_TABLE} USING rtree(id, min_lat, max_lat, min_lon, max_lon)')
+    except sqlite3.OperationalError:
+        return False
+    conn.execute(f'INSERT INTO {RTREE_TABLE} SELECT id, LATITUDE, LATITUDE, LONGITUDE, LONGITUDE '
+                 f'FROM {TABLE} WHERE LATITUDE IS NOT NULL AND LONGITUDE IS NOT NULL')
+    return True
+
+
+@contextmanager
+def _connect(source: Connection = None) -> Iterator[sqlite3.Connection]:
+    """Yield the given connection, or open the database file read-only."""
+    if isinstance(source, sqlite3.Connection):
+        yield source
+        return
+    path = Path(SQLITE_PATH if source is None else source)
+    if not path.exists():
+        raise FileNotFoundError(f"No SQLite store at {path}; run build_sqlite_store() first")
+    conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _table_columns(conn: sqlite3.Connection) -> List[str]:
+    return [row[1] for row in conn.execute(f'PRAGMA table_info({TABLE})') if row[1] != 'id']
+
+
+def _check_columns(conn: sqlite3.Connection, names: Iterable[str]) -> None:
+    unknown = set(names) - set(_table_columns(conn))
+    if unknown:
+        raise KeyError(f"Column(s) not in the SQLite store: {', '.join(sorted(unknown))}")
+
+
+def _where_clause(conn: sqlite3.Connection, where: Optional[Dict[str, Any]] = None,
+                  start: Any = None, end: Any = None, bbox: Optional[BBox] = None,
+                  date_col: str = 'REPORT_DATE') -> Tuple[str, list]:
+    """
+    Build a WHERE clause and its parameters.
+
+    Equality / membership filters use the same form as the polars
+    backend (``{'OFFENSE': 'HOMICIDE', 'YEAR': ['2024', '2025']}``);
+    ``start``/``end`` bound ``date_col`` (end exclusive) and ``bbox``
+    (min_lat, min_lon, max_lat, max_lon) goes through the R*Tree.
+    """
+    clauses, params = [], []
+    where = dict(where or {})
+    _check_columns(conn, list(where) + ([date_col] if start is not None or end is not None else []))
+    for col, value in where.items():
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append(f'{_quote(col)} IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        else:
+            clauses.append(f'{_quote(col)} = ?')
+            params.append(value)
+    if start is not None:
+        clauses.append(f'{_quote(date_col)} >= ?')
+        params.append(_sql_timestamp(start))
+    if end is not None:
+        clauses.append(f'{_quote(date_col)} < ?')
+        params.append(_sql_timestamp(end))
+    if bbox is not None:
+        # Coordinates are float32; compare at that precision like pandas does
+        min_lat, min_lon, max_lat, max_lon = np.asarray(bbox, dtype='float32').tolist()
+        has_rtree = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (RTREE_TABLE,)).fetchone()
+        if has_rtree:
+            # R*Tree boxes are float32 rounded outward; the exact test follows
+            clauses.append(f'id IN (SELECT id FROM {RTREE_TABLE} WHERE min_lat >= ? AND max_lat <= ? '
+                           f'AND min_lon >= ? AND max_lon <= ?)')
+            params.extend([min_lat, max_lat, min_lon, max_lon])
+        clauses.append('LATITUDE BETWEEN ? AND ? AND LONGITUDE BETWEEN ? AND ?')
+        params.extend([min_lat, max_lat, min_lon, max_lon])
+    return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+
+def sqlite_incidents(where: Optional[Dict[str, Any]] = None,
+                     start: Any = None, end: Any = None,
+                     bbox: Optional[BBox] = None,
+                     columns: Optional[List[str]] = None,
+                     source: Connection = None) -> pd.DataFrame:
+    """
+    Read incidents matching the filters from the SQLite store.
+
+    Only the matching rows are read, through the indexes, e.g.
+    ``sqlite_incidents({'OFFENSE': 'HOMICIDE'})`` for the per-offense
+    extracts or ``bbox=`` for one neighborhood.
+
+    Args:
+        where: Equality / membership filters, e.g. {'METHOD': 'GUN'}
+        start: Earliest REPORT_DATE (inclusive)
+        end: Latest REPORT_DATE (exclusive)
+        bbox: (min_lat, min_lon, max_lat, max_lon)
+        columns: Columns to read; None reads all
+        source: SQLite path or open connection (default: ``SQLITE_PATH``)
+
+    Returns:
+        Incident DataFrame with the registry dtypes
+    """
+    with _connect(source) as conn:
+        if columns is not None:
+            _check_columns(conn, columns)
+        selected = ', '.join(map(_quote, columns)) if columns is not None else ', '.join(
+            map(_quote, _table_columns(conn)))
+        clause, params = _where_clause(conn, where, start, end, bbox)
+        df = pd.read_sql_query(f'SELECT {selected} FROM {TABLE}{clause} ORDER BY id', conn, params=params)
+    return apply_schema(df)
+
+
+def sqlite_summary_table(group_by: Union[str, List[str]], aggregate_cols: List[str],
+                         agg_func: str = 'sum',
+                         where: Optional[Dict[str, Any]] = None,
+                         source: Connection = None) -> pd.DataFrame:
+    """
+    ``quick_summary_table``'s aggregation as one SQL GROUP BY.
+
+    Args:
+        group_by: Column(s) to group by
+        aggregate_cols: Columns to aggregate
+        agg_func: 'sum', 'mean', 'count', 'max', 'min'
+        where: Optional equality / membership filters
+        source: SQLite path or open connection (default: ``SQLITE_PATH``)
+
+    Returns:
+        DataFrame indexed by ``group_by``, sorted by the first aggregate
+        column (descending)
+    """
+    if agg_func not in SQL_AGGREGATES:
+        raise ValueError(f"agg_func must be one of {', '.join(SQL_AGGREGATES)}")
+    keys = [group_by] if isinstance(group_by, str) else list(group_by)
+    with _connect(source) as conn:
+        _check_columns(conn, keys + list(aggregate_cols))
+        clause, params = _where_clause(conn, where)
+        # pandas groupby drops missing keys
+        not_null = ' AND '.join(f'{_quote(key)} IS NOT NULL' for key in keys)
+        clause = f'{clause} AND {not_null}' if clause else f' WHERE {not_null}'
+        aggregates = ', '.join(f'{SQL_AGGREGATES[agg_func]}({_quote(col)}) AS {_quote(col)}'
+                               for col in aggregate_cols)
+        group = ', '.join(map(_quote, keys))
+        sql = (f'SELECT {group}, {aggregates} FROM {TABLE}{clause} '
+               f'GROUP BY {group} ORDER BY {len(keys) + 1} DESC')
+        summary = pd.read_sql_query(sql, conn, params=params)
+    summary = summary.set_index(keys if len(keys) > 1 else keys[0])
+    if agg_func == 'count':
+        summary = summary.astype('int64')
+    return summary
+
+
+def sqlite_period_totals(date_col: str, value_col: str, split: Any,
+                         where: Optional[Dict[str, Any]] = None,
+                         source: Connection = None) -> Dict[str, Any]:
+    """
+    Totals, means and row counts of ``value_col`` before and from ``split``.
+
+    The statistics behind ``compare_periods``, computed in one scan of
+    the two columns.
+
+    Args:
+        date_col: Timestamp column
+        value_col: Column to compare
+        split: Boundary date; rows before it are period 1
+        where: Optional equality / membership filters
+        source: SQLite path or open connection (default: ``SQLITE_PATH``)
+
+    Returns:
+        Dictionary with period1/period2 total, mean and count (the keys
+        ``compare_periods`` reports)
+    """
+    with _connect(source) as conn:
+        _check_columns(conn, [date_col, value_col])
+        clause, params = _where_clause(conn, where)
+        not_null = f'{_quote(date_col)} IS NOT NULL'
+        clause = f'{clause} AND {not_null}' if clause else f' WHERE {not_null}'
+        value = _quote(value_col)
+        sql = (f'SELECT {_quote(date_col)} >= ? AS after, COALESCE(SUM({value}), 0), AVG({value}), COUNT(*) '
+               f'FROM {TABLE}{clause} GROUP BY after')
+        rows = {bool(after): (total, mean, count)
+                for after, total, mean, count in conn.execute(sql, [_sql_timestamp(split), *params])}
+    (total1, mean1, count1), (total2, mean2, count2) = (rows.get(after, (0, None, 0))
+                                                          for after in (False, True))
+    # numpy scalars, so a zero total divides like the pandas path (inf, not an error)
+    return {
+        'period1_total': np.asarray(total1)[()],
+        'period2_total': np.asarray(total2)[()],
+        'period1_mean': np.nan if mean1 is None else mean1,
+        'period2_mean': np.nan if mean2 is None else mean2,
+        'period1_count': count1,
+        'period2_count': count2,
+    }
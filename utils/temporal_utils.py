@@ -0,0 +1,240 @@
+"""
+Temporal Utilities
+
+Sorted time index and vectorized period windows for incident data.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+DateLike = Union[str, pd.Timestamp]
+MonthDay = Tuple[int, int]
+Window = Tuple[DateLike, DateLike]
+
+
+def _as_datetimes(values) -> pd.Series:
+    """Parse a column to datetimes without touching the caller's frame."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values, errors='coerce')
+
+
+def _as_month_day(value: Union[MonthDay, DateLike]) -> MonthDay:
+    """Accept (month, day) tuples, dates or date strings."""
+    if isinstance(value, tuple):
+        return int(value[0]), int(value[1])
+    ts = pd.Timestamp(value)
+    return ts.month, ts.day
+
+
+def month_day_key(dates) -> np.ndarray:
+    """
+    Encode dates as month * 100 + day for fast "same window" comparisons.
+
+    Args:
+        dates: Series or array of datetimes
+
+    Returns:
+        int16 array, with -1 for missing dates
+    """
+    dates = pd.Series(_as_datetimes(dates))
+    key = dates.dt.month * 100 + dates.dt.day
+    return key.fillna(-1).to_numpy(dtype=np.int16)
+
+
+def same_window_mask(dates, start: Union[MonthDay, DateLike],
+                     end: Union[MonthDay, DateLike],
+                     years: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Flag dates that fall in the same month/day window in any year.
+
+    Vectorized replacement for row-wise ``is_within_period`` filters, e.g.
+    year-to-date comparisons across 2019-2025. Windows that wrap the new
+    year (Dec 15 - Jan 15) are supported.
+
+    Args:
+        dates: Series or array of datetimes
+        start: First (month, day) of the window, inclusive
+        end: Last (month, day) of the window, inclusive
+        years: Optional list of years to keep
+
+    Returns:
+        Boolean array aligned with ``dates``
+    """
+    dates = pd.Series(_as_datetimes(dates))
+    key = month_day_key(dates)
+    start_key = np.int16(_as_month_day(start)[0] * 100 + _as_month_day(start)[1])
+    end_key = np.int16(_as_month_day(end)[0] * 100 + _as_month_day(end)[1])
+    if start_key <= end_key:
+        mask = (key >= start_key) & (key <= end_key)
+    else:
+        mask = ((key >= start_key) | (key <= end_key)) & (key >= 0)
+    if years is not None:
+        mask &= dates.dt.year.isin(list(years)).to_numpy()
+    return mask
+
+
+def same_window_by_year(start: Union[MonthDay, DateLike], end: Union[MonthDay, DateLike],
+                        years: Sequence[int]) -> Dict[int, Tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Build one [start, end] window per year for ``compare_windows``.
+
+    Args:
+        start: First (month, day) of the window, inclusive
+        end: Last (month, day) of the window, inclusive
+        years: Years to build windows for
+
+    Returns:
+        Dictionary of year -> (start, end) half-open Timestamps
+    """
+    (start_month, start_day), (end_month, end_day) = _as_month_day(start), _as_month_day(end)
+    windows = {}
+    for year in years:
+        end_year = year + 1 if (end_month, end_day) < (start_month, start_day) else year
+        windows[year] = (pd.Timestamp(year=year, month=start_month, day=start_day),
+                         pd.Timestamp(year=end_year, month=end_month, day=end_day) + pd.Timedelta(days=1))
+    return windows
+
+
+class IncidentTimeline:
+    """
+    Read-only view of incidents sorted by a date column.
+
+    The input frame is neither copied nor modified: the view keeps the sort
+    order and the sorted timestamps, and slices with ``searchsorted``.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_col: str = 'REPORT_DATE'):
+        """
+        Args:
+            df: pandas DataFrame of incidents
+            date_col: Name of the datetime column to index on
+        """
+        self.df = df
+        self.date_col = date_col
+        dates = pd.Series(_as_datetimes(df[date_col]))
+        self.tz = getattr(dates.dt, 'tz', None)
+        if self.tz is not None:
+            dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+        values = dates.to_numpy(dtype='datetime64[ns]')
+        # NaT sorts last, so valid dates occupy [0, n_valid)
+        self.order = np.argsort(values, kind='stable')
+        self.sorted_dates = values[self.order]
+        self.n_valid = int((~np.isnat(values)).sum())
+
+    def _bound(self, value: DateLike) -> np.datetime64:
+        ts = pd.Timestamp(value)
+        if self.tz is not None:
+            ts = ts.tz_localize(self.tz) if ts.tzinfo is None else ts
+            ts = ts.tz_convert('UTC').tz_localize(None)
+        elif ts.tzinfo is not None:
+            ts = ts.tz_localize(None)
+        return np.datetime64(ts.to_datetime64(), 'ns')
+
+    def bounds(self, start: Optional[DateLike] = None,
+               end: Optional[DateLike] = None) -> Tuple[int, int]:
+        """
+        Locate [start, end) in the sorted order.
+
+        Args:
+            start: Inclusive lower bound (None for the earliest incident)
+            end: Exclusive upper bound (None for the latest incident)
+
+        Returns:
+            Tuple of (lo, hi) positions into ``order``
+        """
+        valid = self.sorted_dates[:self.n_valid]
+        lo = 0 if start is None else int(np.searchsorted(valid, self._bound(start), side='left'))
+        hi = self.n_valid if end is None else int(np.searchsorted(valid, self._bound(end), side='left'))
+        return lo, max(lo, hi)
+
+    def positions(self, start: Optional[DateLike] = None,
+                  end: Optional[DateLike] = None) -> np.ndarray:
+        """Row positions (into the original frame) of incidents in [start, end)."""
+        lo, hi = self.bounds(start, end)
+        return self.order[lo:hi]
+
+    def between(self, start: Optional[DateLike] = None,
+                end: Optional[DateLike] = None) -> pd.DataFrame:
+        """
+        Incidents in [start, end), in date order.
+
+        Args:
+            start: Inclusive lower bound
+            end: Exclusive upper bound
+
+        Returns:
+            DataFrame slice of the original frame
+        """
+        return self.df.iloc[self.positions(start, end)]
+
+    def count(self, start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None) -> int:
+        """Number of incidents in [start, end) without materializing rows."""
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+
+def compare_windows(df: Union[pd.DataFrame, IncidentTimeline],
+                    windows: Dict[object, Window],
+                    date_col: str = 'REPORT_DATE',
+                    group_by: Optional[Union[str, List[str]]] = None,
+                    value_col: Optional[str] = None,
+                    agg_func: str = 'count') -> pd.DataFrame:
+    """
+    Evaluate many time windows x groups in one pass.
+
+    Successor to ``compare_periods`` for multi-window comparisons such as
+    year-to-date by offense or before/after by ward. Each window is located
+    with ``searchsorted`` on the sorted time index, and all windows are
+    aggregated in a single groupby. The input frame is not modified.
+
+    Args:
+        df: pandas DataFrame, or an ``IncidentTimeline`` to reuse its index
+        windows: Mapping of label -> (start, end), half-open [start, end)
+        date_col: Name of the datetime column (ignored for a timeline)
+        group_by: Optional column(s) to break each window down by
+        value_col: Column to aggregate (counts rows when None)
+        agg_func: 'count', 'sum', 'mean', 'max' or 'min'
+
+    Returns:
+        DataFrame with one row per group and one column per window label
+    """
+    timeline = df if isinstance(df, IncidentTimeline) else IncidentTimeline(df, date_col)
+    frame = timeline.df
+    labels = list(windows)
+
+    spans = [timeline.bounds(*windows[label]) for label in labels]
+    lengths = np.array([hi - lo for lo, hi in spans], dtype=np.int64)
+    positions = (np.concatenate([timeline.order[lo:hi] for lo, hi in spans])
+                 if lengths.sum() else np.empty(0, dtype=np.int64))
+    window_codes = np.repeat(np.arange(len(labels)), lengths)
+
+    keys = {'_window': pd.Categorical.from_codes(window_codes, categories=range(len(labels)))}
+    group_cols = [] if group_by is None else ([group_by] if isinstance(group_by, str) else list(group_by))
+    for col in group_cols:
+        keys[col] = frame[col].to_numpy()[positions]
+    if value_col is None:
+        values = pd.Series(1, index=range(len(positions)), dtype=np.int64)
+        agg_func = 'sum' if agg_func == 'count' else agg_func
+    else:
+        values = pd.Series(frame[value_col].to_numpy()[positions])
+
+    grouped = values.groupby([pd.Series(v) for v in keys.values()], observed=False, sort=True)
+    result = grouped.agg(agg_func)
+    result.index.names = ['_window'] + group_cols
+    if group_cols:
+        table = result.unstack('_window')
+        table = table.reindex(columns=range(len(labels)))
+    else:
+        table = result.to_frame().T
+        table.index = ['TOTAL']
+    table.columns = labels
+    if value_col is None or agg_func == 'count':
+        table = table.fillna(0).astype(np.int64)
+    elif agg_func == 'sum':
+        # Empty windows sum to 0; unstacking upcasts to float, so restore the
+        # sum's own dtype (float sums must not be truncated)
+        table = table.fillna(0).astype(result.dtype)
+    return table